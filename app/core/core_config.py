@@ -7,3 +7,27 @@ Path(APP_CACHE_DIR).mkdir(parents=True, exist_ok=True)
 
 APP_CACHE_HOLD_DAYS = 4
 ATTACHMENTS_VALIDATION_SIZE_TOLERANCE = 2  # in bytes
+
+# persistent caches kept in APP_CACHE_DIR (not removed by the daily cache cleanup)
+KPM_STEPS_CACHE_DIR = f"{APP_CACHE_DIR}/kpm_process_steps"
+KPM_STEPS_CACHE_MAX_SIZE = 200 * 1024 * 1024  # in bytes
+KPM_SYNC_STATE_DIR = f"{APP_CACHE_DIR}/kpm_sync_state"
+KPM_SYNC_WATERMARK_OVERLAP_MINUTES = 60
+# syncs retried (by KPM ID) of a ticket that failed, until it changes again
+KPM_SYNC_MAX_RETRIES = 5
+SYNC_FINGERPRINTS_DIR = f"{APP_CACHE_DIR}/sync_fingerprints"
+SYNC_FINGERPRINTS_DB = f"{SYNC_FINGERPRINTS_DIR}/fingerprints.sqlite"
+HTTP_CASSETTES_DIR = f"{APP_CACHE_DIR}/http_cassettes"
+JIRA_MIRROR_DIR = f"{APP_CACHE_DIR}/jira_mirror"
+JIRA_MIRROR_DB = f"{JIRA_MIRROR_DIR}/issues.sqlite"
+JIRA_MIRROR_MAX_AGE_SECONDS = 60
+JIRA_MIRROR_OVERLAP_MINUTES = 5
+# mirror reloaded in full (e.g. issues moved out of the scope), None: never
+JIRA_MIRROR_FULL_REFRESH_HOURS = 24
+APP_CACHE_PERSISTENT_DIRS = [
+    KPM_STEPS_CACHE_DIR,
+    KPM_SYNC_STATE_DIR,
+    SYNC_FINGERPRINTS_DIR,
+    HTTP_CASSETTES_DIR,
+    JIRA_MIRROR_DIR,
+]
@@ -1,5 +1,10 @@
 import sys
+from threading import Lock
+from time import perf_counter
+from typing import Callable
+
 from loguru import logger as loguru_logger
+import yaml
 
 
 def get_logger():
@@ -17,3 +22,108 @@ def get_logger():
 
 
 logger = get_logger()
+
+
+class LogFormattingTime:
+    """Time spent rendering the deferred log payloads (thread safe)."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.rendered = 0
+        self.seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.rendered += 1
+            self.seconds += seconds
+
+    def summary(self) -> dict:
+        """e.g. for the sync report"""
+        with self._lock:
+            return {"rendered": self.rendered, "seconds": round(self.seconds, 3)}
+
+
+LOG_FORMATTING = LogFormattingTime()
+
+
+class Deferred:
+    """A log payload, rendered only if the log record is actually emitted.
+
+    Rendering never raises: a payload that fails to render is logged as
+    "<unable to render ...>" instead of failing (or hiding) the log call."""
+
+    __slots__ = ("render", "args")
+
+    def __init__(self, render: Callable, *args) -> None:
+        self.render = render
+        self.args = args
+
+    def __call__(self) -> str:
+        start = perf_counter()
+        try:
+            return str(self.render(*self.args))
+        except Exception as e:
+            name = getattr(self.render, "__qualname__", self.render)
+            return f"<unable to render {name}: {e!r}>"
+        finally:
+            LOG_FORMATTING.record(perf_counter() - start)
+
+    __str__ = __call__
+
+
+def deferred(payload) -> Deferred:
+    """PAYLOAD as a Deferred: rendered by calling it if it is callable,
+    with `str()` otherwise."""
+    if isinstance(payload, Deferred):
+        return payload
+    if callable(payload):
+        return Deferred(payload)
+    return Deferred(str, payload)
+
+
+def as_yaml(data) -> Deferred:
+    """DATA dumped as YAML, only if logged."""
+    return Deferred(yaml.safe_dump, data)
+
+
+class DeferredLogger:
+    """Facade over the loguru LOGGER for messages with (big) payloads.
+
+    The payloads are positional arguments filled into the "{}" placeholders
+    of MESSAGE: callables (e.g. `as_yaml(fields)`, `issue.get_all_fields_as_yaml`)
+    rendered only if LEVEL is enabled, and never `str.format`-ed themselves,
+    e.g. Jira descriptions with "{...}" are safe. Keyword arguments are the
+    record extras (kpm_id, jira_id, vw_id, esr_id ...).
+
+        deferred_logger.debug(
+            "Jira Issue {} .fields: \\n{}", jira_id, as_yaml(fields), jira_id=jira_id
+        )
+    """
+
+    def __init__(self, logger=loguru_logger) -> None:
+        self._logger = logger
+
+    def _log(self, level: str, message: str, payloads: tuple, extra: dict) -> None:
+        payloads = [deferred(payload) for payload in payloads]
+        # depth: the records point to the caller of debug(), info() ...
+        self._logger.bind(**extra).opt(lazy=True, depth=2).log(
+            level, message, *payloads
+        )
+
+    def log(self, level: str, message: str, *payloads, **extra) -> None:
+        self._log(level, message, payloads, extra)
+
+    def debug(self, message: str, *payloads, **extra) -> None:
+        self._log("DEBUG", message, payloads, extra)
+
+    def info(self, message: str, *payloads, **extra) -> None:
+        self._log("INFO", message, payloads, extra)
+
+    def warning(self, message: str, *payloads, **extra) -> None:
+        self._log("WARNING", message, payloads, extra)
+
+    def error(self, message: str, *payloads, **extra) -> None:
+        self._log("ERROR", message, payloads, extra)
+
+
+deferred_logger = DeferredLogger(logger)
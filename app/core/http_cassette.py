@@ -0,0 +1,261 @@
+# standard
+from io import BytesIO
+from os import getenv as env
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import json
+import re
+import sqlite3
+import zlib
+
+# external
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter
+from requests.exceptions import RequestException
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# project core
+from app.core.custom_logger import logger
+from app.core.core_config import HTTP_CASSETTES_DIR
+from app.core.sync_fingerprints import fingerprint
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+# "record": the KPM and Jira sessions work as usual and every HTTP exchange
+# is saved to the cassette HTTP_CASSETTE_NAME, "replay": they are answered
+# from that cassette only (no network), "" (default): no cassette
+HTTP_CASSETTE_MODE = env("HTTP_CASSETTE_MODE", "").lower()
+HTTP_CASSETTE_NAME = env("HTTP_CASSETTE_NAME", "sync")
+
+# parts of the requests that differ from one run to the next
+VOLATILE_PATTERNS = (
+    # KPM SOAP MessageID, Jira request ids ...
+    re.compile(rb"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I),
+    # dates and times (KPM "since", JQL "updated >= ..." ...)
+    re.compile(
+        rb"\d{4}[-/]\d{2}[-/]\d{2}(?:[ T/-]\d{1,2}[:.]\d{2}(?:[:.]\d{2}(?:[.,]\d+)?)?)?"
+    ),
+    # JQL durations relative to now (e.g. the Jira mirror "updated >= -12m")
+    re.compile(rb"(?:(?<![\w.])|(?<=%3D))-\d+[wdhm]\b", re.I),
+)
+# response headers not kept (decoded content, session cookies)
+DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "set-cookie")
+
+
+class CassetteMissError(RequestException):
+    """Replay mode: no recorded response for a request."""
+
+
+def request_body(request: PreparedRequest) -> bytes:
+    """The body of REQUEST as bytes (a streamed body is read and replaced)."""
+    body = request.body
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, bytes):
+        return body
+    if hasattr(body, "read"):  # e.g. the multipart encoder of the attachments
+        body = body.read()
+    else:
+        body = b"".join(
+            part.encode("utf-8") if isinstance(part, str) else part for part in body
+        )
+    request.body = body
+    return body
+
+
+def request_fingerprint(request: PreparedRequest) -> str:
+    """What identifies REQUEST from one run to the next: method, URL (sorted
+    query) and body, without the volatile parts (ids, dates, multipart
+    boundary). The headers (credentials) are never part of it."""
+    url = urlsplit(request.url)
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+    url = urlunsplit((url.scheme, url.netloc, url.path, query, ""))
+    masked = [url.encode("utf-8"), request_body(request)]
+    content_type = request.headers.get("Content-Type", "")
+    if "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].split(";")[0].strip('"')
+        masked = [part.replace(boundary.encode("utf-8"), b"") for part in masked]
+    for pattern in VOLATILE_PATTERNS:
+        masked = [pattern.sub(b"", part) for part in masked]
+    return fingerprint(request.method, *masked)
+
+
+class Cassette:
+    """Recorded HTTP exchanges of the KPM and Jira sessions, to run a sync
+    cycle again offline (e.g. to measure a performance change).
+
+    One SQLite file per cassette: the exchanges in the order they happened,
+    keyed on `request_fingerprint()`, and their response bodies (MTOM/XOP
+    included) zlib compressed, each distinct body stored once. The request
+    headers and the session cookies are never stored.
+
+    In replay mode, the n-th request with a given fingerprint gets the n-th
+    response recorded for it (the last one again, if there are no more).
+    """
+
+    def __init__(
+        self, name: str, mode: str, cassettes_dir: str = HTTP_CASSETTES_DIR
+    ) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f'Unknown HTTP cassette mode "{mode}"')
+        self.name = name
+        self.mode = mode
+        self.path = Path(cassettes_dir) / f"{name}.cassette"
+        self.logger = logger
+        self._lock = Lock()
+        self._played: dict[str, int] = {}
+        self._stats = {"exchanges": 0, "misses": 0, "recorded_seconds": 0.0}
+        self._start = perf_counter()
+        if mode == REPLAY and not self.path.is_file():
+            raise FileNotFoundError(f"No HTTP cassette {self.path} to replay")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS exchanges ("
+                "id INTEGER PRIMARY KEY, fingerprint TEXT, method TEXT, url TEXT, "
+                "status INTEGER, reason TEXT, headers TEXT, body TEXT, seconds REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS exchanges_fingerprint "
+                "ON exchanges (fingerprint, id)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS bodies (digest TEXT PRIMARY KEY, data BLOB)"
+            )
+            if mode == RECORD:  # a new recording
+                self._db.execute("DELETE FROM exchanges")
+                self._db.execute("DELETE FROM bodies")
+        self.logger.info(f"HTTP cassette {self.path} in {mode} mode")
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path}, {self.mode})"
+
+    def mount(self, session: Session) -> Session:
+        """Route all the requests of SESSION through the cassette."""
+        for prefix, adapter in list(session.adapters.items()):
+            if not isinstance(adapter, CassetteAdapter):
+                session.mount(prefix, CassetteAdapter(self, adapter))
+        return session
+
+    def record(
+        self, request: PreparedRequest, response: Response, seconds: float
+    ) -> None:
+        body = response.content  # the whole body, even for streamed responses
+        digest = fingerprint(body)
+        headers = {
+            key: value
+            for key, value in response.headers.items()
+            if key.lower() not in DROPPED_HEADERS
+        }
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO bodies VALUES (?, ?)",
+                (digest, zlib.compress(body)),
+            )
+            self._db.execute(
+                "INSERT INTO exchanges (fingerprint, method, url, status, reason, "
+                "headers, body, seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    request_fingerprint(request),
+                    request.method,
+                    request.url,
+                    response.status_code,
+                    response.reason,
+                    json.dumps(headers),
+                    digest,
+                    seconds,
+                ),
+            )
+            self._stats["exchanges"] += 1
+            self._stats["recorded_seconds"] += seconds
+
+    def replay(self, request: PreparedRequest) -> Response:
+        key = request_fingerprint(request)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, reason, headers, data, seconds FROM exchanges "
+                "JOIN bodies ON body = digest WHERE fingerprint = ? ORDER BY id",
+                (key,),
+            ).fetchall()
+            if not rows:
+                self._stats["misses"] += 1
+                raise CassetteMissError(
+                    f"No {request.method} {request.url} in HTTP cassette {self.path}",
+                    request=request,
+                )
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+            status, reason, headers, data, seconds = rows[min(played, len(rows) - 1)]
+            self._stats["exchanges"] += 1
+            self._stats["recorded_seconds"] += seconds
+
+        response = Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = BytesIO(zlib.decompress(data))
+        response.url = request.url
+        response.request = request
+        return response
+
+    def summary(self) -> dict:
+        """e.g. for the sync report: RECORDED_SECONDS is the time the server
+        took to answer (while recording) for the exchanges of this run."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "mode": self.mode,
+                "exchanges": self._stats["exchanges"],
+                "misses": self._stats["misses"],
+                "recorded_seconds": round(self._stats["recorded_seconds"], 3),
+                "seconds": round(perf_counter() - self._start, 3),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter recording or replaying the exchanges of ADAPTER."""
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if self.cassette.mode == REPLAY:
+            return self.cassette.replay(request)
+        request_body(request)  # a streamed body can only be read once
+        start = perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record(request, response, perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        self.adapter.close()
+
+
+_CASSETTE: Cassette = None
+_CASSETTE_LOCK = Lock()
+
+
+def http_cassette() -> Cassette | None:
+    """The cassette of this process (HTTP_CASSETTE_MODE), None if not enabled."""
+    global _CASSETTE
+    if not HTTP_CASSETTE_MODE:
+        return
+    with _CASSETTE_LOCK:
+        if _CASSETTE is None:
+            _CASSETTE = Cassette(HTTP_CASSETTE_NAME, HTTP_CASSETTE_MODE)
+        return _CASSETTE
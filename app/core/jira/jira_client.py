@@ -1,8 +1,12 @@
 # standard
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
 from io import BytesIO
+from typing import BinaryIO, Iterator
 from datetime import datetime, timedelta
 from requests.exceptions import ChunkedEncodingError as DownloadFailed
+import json
 
 # external
 from jira import JIRA, Comment, Issue, User
@@ -11,7 +15,8 @@ from jira.exceptions import JIRAError
 import yaml
 
 # project core
-from app.core.custom_logger import logger
+from app.core.custom_logger import Deferred, as_yaml, deferred_logger, logger
+from app.core.http_cassette import http_cassette
 from app.core.jira.jira_issue import JiraIssue, JiraIssueCore
 from app.core.processors.exceptions import APIServerConnectionError
 from app.core.utils import (
@@ -22,6 +27,7 @@ from app.core.utils import (
     build_auto_comment,
 )
 from app.core.jira.jira_map import JiraFieldsMapCore
+from app.core.jira.jira_mirror import JiraIssueMirror
 from app.core.jira.jira_utils import process_jira_error_msg
 from app.core.jira.exceptions import (
     JiraApiError,
@@ -31,6 +37,26 @@ from app.core.jira.exceptions import (
 )
 
 
+# search projection: every field of the issues (the Jira default)
+ALL_FIELDS = "*all"
+# issues per search page requested (the server may grant less)
+QUERY_PAGE_SIZE = 100
+# concurrent page requests of a search, once its total is known
+QUERY_MAX_WORKERS = 4
+TIMEFRAME_SECONDS = {"d": 24 * 3600, "h": 3600, "m": 60}
+# comments per request (the server may grant less)
+COMMENTS_PAGE_SIZE = 100
+# issue keys per "key in (...)" query of `issues_by_keys()`
+KEYS_PER_QUERY = 100
+
+
+def issue_ref(issue: JiraIssueCore | str) -> str:
+    """How the REST API addresses ISSUE: its id if loaded, else its key."""
+    if isinstance(issue, JiraIssueCore):
+        return issue._id or issue.jira_id
+    return issue
+
+
 class JiraClientCore:
     """Wrapper around jira.JIRA client to interact with the Jira server."""
 
@@ -62,6 +88,13 @@ class JiraClientCore:
         self.issue_type = issue_type
         self.reporters = reporters if reporters else []
         self.origin = origin if origin else []
+        # local copy of the issues of `base_jql` (see JiraIssueMirror)
+        self.mirror: JiraIssueMirror = None
+        # sync cycle: comments of each issue (by issue id), requested once
+        self._cycle_depth = 0
+        self._comments: dict[str, list[Comment]] = {}
+        # workflow transitions: (project, issue type, status, new status) -> raw
+        self._transitions: dict[tuple[str, str, str, str], dict] = {}
 
     def connect(self) -> "JiraClientCore":
         """Connect and authenticate to a Jira server."""
@@ -76,9 +109,18 @@ class JiraClientCore:
             self.logger.info(
                 f"Connecting Jira client to {self.__email}@{self.__server} ... "
             )
+            cassette = http_cassette()
             self._client = JIRA(
-                server=self.__server, basic_auth=(self.__email, self.__token)
+                server=self.__server,
+                basic_auth=(self.__email, self.__token),
+                get_server_info=cassette is None,
             )
+            if cassette:
+                # the server info request of JIRA() goes through the cassette too
+                cassette.mount(self._client._session)
+                server_info = self._client.server_info()
+                self._client._version = tuple(server_info["versionNumbers"])
+                self._client.deploymentType = server_info.get("deploymentType")
             return self
         except JIRAError as j_e:
             error_message = f"{j_e.status_code}: {j_e.text}"
@@ -102,6 +144,19 @@ class JiraClientCore:
             return f"{self.__email}@{self.__server} ({self_name})"
         return self_name
 
+    @contextmanager
+    def sync_cycle(self):
+        """Scope of a sync cycle: the comments of each issue are requested
+        only once and kept up to date with the comments added by this client,
+        until the (outermost) cycle ends."""
+        self._cycle_depth += 1
+        try:
+            yield self
+        finally:
+            self._cycle_depth -= 1
+            if not self._cycle_depth:
+                self._comments.clear()
+
     @property
     def base_jql(self):
         if not self.__base_jql:
@@ -130,18 +185,50 @@ class JiraClientCore:
             )
             raise JiraRequestError(error_message) from j_e
 
-    def _run_query(self, jql, start_at) -> tuple[list[JiraIssue], int]:
+    def _token_search(self) -> bool:
+        """Jira Cloud pages the searches with nextPageToken (no startAt), if the
+        jira library has the token based search (3.10 and later)."""
+        return bool(getattr(self._client, "_is_cloud", False)) and hasattr(
+            self._client, "enhanced_search_issues"
+        )
+
+    def _run_query(
+        self,
+        jql,
+        start_at: int = 0,
+        fields: str | tuple[str, ...] = ALL_FIELDS,
+        expand: str = None,
+        next_page_token: str = None,
+    ) -> dict:
+        """One page of search results: issues, and startAt, maxResults and
+        total, or nextPageToken and isLast with the token based search."""
+        # a list: the searches translate the field names in place
+        fields = [fields] if isinstance(fields, str) else list(fields)
         try:
-            self.logger.debug(
-                f"Request Jira issues starting from issue index: {start_at}."
-            )
-            result = self._client.search_issues(
-                jql_str=jql, json_result=True, startAt=start_at
-            )
-            issues = result.get("issues", [])
-            issues_count = len(issues)
-            self.logger.debug(f"Found {issues_count} issues.")
-            return (issues, issues_count)
+            if self._token_search():
+                self.logger.debug(f"Request Jira issues page: {next_page_token}.")
+                result = self._client.enhanced_search_issues(
+                    jql_str=jql,
+                    nextPageToken=next_page_token,
+                    maxResults=QUERY_PAGE_SIZE,
+                    fields=fields,
+                    expand=expand,
+                    json_result=True,
+                )
+            else:
+                self.logger.debug(
+                    f"Request Jira issues starting from issue index: {start_at}."
+                )
+                result = self._client.search_issues(
+                    jql_str=jql,
+                    json_result=True,
+                    startAt=start_at,
+                    maxResults=QUERY_PAGE_SIZE,
+                    fields=fields,
+                    expand=expand,
+                )
+            self.logger.debug(f"Found {len(result.get('issues', []))} issues.")
+            return result
         except JIRAError as j_e:
             error_message = f"{j_e.status_code}: {j_e.text}"
             error_message = process_jira_error_msg(error_message)
@@ -150,35 +237,106 @@ class JiraClientCore:
             )
             raise JiraRequestError(error_message) from j_e
 
-    def query(self, jql: str) -> list[JiraIssue]:
-        """Get all|max issues for the provided query."""
-        start_at = 0
-        all_issues = []
-        self.logger.info(f"Query Jira issues: '{jql}'.")
-        while True:
-            issues, issues_count = self._run_query(jql, start_at)
-            all_issues.extend([self.jira_issue_type(issue) for issue in issues])
-            if issues_count >= 0 and issues_count < 50:
-                self.logger.debug(
-                    f"Found {len(all_issues)} Jira issues for query "
-                    f"in Jira server: {self.__server} . JQL:"
-                    f"\n{jql}"
-                )
-                return all_issues
-            if issues_count == 50:
-                start_at += 50
-            else:
-                error_message = (
-                    f"Invalid length of returned issues: {issues_count}. "
-                    "Must be between 0 and 50."
+    def iter_query(
+        self,
+        jql: str,
+        fields: str | tuple[str, ...] = ALL_FIELDS,
+        expand: str = None,
+        max_workers: int = QUERY_MAX_WORKERS,
+    ) -> Iterator[JiraIssue]:
+        """Yield the issues for the provided query as the pages arrive.
+
+        The first page tells the page size granted by the server (up to
+        QUERY_PAGE_SIZE) and the total: the other pages are then requested
+        concurrently (MAX_WORKERS) and yielded in order. With the token based
+        search (Jira Cloud) the pages can only be requested one after another.
+        """
+        page = self._run_query(jql, 0, fields, expand)
+        issues = page.get("issues", [])
+        yield from (self.jira_issue_type(issue) for issue in issues)
+
+        if self._token_search():
+            while page.get("nextPageToken") and not page.get("isLast", True):
+                page = self._run_query(
+                    jql,
+                    fields=fields,
+                    expand=expand,
+                    next_page_token=page["nextPageToken"],
                 )
-                self.logger.error(error_message)
-                raise JiraRequestError(error_message)
+                yield from (self.jira_issue_type(i) for i in page.get("issues", []))
+            return
+
+        # the page size granted by the server: the first page may be shorter
+        # (e.g. issues filtered out by permissions)
+        page_size, total = page.get("maxResults") or len(issues), page.get("total", 0)
+        if not page_size or total <= page_size:
+            return
+        pages_start_at = range(page_size, total, page_size)
+        workers = max(1, min(max_workers, len(pages_start_at)))
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pages = pool.map(
+                lambda start_at: self._run_query(jql, start_at, fields, expand),
+                pages_start_at,
+            )
+            for page in pages:
+                yield from (self.jira_issue_type(i) for i in page.get("issues", []))
+        finally:
+            # e.g. the caller stopped iterating: drop the pages not requested yet
+            pool.shutdown(cancel_futures=True)
+
+    def query(
+        self,
+        jql: str,
+        fields: str | tuple[str, ...] = ALL_FIELDS,
+        expand: str = None,
+    ) -> list[JiraIssue]:
+        """Get all|max issues for the provided query.
+
+        fields: the issue fields to return (ids or names), e.g.
+            `self.field_map.key_fields` when only the keys are needed
+        expand: e.g. "renderedFields,changelog"
+        """
+        self.logger.info(f"Query Jira issues: '{jql}'.")
+        all_issues = list(self.iter_query(jql, fields, expand))
+        self.logger.debug(
+            f"Found {len(all_issues)} Jira issues for query "
+            f"in Jira server: {self.__server} . JQL:"
+            f"\n{jql}"
+        )
+        return all_issues
 
     @timed_cache
-    def cached_query(self, jql: str) -> list[JiraIssue]:
-        """JQL query that will keep the results in cache for an hour"""
-        return self.query(jql)
+    def cached_query(
+        self,
+        jql: str,
+        fields: str | tuple[str, ...] = ALL_FIELDS,
+        expand: str = None,
+    ) -> list[JiraIssue]:
+        """JQL query that will keep the results in cache for an hour
+        (FIELDS as a tuple, the arguments are the cache key)"""
+        return self.query(jql, fields, expand)
+
+    def issues_by_keys(
+        self, keys: list[str], fields: str | tuple[str, ...] = ALL_FIELDS
+    ) -> list[JiraIssue]:
+        """The issues KEYS (in that order, the ones found), with one query
+        per KEYS_PER_QUERY keys."""
+        keys = list(dict.fromkeys(keys))
+        issues = {}
+        for i in range(0, len(keys), KEYS_PER_QUERY):
+            jql = f"key in ({', '.join(keys[i : i + KEYS_PER_QUERY])})"
+            issues.update((issue.jira_id, issue) for issue in self.query(jql, fields))
+        return [issues[key] for key in keys if key in issues]
+
+    def from_mirror(
+        self, raw_issues: list[dict], fields: str | tuple[str, ...] = ALL_FIELDS
+    ) -> list[JiraIssue]:
+        """The issues RAW_ISSUES handed out by the mirror, read again by key
+        when the mirror does not have all of FIELDS."""
+        if self.mirror.covers(fields):
+            return [self.jira_issue_type(issue) for issue in raw_issues]
+        return self.issues_by_keys([issue["key"] for issue in raw_issues], fields)
 
     def beautify_allowed_values(self, allowed_vals: list[dict]) -> list[dict]:
         allowed: list[dict] = []
@@ -375,40 +533,21 @@ class JiraClientCore:
         fields: dict = jira_issue.fields
         jira_id = jira_issue.jira_id
         if not fields:
-            try:
-                self.logger.error(
-                    'JiraIssueCore is missing ".fields" to be used '
-                    "for new Jira issue creation",
-                    jira_id=jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "jira_id" extras'
-                )
-                self.logger.error(
-                    'JiraIssueCore is missing ".fields" to be used '
-                    "for new Jira issue creation"
-                )
-            return
-        try:
-            # FIXME: loguru inconsistent format error:
-            # ValueError: unmatched '{' in format spec
-            self.logger.debug(
-                f"Jira Issue {jira_id} .fields: \n{yaml.safe_dump(fields)}",
+            self.logger.error(
+                'JiraIssueCore is missing ".fields" to be used '
+                "for new Jira issue creation",
                 jira_id=jira_id,
             )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"{e} - loguru lib inconsistent custom format error when "
-                f'"jira_id" extra'
-            )
-            self.logger.debug(
-                f"Jira Issue {jira_id} .fields: \n{yaml.safe_dump(fields)}"
-            )
+            return
+        deferred_logger.debug(
+            "Jira Issue {} .fields: \n{}",
+            jira_id,
+            as_yaml(fields),
+            jira_id=jira_id,
+        )
 
-        self.logger.debug(
-            f"Issue Fields keys present (mapped from KPM): {[k for k in fields.keys()]}"
+        deferred_logger.debug(
+            "Issue Fields keys present (mapped from KPM): {}", Deferred(list, fields)
         )
 
         # actual posting the new Jira issue to Jira API server
@@ -464,23 +603,49 @@ class JiraClientCore:
         jira_client: JIRA = self._session()
         return jira_client.issue(jira_id).fields.labels
 
-    def add_label(self, jira_id: str, label: str, remove_existing=False) -> bool:
-        """Post a new label to Jira API server"""
+    def add_label(
+        self, jira_issue: JiraIssueCore | str, label: str, remove_existing=False
+    ) -> bool | None:
+        """Post a new label to a Jira issue (or key) with a single request:
+        Jira adds it to the labels itself, no read and write back of them.
+        REMOVE_EXISTING: LABEL replaces all the labels."""
+        jira_id = getattr(jira_issue, "jira_id", jira_issue)
         self.logger.debug(f"Adding label {label} to Jira issue {jira_id}")
-        jira_client: JIRA = self._session()
-        labels = self.get_labels(jira_id)
         if remove_existing:
-            jira_client.issue(jira_id).update(fields={"labels": [label]})
-        elif label not in labels:
-            labels.append(label)
-            jira_client.issue(jira_id).update(fields={"labels": labels})
-        new_labels = self.get_labels(jira_id)
-        if label in new_labels:
-            self.logger.debug(
-                f"Successfully added label {label} to Jira issue {jira_id}"
+            body = {"fields": {"labels": [label]}}
+        else:
+            body = {"update": {"labels": [{"add": label}]}}
+        try:
+            self._put_issue(jira_issue, body)
+        except JIRAError as e:
+            self.logger.error(
+                f"Failed to add label {label} to Jira issue {jira_id}: "
+                f"{e.status_code}: {e.text}",
+                jira_id=jira_id,
             )
-            return True
-        self.logger.error(f"Failed to add label {label} to Jira issue {jira_id}")
+            return
+        if isinstance(jira_issue, JiraIssueCore):
+            labels = [] if remove_existing else list(jira_issue.labels or [])
+            jira_issue.labels = labels if label in labels else labels + [label]
+        self.logger.debug(f"Successfully added label {label} to Jira issue {jira_id}")
+        return True
+
+    def add_labels(
+        self,
+        jira_issues: list[JiraIssueCore | str],
+        label: str,
+        max_workers: int = QUERY_MAX_WORKERS,
+    ) -> dict[str, bool | None]:
+        """`add_label()` to many Jira issues (or keys), MAX_WORKERS requests
+        at a time. The result of each, by Jira ID."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            added = executor.map(
+                lambda issue: self.add_label(issue, label), jira_issues
+            )
+            return {
+                getattr(issue, "jira_id", issue): result
+                for issue, result in zip(jira_issues, added)
+            }
 
     @timed_cache
     def get_cached_attachments_list(self, jira_id: str) -> list[Attachment]:
@@ -514,77 +679,84 @@ class JiraClientCore:
                 return self.download_attachment(jira_issue, attachment_id, retry_time)
 
         if isinstance(attachment_response, Attachment):
-            try:
-                self.logger.info(
-                    f"Attachment downloaded from Jira: {jira_issue.info}. "
-                    f"Attachment response: {attachment_response}",
-                    jira_id=jira_issue.jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "jira_id" extra'
-                )
-                self.logger.info(
-                    f"Attachment downloaded from Jira: {jira_issue.info}. "
-                    f"Attachment response: {attachment_response}"
-                )
+            deferred_logger.info(
+                "Attachment downloaded from Jira: {}. Attachment response: {}",
+                jira_issue.info,
+                attachment_response,
+                jira_id=jira_issue.jira_id,
+            )
             return attachment_response.get()
 
     def add_attachment(
-        self, jira_issue: JiraIssueCore, doc_name: str, doc_data: bytes | str
+        self,
+        jira_issue: JiraIssueCore,
+        doc_name: str,
+        doc_data: bytes | str | BinaryIO,
     ) -> Attachment | None:
-        """Post a new attachment to Jira API server"""
+        """Post a new attachment to Jira API server
+
+        doc_data: the content, a file path or an open (binary) file handle,
+        the last two are streamed to the server."""
         if not jira_issue._id:
-            try:
-                self.logger.error(
-                    f"Can't add attachment to Jira "
-                    f"without Jira Issue ID {jira_issue._id=}",
-                    jira_id=jira_issue.jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "jira_id" extra'
-                )
-                self.logger.error(
-                    f"Can't add attachment to Jira "
-                    f"without Jira Issue ID {jira_issue._id=}"
-                )
+            deferred_logger.error(
+                "Can't add attachment to Jira without Jira Issue ID jira_issue._id={}",
+                repr(jira_issue._id),
+                jira_id=jira_issue.jira_id,
+            )
         jira_client: JIRA = self._session()
         if isinstance(doc_data, bytes):
             attachment = BytesIO(doc_data)
-        elif isinstance(doc_data, str):
+        else:  # file path or file handle
             attachment = doc_data
         attach_response: Attachment = jira_client.add_attachment(
             issue=jira_issue._id,
             attachment=attachment,
             filename=doc_name,
         )
-        try:
-            self.logger.info(
-                f"Attachment added to Jira: {jira_issue}. "
-                f"Attachment response: {attach_response}",
-                jira_id=jira_issue.jira_id,
-            )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"{e} - loguru lib inconsistent custom "
-                f'format error when adding "jira_id" extra'
-            )
-            self.logger.info(
-                f"Attachment added to Jira: {jira_issue}. "
-                f"Attachment response: {attach_response}"
-            )
+        deferred_logger.info(
+            "Attachment added to Jira: {}. Attachment response: {}",
+            jira_issue,
+            attach_response,
+            jira_id=jira_issue.jira_id,
+        )
         return attach_response
 
-    def get_all_comments(self, jira_issue: JiraIssueCore) -> list[str]:
+    def _comments_page(
+        self,
+        jira_issue: JiraIssueCore,
+        start_at: int,
+        order_by: str = None,
+        max_results: int = COMMENTS_PAGE_SIZE,
+    ) -> tuple[list[Comment], int]:
+        """One page of the comments of JIRA_ISSUE (full bodies) and their total."""
         jira_client: JIRA = self._session()
-        existing_comments: list[Comment] = jira_client.comments(issue=jira_issue._id)
-        return existing_comments
+        params = {"startAt": start_at, "maxResults": max_results}
+        if order_by:
+            params["orderBy"] = order_by
+        result = jira_client._get_json(f"issue/{jira_issue._id}/comment", params)
+        comments = [
+            Comment(jira_client._options, jira_client._session, raw)
+            for raw in result.get("comments", [])
+        ]
+        return comments, result.get("total", len(comments))
+
+    def get_all_comments(self, jira_issue: JiraIssueCore) -> list[Comment]:
+        """All the comments of JIRA_ISSUE, oldest first, COMMENTS_PAGE_SIZE
+        per request. In a sync cycle they are requested once per issue."""
+        if (comments := self._comments.get(jira_issue._id)) is not None:
+            return comments
+        comments = []
+        while True:
+            page, total = self._comments_page(jira_issue, len(comments))
+            comments.extend(page)
+            if not page or len(comments) >= total:
+                break
+        if self._cycle_depth:
+            self._comments[jira_issue._id] = comments
+        return comments
 
     def get_all_comments_merged_as_str(self, jira_issue: JiraIssueCore) -> str:
-        comments_list: list[str] = self.get_all_comments(jira_issue)
+        comments_list: list[Comment] = self.get_all_comments(jira_issue)
         comments_text = []
         for esr_comment in comments_list:
             esr_comment: Comment = esr_comment
@@ -615,35 +787,19 @@ class JiraClientCore:
         since_days: int = 15,
         return_type: type = tuple,
     ) -> list[tuple[str, str]]:
-        jira_client: JIRA = self._session()
-        existing_comments: list[Comment] = jira_client.comments(issue=jira_issue._id)
+        since = datetime.now() - timedelta(days=since_days)
         comments_list = []
-
-        if not existing_comments:
-            return comments_list
-
-        for comment_id in existing_comments:
-            comment: Comment = jira_client.comment(
-                issue=jira_issue._id, comment=comment_id
-            )
-            if not comment:
+        # all of them: older comments may have been edited since
+        for comment in self.get_all_comments(jira_issue):
+            comment_day: str = comment.raw.get("updated", "").split("T")[0]
+            # the day of the update, at 00:00 (e.g. not the day SINCE_DAYS ago)
+            if datetime.strptime(comment_day, "%Y-%m-%d") <= since:
                 continue
-
-            comment_text: str = comment.raw.get("body")  # only text of comment
-            comment_date: str = comment.raw.get("updated")
-
-            if comment_date:
-                comment_date = comment_date.split("T")[0]
-
-            if datetime.strptime(comment_date, "%Y-%m-%d") > datetime.now() - timedelta(
-                days=since_days
-            ):
-                if return_type is tuple:
-                    to_add = (comment_date, comment_text)
-                elif return_type is Comment:
-                    to_add = comment
-
-                comments_list.append(to_add)
+            if return_type is tuple:
+                comment_text: str = comment.raw.get("body")  # only text of comment
+                comments_list.append((comment_day, comment_text))
+            elif return_type is Comment:
+                comments_list.append(comment)
 
         if comments_list:
             self.logger.debug(
@@ -656,15 +812,13 @@ class JiraClientCore:
     def is_equal_to_last_comment(
         self, jira_issue: JiraIssueCore, new_comment: str
     ) -> bool | None:
-        jira_client: JIRA = self._session()
-        existing_comments: list[Comment] = jira_client.comments(issue=jira_issue._id)
-        if not existing_comments:
-            return
-        comment_id: str = existing_comments[-1]
-        comment: Comment = jira_client.comment(issue=jira_issue._id, comment=comment_id)
-        if not comment:
+        if (comments := self._comments.get(jira_issue._id)) is None:
+            comments, _ = self._comments_page(
+                jira_issue, 0, order_by="-created", max_results=1
+            )
+        if not comments:
             return
-        last_comment_from_jira: str = comment.raw.get("body")  # only text of comment
+        last_comment_from_jira: str = comments[-1].raw.get("body")  # only text
         if new_comment == last_comment_from_jira:
             self.logger.warning("Same comment already present in Jira")
             return True
@@ -692,13 +846,12 @@ class JiraClientCore:
                 issue=jira_issue._id, body=comment
             )
             if response:
-                self.logger.info(
-                    f"Added comment to Jira: {comment}", jira_id=jira_issue.jira_id
+                if jira_issue._id in self._comments:  # the sync cycle cache
+                    self._comments[jira_issue._id].append(response)
+                deferred_logger.info(
+                    "Added comment to Jira: {}", comment, jira_id=jira_issue.jira_id
                 )
                 return True
-        except (ValueError, KeyError, IndexError):
-            self.logger.info(f"Comment added to Jira: {jira_issue}")
-            return True
         except (JIRAError, Exception) as e:
             self.logger.error(f"Failed to add comment to Jira: {e}")
 
@@ -712,12 +865,15 @@ class JiraClientCore:
         current_status: tuple[str] = None,
         status_not_in: tuple[str] = None,
         jira_ids: str | tuple[str] = None,
+        fields: str | tuple[str, ...] = None,
     ) -> list[JiraIssue]:
         """this method uses a timed cache to avoid querying Jira too often
 
         timeframe: str -> d = days, h = hours, m = minutes
 
-        if since == 0 -> jql "AND status changed " (without after)"""
+        if since == 0 -> jql "AND status changed " (without after)
+
+        fields: `self.field_map.key_fields` by default"""
 
         if timeframe not in ("d", "h", "m"):
             self.logger.error(f"Invalid timeframe: {timeframe}")
@@ -769,7 +925,7 @@ class JiraClientCore:
             jql = jql.replace(f"AND status not in {status_not_in} ", "")
 
         try:
-            return self.cached_query(jql)
+            return self.cached_query(jql, fields or self.field_map.key_fields)
         except Exception as e:
             self.logger.error(
                 f"Failed to get the tickets based on JQL query {jql} : {e}"
@@ -780,17 +936,25 @@ class JiraClientCore:
         self,
         since: int = 36,
         timeframe: str = "h",  # d = days, h = hours, m = minutes
+        fields: str | tuple[str, ...] = None,
     ) -> list[JiraIssue]:
-        """timeframe: str -> d = days, h = hours, m = minutes"""
+        """timeframe: str -> d = days, h = hours, m = minutes
+
+        fields: `self.field_map.key_fields` by default"""
         if timeframe not in ("d", "h", "m"):
             self.logger.error(f"Invalid timeframe: {timeframe}")
             return []
 
         self.logger.info(f"Query Jira issues updated in the past {since}{timeframe}.")
+        fields = fields or self.field_map.key_fields
         jql = f"{self.base_jql} AND updated >= -{since}{timeframe} "
 
         try:
-            if jira_issues := self.query(jql):
+            if self.mirror:
+                seconds = since * TIMEFRAME_SECONDS[timeframe]
+                if (issues := self.mirror.issues_updated_since(seconds)) is not None:
+                    return self.from_mirror(issues, fields)
+            if jira_issues := self.query(jql, fields):
                 return jira_issues
             else:
                 return []
@@ -805,13 +969,16 @@ class JiraClientCore:
         field: list[str],
         since: int = 4,
         timeframe: str = "h",  # d = days, h = hours, m = minutes
+        fields: str | tuple[str, ...] = None,
     ) -> list[JiraIssue]:
-        """timeframe: str -> d = days, h = hours, m = minutes"""
+        """timeframe: str -> d = days, h = hours, m = minutes
+
+        fields: `self.field_map.key_fields` by default"""
         self.logger.info(
             f"Query Jira issues where the field {field} were "
             f"updated in the past {since} {timeframe}."
         )
-
+        fields = fields or self.field_map.key_fields
         jql = (
             f"{self.base_jql}"
             f'AND "{field}" is not EMPTY '
@@ -819,7 +986,12 @@ class JiraClientCore:
         )
 
         try:
-            if jira_issues := self.query(jql):
+            if self.mirror and (field_id := self._field_id(field)):
+                seconds = since * TIMEFRAME_SECONDS.get(timeframe, 3600)
+                issues = self.mirror.issues_updated_since(seconds, field_id)
+                if issues is not None:
+                    return self.from_mirror(issues, fields)
+            if jira_issues := self.query(jql, fields):
                 return jira_issues
             else:
                 return []
@@ -829,22 +1001,79 @@ class JiraClientCore:
             )
             return []
 
-    def update_field(self, jira_id: str, field_name: str, field_value: str) -> bool:
-        """Post a new field value for Jira issue ID to Jira API server"""
-        self.logger.debug(f"Adding new {field_name} to Jira issue {jira_id}")
-        jql = f'project = {self.project_key} AND key = "{jira_id}"'
-        jira_issue_list: list = self.query(jql)
-        if not jira_issue_list:
-            self.logger.warning(
-                f'Jira ticket "{jira_id}" not found in project ' f"{self.project_key}"
-            )
-        jira_issue: JiraIssueCore = jira_issue_list[0]
-        _id = jira_issue._id
+    def _field_id(self, field: str) -> str | None:
+        """The id of the Jira FIELD name (e.g. "Question to OEM")."""
+        if field.startswith("customfield_"):
+            return field
+        try:
+            return self._session()._fields_cache.get(field)
+        except (JIRAError, JiraMissingConnectionError) as e:
+            self.logger.warning(f"Failed to get the id of Jira field {field}: {e}")
+
+    def _put_issue(
+        self, issue: JiraIssueCore | str, body: dict, return_issue: bool = False
+    ) -> dict | None:
+        """One PUT of BODY ("fields" and/or "update") to ISSUE, a loaded issue
+        or a key. With RETURN_ISSUE, the raw issue sent back in the response
+        (None if the server does not send it, e.g. Jira Server)."""
         jira_client: JIRA = self._session()
-        jira_client.issue(_id).update(fields={field_name: field_value})
-        if field_value in jira_client.issue(_id).get_field(field_name):
+        url = jira_client._get_url(f"issue/{issue_ref(issue)}")
+        params = {"returnIssue": "true"} if return_issue else None
+        response = jira_client._session.put(url, params=params, data=json.dumps(body))
+        if return_issue and response.status_code == 200 and response.text:
+            return response.json()
+
+    def write_fields(
+        self, issue: JiraIssueCore | str, fields: dict, verify: bool = False
+    ) -> bool | None:
+        """Set the FIELDS (field id: value) of ISSUE, a loaded issue or a key,
+        with a single request. With VERIFY, the values are checked in the
+        issue sent back by the server. A loaded issue gets the new values."""
+        jira_id = issue.jira_id if isinstance(issue, JiraIssueCore) else issue
+        try:
+            raw = self._put_issue(issue, {"fields": fields}, return_issue=verify)
+        except JIRAError as e:
+            self.logger.error(
+                f"Failed to update {', '.join(fields)} of Jira issue {jira_id}: "
+                f"{e.status_code}: {e.text}",
+                jira_id=jira_id,
+            )
+            return
+        written = JiraIssueCore(raw) if raw else None
+        if verify and not written:
+            self.logger.debug(
+                f"No issue in the response, {', '.join(fields)} not verified",
+                jira_id=jira_id,
+            )
+        for field_name, field_value in fields.items():
+            if written:
+                new_value = written.get_field(field_name)
+                # e.g. a text the server returns with a few more line breaks
+                if new_value != field_value and not (
+                    isinstance(field_value, str) and field_value in str(new_value)
+                ):
+                    self.logger.error(
+                        f"Failed to post new {field_name} to Jira issue {jira_id}",
+                        jira_id=jira_id,
+                    )
+                    return
+            if isinstance(issue, JiraIssueCore):
+                issue.set_field(field_name, field_value)
+        return True
+
+    def update_field(
+        self,
+        jira_issue: JiraIssueCore | str,
+        field_name: str,
+        field_value: str,
+        verify: bool = False,
+    ) -> bool:
+        """Post a new field value for a Jira issue (or key) to Jira API server"""
+        jira_id = getattr(jira_issue, "jira_id", jira_issue)
+        self.logger.debug(f"Adding new {field_name} to Jira issue {jira_id}")
+        if self.write_fields(jira_issue, {field_name: field_value}, verify):
             self.logger.info(
-                f"Posted succesfully new {field_name} to Jira {jira_issue.ui_url}",
+                f"Posted succesfully new {field_name} to Jira issue {jira_id}",
                 jira_id=jira_id,
             )
             return True
@@ -854,44 +1083,79 @@ class JiraClientCore:
             jira_id=jira_id,
         )
 
-    def update_description(self, jira_id: str, description: str) -> bool:
+    def update_description(
+        self, jira_issue: JiraIssueCore | str, description: str
+    ) -> bool:
         """Post a new description to Jira API server"""
-        return self.update_field(jira_id, "description", description)
-
-    def update_status(self, jira_id: str, new_status: str, comment: str) -> bool:
-        self.logger.debug(f"Adding new status to Jira issue {jira_id}")
-        jql = f'project = {self.project_key} AND key = "{jira_id}"'
-        jira_issue_list: list = self.query(jql)
-        if not jira_issue_list:
-            self.logger.warning(
-                f'Jira ticket "{jira_id}" not found in project {self.project_key}'
-            )
-        jira_issue: JiraIssueCore = jira_issue_list[0]
-        _id = jira_issue._id
+        return self.update_field(jira_issue, "description", description)
+
+    def _transition(self, issue: JiraIssueCore | str, new_status: str) -> dict | None:
+        """The transition of ISSUE to NEW_STATUS (id and "to" status). Kept per
+        project, issue type and current status of a loaded issue, the
+        workflow is then not requested again for the next issue."""
+        key = None
+        if isinstance(issue, JiraIssueCore) and issue.status and issue.issue_type:
+            key = (issue.project, issue.issue_type, issue.status, new_status)
+            if key in self._transitions:
+                return self._transitions[key]
         jira_client: JIRA = self._session()
-        issue = jira_client.issue(_id)
-
-        transitions = jira_client.transitions(issue)
-        transition_id = None
-        for transition in transitions:
+        for transition in jira_client.transitions(issue_ref(issue)):
             if transition["to"]["name"] == new_status:
-                transition_id = transition["id"]
-                break
+                if key:
+                    self._transitions[key] = transition
+                return transition
 
-        if transition_id is None:
+    def transition_to(
+        self, issue: JiraIssueCore | str, new_status: str, comment: str = None
+    ) -> bool | None:
+        """Move ISSUE, a loaded issue or a key, to NEW_STATUS: a single
+        transition request once its transition is known (see `_transition()`).
+        A loaded issue gets the new status."""
+        jira_id = issue.jira_id if isinstance(issue, JiraIssueCore) else issue
+        transition = self._transition(issue, new_status)
+        if not transition:
             self.logger.error(
-                f"Failed to update status to {new_status} "
-                f"to Jira {jira_issue.ui_url}",
+                f"No transition to {new_status} for Jira issue {jira_id}",
                 jira_id=jira_id,
             )
             return
-
-        jira_client.transition_issue(issue, transition_id, comment=comment)
+        try:
+            jira_client: JIRA = self._session()
+            jira_client.transition_issue(
+                issue_ref(issue), transition["id"], comment=comment
+            )
+        except JIRAError as e:
+            # a kept transition may no longer apply (e.g. workflow changed)
+            self._transitions.clear()
+            self.logger.error(
+                f"Failed to update status to {new_status} of Jira issue "
+                f"{jira_id}: {e.status_code}: {e.text}",
+                jira_id=jira_id,
+            )
+            return
+        if isinstance(issue, JiraIssueCore):
+            issue.set_field(self.field_map.status, transition["to"])
+            if comment:  # the sync cycle comments of the issue are outdated
+                self._comments.pop(issue._id, None)
+        elif comment:
+            self._comments.clear()
+        return True
+
+    def update_status(
+        self, jira_issue: JiraIssueCore | str, new_status: str, comment: str
+    ) -> JiraIssueCore | None:
+        """Transition a Jira issue to NEW_STATUS, return it with the new status.
+        Only a key is requested again from Jira."""
+        jira_id = getattr(jira_issue, "jira_id", jira_issue)
+        self.logger.debug(f"Adding new status to Jira issue {jira_id}")
+        if not self.transition_to(jira_issue, new_status, comment):
+            return
         self.logger.info(
-            f"Posted succesfully new status {new_status} "
-            f"to Jira {jira_issue.ui_url}",
+            f"Posted succesfully new status {new_status} to Jira issue {jira_id}",
             jira_id=jira_id,
         )
+        if isinstance(jira_issue, JiraIssueCore):
+            return jira_issue
         return self.issue(jira_id)
 
     def post_sync_report(
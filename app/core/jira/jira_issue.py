@@ -9,7 +9,7 @@ from jira import Issue, JIRA
 from jira.exceptions import JIRAError
 
 # project core
-from app.core.custom_logger import logger
+from app.core.custom_logger import deferred_logger, logger
 from app.core.utils import convert_size
 from app.core.jira.jira_map import JiraFieldsMapCore
 from app.core.jira.exceptions import JiraApiError
@@ -29,7 +29,6 @@ class JiraIssueCore(JiraIssue):
     __jira_id = ""
     __id = ""
     logger = logger
-    _output_ok_for_str_format = None
 
     @property
     def url(self) -> str:
@@ -166,26 +165,16 @@ class JiraIssueCore(JiraIssue):
         return self.as_yaml()
 
     def output_ok(self) -> bool:
-        # fields values (description field usually) contain code that might
-        # cause str format KeyError when added to logs
-        # e.g. src:DiagServiceEvents.hpp|lin:211|p_output:
-        # {"domainRepairInstructionId":1,"errorCode":50462751, ...
-        if self._output_ok_for_str_format is not None:
-            return self._output_ok_for_str_format
-        try:
-            jira_yml = self.get_all_fields_as_yaml()
-            self.logger.debug(
-                f"Checking JiraIssue for sync: \n{jira_yml}",
-                jira_id=self.jira_id,
-            )
-            self._output_ok_for_str_format = True
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"logger failed to display value for Jira Id {self.jira_id}, "
-                f"due to {e}"
-            )
-            self._output_ok_for_str_format = False
-        return self._output_ok_for_str_format
+        """Log all the fields to check the issue before the sync.
+
+        Always True: the fields (e.g. descriptions with "{...}" code) are a
+        deferred payload, never `str.format`-ed, rendered only if DEBUG is on."""
+        deferred_logger.debug(
+            "Checking JiraIssue for sync: \n{}",
+            self.get_all_fields_as_yaml,
+            jira_id=self.jira_id,
+        )
+        return True
 
     def update_fields(self, jira_client: JIRA, fields_and_new_values: dict):
         server_issue: Issue = jira_client.issue(self._id)
@@ -205,20 +194,15 @@ class JiraIssueCore(JiraIssue):
 
             server_issue.update(fields=update_fields_dict, jira=jira_client)
 
-            self.logger.info(
-                f"Successfully updated custom fields {update_fields_dict.keys()} "
-                "to jira server",
+            deferred_logger.info(
+                "Successfully updated custom fields {} to jira server",
+                update_fields_dict.keys(),
                 jira_id=self.jira_id,
             )
         except (JiraApiError, JIRAError) as e:
             self.logger.error(
                 f"Failed to update fields to jira server due to Jira error: {e} ",
             )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"logger failed to display bulk fields update dict due to {e}",
-                jira_id=self.jira_id,
-            )
         except Exception:
             self.logger.error(
                 "Failed to update fields to jira server. ",
@@ -245,28 +229,18 @@ class JiraIssueCore(JiraIssue):
             if jira_ui_field_name not in fields_to_update:
                 continue
             field_value = self.get_field(custom_field_name)
-            try:
-                self.logger.debug(
-                    f"updating [{jira_ui_field_name}] to\n{field_value}",
-                    jira_id=self.jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.error(
-                    f"logger failed to display value for updating [{jira_ui_field_name}]"  # noqa: E501
-                    f" for Jira Id {self.jira_id}, due to {e}"
-                )
+            deferred_logger.debug(
+                "updating [{}] to\n{}",
+                jira_ui_field_name,
+                field_value,
+                jira_id=self.jira_id,
+            )
             update_fields_dict[custom_field_name] = field_value
         if not update_fields_dict:
-            try:
-                self.logger.info(
-                    "No custom fields to update to jira server. ",
-                    jira_id=self.jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"logger failed to display value for "
-                    f"Jira Id {self.jira_id}, due to {e}"
-                )
+            self.logger.info(
+                "No custom fields to update to jira server. ",
+                jira_id=self.jira_id,
+            )
             return
         try:
             self.logger.info(
@@ -274,19 +248,15 @@ class JiraIssueCore(JiraIssue):
                 f"for jira_id {self.jira_id}"
             )
             server_issue.update(fields=update_fields_dict, jira=jira_client)
-            self.logger.info(
-                f"Successfully updated custom fields {fields_to_update} to jira server",
+            deferred_logger.info(
+                "Successfully updated custom fields {} to jira server",
+                fields_to_update,
                 jira_id=self.jira_id,
             )
         except (JiraApiError, JIRAError) as e:
             self.logger.error(
                 f"Failed to update fields to jira server due to Jira error: {e} ",
             )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"logger failed to display bulk fields update dict due to {e}",
-                jira_id=self.jira_id,
-            )
         except Exception:
             self.logger.error(
                 "Failed to update fields to jira server. ",
@@ -26,6 +26,12 @@ class JiraFieldsMapCore:
     def extras(self) -> ExtraFieldsMapCore:
         pass
 
+    @property
+    def key_fields(self) -> tuple[str, ...]:
+        """Smallest search projection, for the queries only telling issues apart
+        (id, key and self are part of every search result)."""
+        return (self.status,)
+
     def __repr__(self) -> str:
         dc = asdict(self)
         dc["extras"] = asdict(self.extras)
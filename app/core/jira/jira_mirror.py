@@ -0,0 +1,283 @@
+# standard
+from datetime import datetime
+from math import ceil
+from pathlib import Path
+from threading import Lock
+from time import time
+import json
+import re
+import sqlite3
+
+# project core
+from app.core.custom_logger import logger
+from app.core.core_config import (
+    JIRA_MIRROR_DB,
+    JIRA_MIRROR_FULL_REFRESH_HOURS,
+    JIRA_MIRROR_MAX_AGE_SECONDS,
+    JIRA_MIRROR_OVERLAP_MINUTES,
+)
+from app.core.sync_fingerprints import fingerprint
+
+
+# part of every issue (not requested as fields)
+ISSUE_KEYS = ("id", "key", "self")
+
+
+def jira_timestamp(value: str) -> float:
+    """Jira date time (e.g. "2024-05-06T10:02:44.123+0200") as a POSIX timestamp,
+    0 if missing or invalid."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class JiraIssueMirror:
+    """Local (SQLite) copy of the issues in the scope of a Jira client
+    (its `base_jql`), to answer the sync lookups without a search each.
+
+    Only FIELDS are mirrored: the ones the services read from the lookup
+    results (the key fields of the client and the reference field and
+    `updated` by default). A caller needing more fields reads the issues
+    found again by key (see `JiraClientCore.from_mirror()`).
+
+    Refreshed from Jira with one query for the issues updated since the
+    previous refresh (`updated >= -<minutes>m`, with some overlap), at
+    most every JIRA_MIRROR_MAX_AGE_SECONDS, and reloaded in full every
+    FULL_REFRESH_HOURS (e.g. issues moved out of the scope; never if None).
+
+    An issue handed out by the mirror may then be updated by the sync
+    itself: until the next refresh it is not handed out again, the callers
+    fall back to Jira for it. Every lookup returns None when it can not be
+    answered locally.
+    """
+
+    def __init__(
+        self,
+        client,
+        service: str,
+        reference_field: str,
+        fields: tuple[str, ...] = None,
+        db_path: str = JIRA_MIRROR_DB,
+        full_refresh_hours: float | None = JIRA_MIRROR_FULL_REFRESH_HOURS,
+    ) -> None:
+        self.client = client
+        self.service = service
+        self.reference_field = reference_field
+        fields = client.field_map.key_fields if fields is None else fields
+        self.fields = tuple(dict.fromkeys((*fields, reference_field, "updated")))
+        self.full_refresh_hours = full_refresh_hours
+        self.db_path = Path(db_path)
+        self.logger = logger
+        self._lock = Lock()
+        self._refreshed_at = 0.0  # by this process
+        self._handed_out: set[str] = set()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        new_numbers_index = not self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'reference_numbers'"
+        ).fetchone()
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS issues ("
+                "scope TEXT, jira_id TEXT, reference TEXT, updated REAL, raw TEXT, "
+                "PRIMARY KEY (scope, jira_id))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS refreshes ("
+                "scope TEXT PRIMARY KEY, service TEXT, jql TEXT, "
+                "delta_at REAL, full_at REAL)"
+            )
+            # the whole numbers (e.g. KPM IDs) in the reference of each issue
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reference_numbers ("
+                "scope TEXT, number TEXT, jira_id TEXT)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS reference_numbers_number "
+                "ON reference_numbers (scope, number)"
+            )
+            if new_numbers_index:  # the next refresh reloads (and indexes) all
+                self._db.execute("DELETE FROM refreshes")
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.service}, {self.db_path})"
+
+    @property
+    def scope(self) -> str:
+        """A new scope (a new mirror) when the JQL of the client
+        or the mirrored fields change."""
+        return fingerprint(self.service, self.client.base_jql, self.fields)
+
+    def covers(self, fields: str | tuple[str, ...]) -> bool:
+        """True if the mirrored issues have all of FIELDS."""
+        fields = (fields,) if isinstance(fields, str) else fields
+        return set(fields) <= {*self.fields, *ISSUE_KEYS}
+
+    def _last_refresh(self) -> tuple[float, float]:
+        row = self._db.execute(
+            "SELECT delta_at, full_at FROM refreshes WHERE scope = ?", (self.scope,)
+        ).fetchone()
+        return row if row else (0.0, 0.0)
+
+    def refresh(self, force_full: bool = False) -> int:
+        """Bring the mirror up to date, return the number of issues read."""
+        with self._lock:
+            return self._refresh(force_full)
+
+    def _refresh(self, force_full: bool) -> int:
+        start = time()
+        delta_at, full_at = self._last_refresh()
+        full = force_full or not full_at
+        if self.full_refresh_hours is not None:
+            full = full or start - full_at > self.full_refresh_hours * 3600
+        jql = self.client.base_jql
+        if not full:
+            minutes = ceil((start - delta_at) / 60) + JIRA_MIRROR_OVERLAP_MINUTES
+            jql = f"{jql} AND updated >= -{minutes}m"
+        rows = [
+            (
+                self.scope,
+                issue.jira_id,
+                str(issue.get_field(self.reference_field) or ""),
+                jira_timestamp(issue.get_field("updated")),
+                json.dumps(issue.raw),
+            )
+            for issue in self.client.iter_query(jql, self.fields)
+        ]
+        numbers = [
+            (scope, number, jira_id)
+            for scope, jira_id, reference, *_ in rows
+            for number in set(re.findall(r"\d+", reference))
+        ]
+        with self._db:
+            if full:
+                self._db.execute("DELETE FROM issues WHERE scope = ?", (self.scope,))
+                self._db.execute(
+                    "DELETE FROM reference_numbers WHERE scope = ?", (self.scope,)
+                )
+            else:
+                self._db.executemany(
+                    "DELETE FROM reference_numbers WHERE scope = ? AND jira_id = ?",
+                    [(scope, jira_id) for scope, jira_id, *_ in rows],
+                )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.executemany(
+                "INSERT INTO reference_numbers VALUES (?, ?, ?)", numbers
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO refreshes VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.scope,
+                    self.service,
+                    self.client.base_jql,
+                    start,
+                    start if full else full_at,
+                ),
+            )
+        self._refreshed_at = start
+        # the issues updated by the sync since the last refresh are fresh again
+        self._handed_out.clear()
+        self.logger.info(
+            f"Jira mirror {'reloaded' if full else 'refreshed'}: "
+            f"{len(rows)} issues in {time() - start:.1f}s"
+        )
+        return len(rows)
+
+    def _fresh(self) -> bool:
+        """Refresh the mirror if it is older than JIRA_MIRROR_MAX_AGE_SECONDS.
+        False if it could not be refreshed (lookups go to Jira)."""
+        if time() - self._refreshed_at <= JIRA_MIRROR_MAX_AGE_SECONDS:
+            return True
+        try:
+            self._refresh(force_full=False)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to refresh the Jira mirror: {e}")
+            return False
+
+    def _hand_out(self, jira_ids: list[str]) -> list[dict] | None:
+        """The raw issues JIRA_IDS, None if there are none or one of them
+        was already handed out since the last refresh."""
+        if not jira_ids or any(jira_id in self._handed_out for jira_id in jira_ids):
+            return
+        self._handed_out.update(jira_ids)
+        placeholders = ", ".join("?" * len(jira_ids))
+        return [
+            json.loads(raw)
+            for (raw,) in self._db.execute(
+                f"SELECT raw FROM issues WHERE scope = ? "
+                f"AND jira_id IN ({placeholders})",
+                (self.scope, *jira_ids),
+            )
+        ]
+
+    def issues_by_number(self, number: str) -> list[dict] | None:
+        """The raw issues with NUMBER (e.g. a KPM ID) as a whole number in
+        their reference field, looked up in an index. None if not answered
+        locally, including when no issue matches (it may have been created
+        since)."""
+        with self._lock:
+            if not self._fresh():
+                return
+            jira_ids = [
+                jira_id
+                for (jira_id,) in self._db.execute(
+                    "SELECT jira_id FROM reference_numbers "
+                    "WHERE scope = ? AND number = ?",
+                    (self.scope, number),
+                )
+            ]
+            return self._hand_out(jira_ids)
+
+    def issues_by_reference(self, pattern: str) -> list[dict] | None:
+        """The raw issues whose reference field matches the regex PATTERN,
+        e.g. a Jira key as text. None if not answered locally, including
+        when no issue matches (it may have been created since)."""
+        regex = re.compile(pattern)
+        with self._lock:
+            if not self._fresh():
+                return
+            jira_ids = [
+                jira_id
+                for jira_id, reference in self._db.execute(
+                    "SELECT jira_id, reference FROM issues WHERE scope = ?",
+                    (self.scope,),
+                )
+                if regex.search(reference)
+            ]
+            return self._hand_out(jira_ids)
+
+    def issues_updated_since(
+        self, seconds: float, not_empty_field: str = None
+    ) -> list[dict] | None:
+        """The raw issues updated in the past SECONDS (and with a value for
+        the field id NOT_EMPTY_FIELD). None if not answered locally."""
+        if not_empty_field and not self.covers(not_empty_field):
+            return
+        with self._lock:
+            if self._handed_out:  # maybe updated by the sync since
+                self._refreshed_at = 0.0
+            if not self._fresh():
+                return
+            issues = [
+                json.loads(raw)
+                for (raw,) in self._db.execute(
+                    "SELECT raw FROM issues WHERE scope = ? AND updated >= ? "
+                    "ORDER BY updated DESC",
+                    (self.scope, time() - seconds),
+                )
+            ]
+        if not_empty_field:
+            issues = [
+                issue
+                for issue in issues
+                if issue.get("fields", {}).get(not_empty_field) not in (None, "", [])
+            ]
+        return issues
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,102 @@
+# standard
+from datetime import datetime
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+import json
+import sqlite3
+
+# project core
+from app.core.custom_logger import logger
+from app.core.core_config import SYNC_FINGERPRINTS_DB
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of the inputs of a sync phase (str, bytes, lists, dicts ...)."""
+    digest = sha1()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        digest.update(part)
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SyncFingerprintStore:
+    """Persistent (SQLite) fingerprints of the inputs of each sync phase
+    of a ticket, e.g. ("9029473", "attachments") -> hash of the KPM document
+    ids and sizes. A phase whose inputs have the same fingerprint as after
+    its last successful run has nothing new to sync and can be skipped.
+    """
+
+    def __init__(self, service: str, db_path: str = SYNC_FINGERPRINTS_DB) -> None:
+        self.service = service
+        self.db_path = Path(db_path)
+        self.logger = logger
+        self._lock = Lock()
+        # (ticket_id, phase) -> fingerprint, saved by `release()`
+        self._held: dict[tuple[str, str], str] = {}
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "service TEXT, ticket_id TEXT, phase TEXT, fingerprint TEXT, "
+                "updated_at TEXT, PRIMARY KEY (service, ticket_id, phase))"
+            )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.service}, {self.db_path})"
+
+    def get(self, ticket_id: str, phase: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint FROM fingerprints "
+                "WHERE service = ? AND ticket_id = ? AND phase = ?",
+                (self.service, str(ticket_id), phase),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, ticket_id: str, phase: str, value: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.service,
+                    str(ticket_id),
+                    phase,
+                    value,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def hold(self, ticket_id: str, phase: str, value: str) -> None:
+        """Keep the fingerprint of a phase not confirmed yet (e.g. a post
+        verified at the end of the sync cycle) until `release()`."""
+        with self._lock:
+            self._held[(str(ticket_id), phase)] = value
+
+    def release(self, failed_ticket_ids=()) -> None:
+        """Save the held fingerprints, but the ones of FAILED_TICKET_IDS:
+        their phases run again on the next sync."""
+        failed = {str(ticket_id) for ticket_id in failed_ticket_ids}
+        with self._lock:
+            held, self._held = self._held, {}
+        for (ticket_id, phase), value in held.items():
+            if ticket_id not in failed:
+                self.put(ticket_id, phase, value)
+
+    def unchanged(self, ticket_id: str, phase: str, value: str) -> bool:
+        return value is not None and self.get(ticket_id, phase) == value
+
+    def forget(self, ticket_id: str) -> None:
+        """Drop all the fingerprints of a ticket (next sync is a full one)."""
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM fingerprints WHERE service = ? AND ticket_id = ?",
+                (self.service, str(ticket_id)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -50,10 +50,10 @@ def setup_logging():
 
 
 def xml_to_dict(xml_elem: str | ET.Element) -> dict:
-    if isinstance(xml_elem, ET.Element):
-        root = xml_elem
-    elif isinstance(xml_elem, str):
+    if isinstance(xml_elem, str):
         root = ET.fromstring(xml_elem)
+    else:  # ElementTree or lxml element
+        root = xml_elem
     result = {}
     for child in root:
         if len(child) == 0:
@@ -88,8 +88,14 @@ def check_disk_space_left(path: str = ".") -> float:
     return free_percentage
 
 
-def clean_cache_dir(cache_dir: str, older_than_days: int = 4):
+def clean_cache_dir(
+    cache_dir: str, older_than_days: int = 4, keep_dirs: list[str] = None
+):
+    """Remove the daily (YYYY-MM-DD) sub dirs older than OLDER_THAN_DAYS.
+
+    keep_dirs: persistent cache dirs that are not daily dirs and must be kept."""
     logger.info(f"Cleaning cache dir [{cache_dir}]")
+    keep_dirs = [Path(keep_dir).name for keep_dir in keep_dirs or []]
     if check_disk_space_left(cache_dir) < 5:
         older_than_days = 1
     elif check_disk_space_left(cache_dir) < 10 and older_than_days > 1:
@@ -99,6 +105,8 @@ def clean_cache_dir(cache_dir: str, older_than_days: int = 4):
         limit = datetime.now() - timedelta(days=older_than_days)
 
         for dir_name in dirs:
+            if dir_name in keep_dirs:
+                continue
             try:
                 if datetime.strptime(dir_name, "%Y-%m-%d") < limit:
                     logger.info(f"Removing old cache dir: {dir_name}")
@@ -2,6 +2,7 @@
 
 
 # project core
+from app.core.custom_logger import deferred_logger
 from app.core.jira.jira_client import JiraClientCore
 
 # project extension - jira_audi
@@ -53,26 +54,12 @@ class VwAudiJiraClient(JiraClientCore):
                     f"Same Jira Issue Key [{hcp5_id}]for multiple Jira issues, "
                     f"based on the JQL: {jql}"
                 )
-                try:
-                    self.logger.error(msg, jira_id=hcp5_id)
-                except (ValueError, KeyError, IndexError) as e:
-                    self.logger.warning(
-                        f"{e} - loguru lib inconsistent custom "
-                        f'format error when adding "jira_id" extra'
-                    )
-                    self.logger.error(msg)
+                deferred_logger.error("{}", msg, jira_id=hcp5_id)
                 # raise MultipleJiraIssuesFound(msg)
                 return
             elif not single_issue:
                 msg = f"No issue found in Jira, based on the JQL: {jql}"
-                try:
-                    self.logger.error(msg, jira_id=hcp5_id)
-                except (ValueError, KeyError, IndexError) as e:
-                    self.logger.warning(
-                        f"{e} - loguru lib inconsistent custom "
-                        f'format error when adding "jira_id" extra'
-                    )
-                    self.logger.error(msg)
+                deferred_logger.error("{}", msg, jira_id=hcp5_id)
                 # raise IssueNotFound(msg)
                 return
             return single_issue[0]
@@ -66,25 +66,3 @@ class EsrLabsJiraIssue(JiraIssueCore):
             set_vrs.append({"value": vr})
         if set_vrs:
             return self.set_field(self.jira_map.audi_vr, set_vrs)
-
-    def output_ok(self) -> bool:
-        # fields values (description field usually) contain code that might
-        # cause str format KeyError when added to logs
-        # e.g. src:DiagServiceEvents.hpp|lin:211|p_output:
-        # {"domainRepairInstructionId":1,"errorCode":50462751, ...
-        if self._output_ok_for_str_format is not None:
-            return self._output_ok_for_str_format
-        try:
-            jira_yml = self.get_all_fields_as_yaml()
-            self.logger.debug(
-                f"Checking JiraIssue for sync: \n{jira_yml}",
-                jira_id=self.jira_id,
-            )
-            self._output_ok_for_str_format = True
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                "logger failed to display value for "
-                f"Jira Id {self.jira_id} , due to {e}"
-            )
-            self._output_ok_for_str_format = False
-        return self._output_ok_for_str_format
@@ -43,6 +43,17 @@ class EsrLabsAhcp5JiraFieldMap(JiraFieldsMapCore):
     def extras(self) -> EsrLabsAhcp5ExtraFieldsMap:
         return self.EsrLabsAhcp5ExtraFieldsMap()
 
+    @property
+    def key_fields(self) -> tuple[str, ...]:
+        """Status and KPM problem ID (External Reference)"""
+        return (self.status, self.external_reference)
+
+    @property
+    def overview_fields(self) -> tuple[str, ...]:
+        """Project, type, origin and reporter, e.g. to tell why
+        an issue does not match the JQL of the app config"""
+        return (self.project, "issuetype", self.origin, "reporter")
+
     def __repr__(self) -> str:
         dc = asdict(self)
         dc["extras"] = asdict(self.extras)
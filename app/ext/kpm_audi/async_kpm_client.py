@@ -0,0 +1,466 @@
+# standard
+import asyncio
+import os
+import ssl
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable
+
+# external
+import aiohttp
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+# project core
+from app.core.custom_logger import logger
+from app.core.core_config import ATTACHMENTS_VALIDATION_SIZE_TOLERANCE
+from app.core.utils import approximate_comparison, strip_date_prefix
+
+# project extension
+from app.ext.kpm_audi.exceptions import (
+    KPMApiError,
+    KpmConnectError,
+    KpmMissingConnectionError,
+    KpmRequestError,
+    KpmResponseError,
+)
+from app.ext.kpm_audi.kpm_client import ALREADY_POSTED, document_cache_path
+from app.ext.kpm_audi.process_step_cache import ProcessStepCache
+from app.ext.kpm_audi.transport import (
+    RETRY_ON_STATUS,
+    KpmTransportConfig,
+    OperationLatency,
+    PostVerifyConfig,
+)
+from app.ext.kpm_audi.soap_requests import (
+    DevelopmentProblemDataRequest,
+    MultipleProblemDataRequest,
+    ProcessStepListRequest,
+    ProcessStepRequest,
+    DocumentListRequest,
+    DocumentRequest,
+    AddSupplierResponseRequest,
+    AddSupplierQuestionRequest,
+)
+from app.ext.kpm_audi.soap_responses import (
+    DevelopmentProblemDataResponse,
+    MultipleProblemDataResponse,
+    ProcessStepListResponse,
+    ProcessStepResponse,
+    DocumentListResponse,
+    DocumentReference,
+    DocumentResponse,
+    AddSupplierQuestionResponse,
+    AddSupplierResponseResponse,
+)
+from app.ext.kpm_audi.soap_responses.xop_stream import XOP_STREAM_CHUNK_SIZE
+
+
+ASYNC_MAX_CONCURRENCY = 50
+ASYNC_RETRY_ON_EXCEPTIONS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class AsyncKPMClient:
+    """Asyncio SOAP client to consume the KPM web service.
+
+    Same operations as `KPMClient`, built on the same `soap_requests`
+    and `soap_responses`. At most `max_concurrency` requests are in flight,
+    the others wait for a free slot.
+
+    async with AsyncKPMClient(server, user, cert, inbox) as kpm:
+        issues = await asyncio.gather(*(kpm.issue(kpm_id) for kpm_id in kpm_ids))
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        user_id: str,
+        cert_path: str,
+        inbox: str,
+        post_back_to_kpm: bool = False,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+        step_cache: ProcessStepCache = None,
+        transport: KpmTransportConfig = None,
+        post_verify: PostVerifyConfig = None,
+    ) -> None:
+        """Initialize the async KPM client.
+
+        server  (str):  The full URL of the server to connect to.
+        user    (str):  The User ID to be used for the TLS authentication.
+        cert    (str):  The path to the TLS certificate to be used.
+        inbox   (str):  The inbox to be used for the requests.
+        max_concurrency (int):  The max number of requests in flight.
+        """
+        self.server = server_url
+        self.user = user_id
+        self.cert = cert_path
+        self.inbox = inbox
+        self.post_back_to_kpm = post_back_to_kpm
+        self.max_concurrency = max_concurrency
+        self.step_cache = step_cache or ProcessStepCache()
+        self.transport = transport or KpmTransportConfig()
+        self.latency = OperationLatency()
+        self.post_verify = post_verify or PostVerifyConfig()
+
+        self.logger = logger
+        self.session: aiohttp.ClientSession | None = None
+        self._limit = asyncio.Semaphore(max_concurrency)
+
+    async def connect(self) -> "AsyncKPMClient":
+        """Connect to a KPM server"""
+        if None in (self.server, self.user, self.cert):
+            raise KpmConnectError(
+                f"Please provide server {self.server}, "
+                f"user {self.user} and tls certificate {self.cert}."
+            )
+        self.logger.info(
+            f"Connecting async KPM client to {self.user}@{self.server} ... "
+        )
+        ssl_context = False  # plain http (e.g. local test server)
+        if self.server.startswith("https"):
+            ssl_context = ssl.create_default_context()
+            ssl_context.load_cert_chain(self.cert)
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            keepalive_timeout=60 if self.transport.keep_alive else None,
+            force_close=not self.transport.keep_alive,
+            ssl=ssl_context,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"Content-Type": "text/xml; charset=utf-8"},
+        )
+        return self
+
+    async def close(self) -> None:
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "AsyncKPMClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def __repr__(self):
+        self_name = f"{self.__class__.__name__} at {hex(id(self))}"
+        if self.session and self.server and self.user:
+            return f"{self.user}@{self.server} ({self_name})"
+        return self_name
+
+    def _session(self) -> aiohttp.ClientSession:
+        """Get a connection to the KPM client or raise `KpmMissingConnectionError`."""
+        if self.session:
+            return self.session
+        self.logger.error("Async KPM client not connected. Please connect first.")
+        raise KpmMissingConnectionError
+
+    @staticmethod
+    async def _read(response: aiohttp.ClientResponse) -> Response:
+        """Read the whole response as a `requests.Response` for the soap_responses"""
+        return _as_requests_response(response, await response.read())
+
+    async def _post(
+        self,
+        data: str,
+        action: str = None,
+        handler: Callable[[aiohttp.ClientResponse], Awaitable] = None,
+    ):
+        """Send a POST request with the given data and return the response
+        (read by HANDLER, by default the whole `requests.Response`)
+        or raise a KpmRequestError.
+
+        Same timeouts, retries and latency numbers as `KPMClient._post`."""
+        handler = handler or self._read
+        action = action or "UnknownRequest"
+        connect_timeout, read_timeout = self.transport.timeout(action)
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        retries = self.transport.retries if self.transport.can_retry(action) else 0
+        data = data.encode(encoding="utf-8")
+        for attempt in range(retries + 1):
+            start = perf_counter()
+            retry_reason = None
+            try:
+                async with self._limit:
+                    async with self._session().post(
+                        self.server, data=data, timeout=timeout
+                    ) as response:
+                        if attempt < retries and response.status in RETRY_ON_STATUS:
+                            retry_reason = f"HTTP {response.status}"
+                        else:
+                            result = await handler(response)
+            except KPMApiError:
+                self.latency.failed(action)
+                raise
+            except Exception as ex:
+                self.latency.failed(action)
+                if attempt < retries and isinstance(ex, ASYNC_RETRY_ON_EXCEPTIONS):
+                    await self._wait_before_retry(action, attempt, ex)
+                    continue
+                self.logger.error(f"Failed to post request {action}: {ex}")
+                raise KpmRequestError(ex) from ex
+            self.latency.record(action, perf_counter() - start)
+            if retry_reason:
+                await self._wait_before_retry(action, attempt, retry_reason)
+                continue
+            return result
+
+    async def _wait_before_retry(self, action: str, attempt: int, reason) -> None:
+        self.latency.retried(action)
+        delay = self.transport.backoff(attempt)
+        self.logger.warning(
+            f"Request {action} failed ({reason}). "
+            f"Retry {attempt + 1}/{self.transport.retries} in {delay:.2f} seconds"
+        )
+        await asyncio.sleep(delay)
+
+    async def issue(self, kpm_id: str) -> DevelopmentProblemDataResponse:
+        """Request Development Problem Data for given KPM ID."""
+        request = DevelopmentProblemDataRequest(kpm_id, self.user)
+        self.logger.info(f"Request KPM issue: {kpm_id}.", kpm_id=kpm_id)
+        response = await self._post(request.to_string(), request.action)
+        result = DevelopmentProblemDataResponse(response, kpm_id)
+        if result.is_valid():
+            return result
+
+    async def query(self, since: str) -> MultipleProblemDataResponse:
+        """Request multiple Development Problem Data for provided params."""
+        inbox = self.inbox
+        request = MultipleProblemDataRequest(self.user, since, inbox)
+        self.logger.info(f"Query KPM issues since {since} for project: {inbox}.")
+        result = await self._post(request.to_string(), request.action)
+        try:
+            response = MultipleProblemDataResponse(result)
+            issues = response.problem_references()
+            self.logger.debug(
+                f"Found {len(issues)} KPM issues for {inbox} since {since}"
+            )
+            return response
+        except Exception as ex:
+            raise KpmResponseError(ex) from ex
+
+    async def process_step_list(self, kpm_id: str) -> ProcessStepListResponse:
+        """Request Process Step List for given KPM ID."""
+        request = ProcessStepListRequest(kpm_id=kpm_id, user_id=self.user)
+        try:
+            result = await self._post(request.to_string(), request.action)
+            process_step_list = ProcessStepListResponse(result)
+            if process_step_list.is_valid():
+                return process_step_list
+        except Exception as ex:
+            self.logger.error(f"Exception: {ex}")
+
+    async def process_step(
+        self, kpm_id: str, step_id: str, last_change_date: str = ""
+    ) -> ProcessStepResponse | None:
+        """Request Process Step for given KPM ID and STEP ID.
+
+        With the step LAST_CHANGE_DATE the process step cache is used."""
+        if last_change_date:
+            # the cache reads (and writes) files: off the event loop
+            cached = await asyncio.to_thread(
+                self.step_cache.get, kpm_id, step_id, last_change_date
+            )
+            if cached:
+                return ProcessStepResponse(cached)
+        request = ProcessStepRequest(kpm_id, self.user, step_id)
+        self.logger.info(f"Requesting process step -> ID: {step_id} ", kpm_id=kpm_id)
+        try:
+            result = await self._post(request.to_string(), request.action)
+            response = ProcessStepResponse(result)
+            if response.is_valid():
+                if last_change_date:
+                    await asyncio.to_thread(
+                        self.step_cache.put, kpm_id, step_id, last_change_date, result
+                    )
+                return response
+        except Exception as ex:
+            self.logger.error(f"Exception: {ex}")
+
+    async def process_steps(
+        self, kpm_id: str, step_ids: list[str], last_change_dates: list[str] = None
+    ) -> list[ProcessStepResponse | None]:
+        """Request many Process Steps for given KPM ID concurrently,
+        in the order of `step_ids` (None for the failed ones)."""
+        last_change_dates = last_change_dates or [""] * len(step_ids)
+        return await asyncio.gather(
+            *(
+                self.process_step(kpm_id, step_id, last_change_date)
+                for step_id, last_change_date in zip(step_ids, last_change_dates)
+            )
+        )
+
+    async def get_document_list(self, kpm_id: str) -> list[DocumentReference]:
+        """Request document list for given KPM ID"""
+        request = DocumentListRequest(kpm_id, self.user)
+        self.logger.info("Requesting document list from KPM.", kpm_id=kpm_id)
+        try:
+            result = await self._post(request.to_string(), request.action)
+            response = DocumentListResponse(result)
+            if response.is_valid():
+                return response.as_list
+        except Exception as ex:
+            self.logger.error(f"Exception: {ex}")
+
+    async def get_document(
+        self, kpm_id: str, doc_id: str, doc_name: str, suffix: str, size: str
+    ) -> str | None:
+        """Request document (attachment) for given KPM ID and DOC ID.
+
+        The attachment is streamed to the local cache (same as `KPMClient`),
+        return the path of the cached file."""
+        self.logger.info(
+            f"Requesting document (attachment) -> ID: {doc_id} ", kpm_id=kpm_id
+        )
+        full_path = document_cache_path(kpm_id, doc_id, doc_name, suffix, size)
+        max_size = int(size) + ATTACHMENTS_VALIDATION_SIZE_TOLERANCE
+
+        async def save_document(response: aiohttp.ClientResponse) -> DocumentResponse:
+            document = DocumentResponse(_as_requests_response(response, b""))
+            if not document.has_xop_attachment():
+                document.raw._content = await response.read()
+                return document
+            # the file is opened, written and moved in a worker thread,
+            # the event loop only receives the chunks
+            writer = document.attachment_writer(full_path, max_size)
+            parser = await asyncio.to_thread(writer.__enter__)
+            try:
+                async for chunk in response.content.iter_chunked(XOP_STREAM_CHUNK_SIZE):
+                    await asyncio.to_thread(parser.feed, chunk)
+            except BaseException as ex:
+                if not await asyncio.to_thread(
+                    writer.__exit__, type(ex), ex, ex.__traceback__
+                ):
+                    raise
+            else:
+                await asyncio.to_thread(writer.__exit__, None, None, None)
+            return document
+
+        try:
+            if await asyncio.to_thread(self._cached_file, full_path, size):
+                self.logger.warning(f"KPM file {full_path} already exists.")
+                return full_path
+            request = DocumentRequest(kpm_id, self.user, doc_id)
+            document = await self._post(
+                request.to_string(), request.action, save_document
+            )
+            if not document.is_valid() or not Path(full_path).is_file():
+                return
+            if not await asyncio.to_thread(self._valid_size, full_path, size):
+                self.logger.error(
+                    f"Attachment size mismatch for {full_path}", kpm_id=kpm_id
+                )
+            return full_path
+        except Exception as ex:
+            self.logger.error(
+                f"Get XML SOAP MTOM/XOP Attachment Exception "
+                f"for {kpm_id=} {doc_id=} {doc_name=} {suffix=} {size=} : {ex}"
+            )
+
+    @classmethod
+    def _cached_file(cls, path: str, size: str) -> bool:
+        return Path(path).is_file() and cls._valid_size(path, size)
+
+    @staticmethod
+    def _valid_size(path: str, size: str) -> bool:
+        tolerance = ATTACHMENTS_VALIDATION_SIZE_TOLERANCE
+        return abs(os.stat(path).st_size - int(size)) <= tolerance
+
+    async def get_last_step_of_type(
+        self, kpm_id: str, step_type_desc: str
+    ) -> ProcessStepResponse | None:
+        """get last from feedback list / last of type description
+
+        e.g. : Lieferantenaussage, Rückfrage"""
+        process_steps = await self.process_step_list(kpm_id)
+        if not process_steps:
+            return
+        for step in process_steps.as_list:
+            if step.step_type_desc == step_type_desc:
+                return await self.process_step(
+                    step.problem_number, step.step_id, step.last_change_date
+                )
+
+    async def post_supplier_response(
+        self, kpm_id: str, ticket_id: str, status: str, text: str
+    ) -> bool | str | None:
+        """Same as `KPMClient.post_supplier_response`
+
+        return: True if successful, None if failed to post,
+        'already_posted' if text already present in last "Lieferantenaussage"
+        """
+        text = text.strip()
+        request = AddSupplierResponseRequest(kpm_id, self.user, ticket_id, status, text)
+        return await self._post_and_verify(
+            kpm_id, "Lieferantenaussage", text, request, AddSupplierResponseResponse
+        )
+
+    async def post_supplier_question(
+        self, kpm_id: str, question: str
+    ) -> bool | str | None:
+        """Same as `KPMClient.post_supplier_question`
+
+        return: True if successful, None if failed to post,
+        'already_posted' if question already present in last "Rückfrage"
+        """
+        question = question.strip()
+        request = AddSupplierQuestionRequest(kpm_id, self.user, question)
+        return await self._post_and_verify(
+            kpm_id, "Rückfrage", question, request, AddSupplierQuestionResponse
+        )
+
+    async def _post_and_verify(
+        self, kpm_id: str, step_type_desc: str, text: str, request, response_class
+    ) -> bool | str | None:
+        """Post a new process step of STEP_TYPE_DESC (if not already the last one)
+        and check it is the last one afterwards."""
+        self.logger.info(f'Will add new "{step_type_desc}" ... ', kpm_id=kpm_id)
+        current = await self.get_last_step_of_type(kpm_id, step_type_desc)
+        if current and text and approximate_comparison(text, current.for_jira_ui):
+            self.logger.warning(
+                f"Nothing new to post: [{strip_date_prefix(text)}] "
+                f'already in last "{step_type_desc}" ',
+                kpm_id=kpm_id,
+            )
+            return ALREADY_POSTED
+        data = request.to_string()
+        if not self.post_back_to_kpm:
+            self.logger.warning(
+                f"POST BACK TO KPM is set to FALSE. "
+                f"Just showing the {request.action} data:\n{data}"
+            )
+            return
+        err_msg = f'❌ ❌ New "{step_type_desc}" POST to KPM -> FAILED ❌ ❌'
+        response = await self._post(data, request.action)
+        if not response_class(response).is_valid():
+            self.logger.error(err_msg, kpm_id=kpm_id)
+            return
+
+        # KPM needs some time to add the new process step to the list:
+        # check with an exponential backoff until the deadline
+        # (not deferred: the other coroutines go on meanwhile)
+        deadline = perf_counter() + self.post_verify.deadline
+        for delay in self.post_verify.delays():
+            if perf_counter() + delay > deadline:
+                break
+            await asyncio.sleep(delay)
+            updated = await self.get_last_step_of_type(kpm_id, step_type_desc)
+            if updated and approximate_comparison(text, updated.for_jira_ui):
+                self.logger.info(
+                    f' ✅ ✅ New "{step_type_desc}" added successfully ✅ ✅',
+                    kpm_id=kpm_id,
+                )
+                return True
+        self.logger.error(err_msg, kpm_id=kpm_id)
+
+
+def _as_requests_response(response: aiohttp.ClientResponse, content: bytes) -> Response:
+    result = Response()
+    result.status_code = response.status
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.url = str(response.url)
+    result._content = content
+    return result
@@ -1,19 +1,22 @@
 # standard
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 import os
-from functools import lru_cache
-from time import sleep
+from time import perf_counter, sleep
 
 # external
 from requests import Response, Session
 
 # project core
-from app.core.custom_logger import logger
+from app.core.custom_logger import Deferred, deferred_logger, logger
 from app.core.core_config import (
     APP_CACHE_DIR,
     ATTACHMENTS_VALIDATION_SIZE_TOLERANCE,
 )
+from app.core.http_cassette import http_cassette
 from app.core.utils import approximate_comparison, strip_date_prefix
 
 # project extension
@@ -24,6 +27,14 @@ from app.ext.kpm_audi.exceptions import (
     KpmResponseError,
     KPMApiError,
 )
+from app.ext.kpm_audi.process_step_cache import ProcessStepCache
+from app.ext.kpm_audi.transport import (
+    RETRY_ON_EXCEPTIONS,
+    RETRY_ON_STATUS,
+    KpmTransportConfig,
+    OperationLatency,
+    PostVerifyConfig,
+)
 from app.ext.kpm_audi.soap_requests import (
     DevelopmentProblemDataRequest,
     MultipleProblemDataRequest,
@@ -48,6 +59,30 @@ from app.ext.kpm_audi.soap_responses import (
 
 
 ALREADY_POSTED = "already_posted"
+PROCESS_STEPS_MAX_WORKERS = 8
+
+
+def document_cache_path(
+    kpm_id: str, doc_id: str, doc_name: str, suffix: str, size: str
+) -> str:
+    """Path of a KPM document (attachment) in the local cache (dirs created)."""
+    now = datetime.now().date().strftime("%Y-%m-%d")
+    dir_path = f"{APP_CACHE_DIR}/{now}/kpmid_{kpm_id}/stepid_{doc_id}/size_{size}"
+    Path(dir_path).mkdir(parents=True, exist_ok=True)
+    return f"{dir_path}/{doc_name}.{suffix}"
+
+
+@dataclass
+class PendingPost:
+    """A process step posted to KPM, to be found in its Process Step List."""
+
+    kpm_id: str
+    step_type_desc: str  # e.g. Lieferantenaussage, Rückfrage
+    text: str
+    log_msg: str = ""
+
+    def __str__(self) -> str:
+        return f'KPM {self.kpm_id} "{self.step_type_desc}": {self.text[:100]}'
 
 
 class KPMClient:
@@ -60,6 +95,9 @@ class KPMClient:
         cert_path: str,
         inbox: str,
         post_back_to_kpm: bool = False,
+        step_cache: ProcessStepCache = None,
+        transport: KpmTransportConfig = None,
+        post_verify: PostVerifyConfig = None,
     ) -> None:
         """Initialize the KPM client.
 
@@ -67,12 +105,25 @@ class KPMClient:
         user    (str):  The User ID to be used for the TLS authentication.
         cert    (str):  The path to the TLS certificate to be used.
         inbox   (str):  The inbox to be used for the requests.
+        step_cache (ProcessStepCache):  The on-disk cache for process steps.
+        transport (KpmTransportConfig): Pool size, timeouts and retries settings.
+        post_verify (PostVerifyConfig): How to check the posts to KPM.
         """
         self.server = server_url
         self.user = user_id
         self.cert = cert_path
         self.inbox = inbox
         self.post_back_to_kpm = post_back_to_kpm
+        self.step_cache = step_cache or ProcessStepCache()
+        self.transport = transport or KpmTransportConfig()
+        self.latency = OperationLatency()
+        self.post_verify = post_verify or PostVerifyConfig()
+
+        # Development Problems fetched in the current sync cycle, by KPM ID
+        self._cycle_issues: dict[str, DevelopmentProblemDataResponse] = {}
+        self._cycle_depth = 0
+        # posts to KPM to verify at the end of the sync cycle (deferred mode)
+        self._pending_posts: list[PendingPost] = []
 
         self.logger = logger
         self.session = None
@@ -88,7 +139,9 @@ class KPMClient:
         session = Session()
         session.cert = self.cert
         session.headers.update({"Content-Type": "text/xml; charset=utf-8"})
-        self.session = session
+        self.session = self.transport.mount(session)
+        if cassette := http_cassette():
+            cassette.mount(self.session)
         return self
 
     def __repr__(self):
@@ -97,31 +150,65 @@ class KPMClient:
             return f"{self.user}@{self.server} ({self_name})"
         return self_name
 
-    def issue(self, kpm_id: str) -> DevelopmentProblemDataResponse:
-        """Request Development Problem Data for given KPM ID."""
-        data = DevelopmentProblemDataRequest(kpm_id, self.user).to_string()
+    @contextmanager
+    def sync_cycle(self):
+        """Scope of a sync cycle: every Development Problem is requested
+        only once from KPM and reused until the (outermost) cycle ends.
+        The posts still pending verification are checked at its end."""
+        self._cycle_depth += 1
+        try:
+            yield self
+        finally:
+            self._cycle_depth -= 1
+            if not self._cycle_depth:
+                self.verify_pending_posts()
+                self._cycle_issues.clear()
+
+    def forget_issue(self, kpm_id: str) -> None:
+        """Drop the Development Problem of the current sync cycle
+        (e.g. after posting to KPM, as its statuses will change)."""
+        self._cycle_issues.pop(str(kpm_id), None)
+
+    def development_problem(self, kpm_id: str) -> DevelopmentProblemDataResponse:
+        """Request Development Problem Data for given KPM ID (valid or not)
+        or get it from the current sync cycle."""
+        kpm_id = str(kpm_id)
+        if (result := self._cycle_issues.get(kpm_id)) is not None:
+            self.logger.debug("KPM issue found in sync cycle", kpm_id=kpm_id)
+            return result
+        request = DevelopmentProblemDataRequest(kpm_id, self.user)
+        data = request.to_string()
         self.logger.info(f"Request KPM issue: {kpm_id}.", kpm_id=kpm_id)
         # from app.core.utils import xml_to_yaml
         # print(xml_to_yaml(data))
-        response = self._post(data=data)
+        response = self._post(data=data, action=request.action)
         result = DevelopmentProblemDataResponse(response, kpm_id)
+        if self._cycle_depth:
+            self._cycle_issues[kpm_id] = result
+        return result
+
+    def issue(self, kpm_id: str) -> DevelopmentProblemDataResponse:
+        """Request Development Problem Data for given KPM ID."""
+        result = self.development_problem(kpm_id)
         if result.is_valid():
             return result
 
     def query(self, since: str) -> MultipleProblemDataResponse:
-        """Request multiple Development Problem Data for provided params."""
+        """Request multiple Development Problem Data for provided params.
+
+        The Problem References are not parsed yet: iterate over
+        `response.iter_problem_references()` to start working on the first
+        ones while the rest of the response is parsed."""
         inbox = self.inbox
-        data = MultipleProblemDataRequest(self.user, since, inbox).to_string()
+        request = MultipleProblemDataRequest(self.user, since, inbox)
+        data = request.to_string()
         self.logger.info(f"Query KPM issues since {since} for project: {inbox}.")
-        result = self._post(data=data)
+        result = self._post(data=data, action=request.action)
         try:
             response = MultipleProblemDataResponse(result)
-            issues = response.problem_references()
-            self.logger.debug(
-                f"Found {len(issues)} KPM issues for {inbox} since {since}"
-            )
-            if response.is_valid():
-                return response
+            if not response.is_multipart():
+                # no MTOM/XOP parts: `xml()` raises with the KpmFault details
+                response.xml()
             return response
         except Exception as ex:
             raise KpmResponseError(ex) from ex
@@ -134,39 +221,80 @@ class KPMClient:
             self.logger.error("KPM client not connected. Please connect first.")
             raise KpmMissingConnectionError
 
-    def _post(self, data) -> Response:
+    def _post(self, data, action: str = None, stream: bool = False) -> Response:
         """Send a POST request with the given data and return the response
-        or raise a KpmRequestError."""
-        try:
-            result = self._session().post(
-                self.server, data=data.encode(encoding="utf-8")
-            )
+        or raise a KpmRequestError.
+
+        ACTION is the SOAP action of the request (e.g. "GetDocumentRequest"),
+        used for the timeouts, the retries (only for idempotent actions)
+        and the latency numbers.
+        STREAM: do not download the response content right away."""
+        action = action or "UnknownRequest"
+        timeout = self.transport.timeout(action)
+        retries = self.transport.retries if self.transport.can_retry(action) else 0
+        data = data.encode(encoding="utf-8")
+        for attempt in range(retries + 1):
+            start = perf_counter()
+            try:
+                result = self._session().post(
+                    self.server, data=data, timeout=timeout, stream=stream
+                )
+            except Exception as ex:
+                self.latency.failed(action)
+                if attempt < retries and isinstance(ex, RETRY_ON_EXCEPTIONS):
+                    self._wait_before_retry(action, attempt, ex)
+                    continue
+                self.logger.error(f"Failed to post request {action}: {ex}")
+                raise KpmRequestError(ex) from ex
+            self.latency.record(action, perf_counter() - start)
+            if attempt < retries and result.status_code in RETRY_ON_STATUS:
+                result.close()
+                self._wait_before_retry(action, attempt, f"HTTP {result.status_code}")
+                continue
             return result
-        except Exception as ex:
-            self.logger.error(f"Failed to post request: {ex}")
-            raise KpmRequestError(ex) from ex
+
+    def _wait_before_retry(self, action: str, attempt: int, reason) -> None:
+        self.latency.retried(action)
+        delay = self.transport.backoff(attempt)
+        self.logger.warning(
+            f"Request {action} failed ({reason}). "
+            f"Retry {attempt + 1}/{self.transport.retries} in {delay:.2f} seconds"
+        )
+        sleep(delay)
 
     def process_step_list(self, kpm_id: str) -> ProcessStepListResponse:
         """Request Process Step List for given KPM ID."""
-        data = ProcessStepListRequest(kpm_id=kpm_id, user_id=self.user).to_string()
+        request = ProcessStepListRequest(kpm_id=kpm_id, user_id=self.user)
+        data = request.to_string()
         # self.logger.debug(f"Request process step list for KPM issue {kpm_id} {data=}")
         try:
-            result = self._post(data=data)
+            result = self._post(data=data, action=request.action)
             process_step_list = ProcessStepListResponse(result)
             if process_step_list.is_valid():
                 return process_step_list
         except Exception as ex:
             self.logger.error(f"Exception: {ex}")
 
-    @lru_cache(maxsize=30)
-    def process_step(self, kpm_id: str, step_id: str) -> ProcessStepResponse | None:
-        """Request Process Step for given KPM ID and STEP ID."""
-        data = ProcessStepRequest(kpm_id, self.user, step_id).to_string()
+    def process_step(
+        self, kpm_id: str, step_id: str, last_change_date: str = ""
+    ) -> ProcessStepResponse | None:
+        """Request Process Step for given KPM ID and STEP ID.
+
+        With the step LAST_CHANGE_DATE (from the Process Step List) the response
+        is served from / stored to the persistent process step cache."""
+        cached = None
+        if last_change_date:
+            cached = self.step_cache.get(kpm_id, step_id, last_change_date)
+        if cached:
+            self.logger.debug(f"Process step {step_id} found in cache", kpm_id=kpm_id)
+            return ProcessStepResponse(cached)
+        request = ProcessStepRequest(kpm_id, self.user, step_id)
+        data = request.to_string()
         self.logger.info(f"Requesting process step -> ID: {step_id} ", kpm_id=kpm_id)
         # self.logger.debug(f"Requesting process step -> ID: {step_id} {data=}",
         #                       kpm_id=kpm_id)
         try:
-            result = self._post(data=data)
+            result = self._post(data=data, action=request.action)
             response = ProcessStepResponse(result)
             descr = response.step.step_type_desc
             stype = response.step.step_type
@@ -175,22 +303,69 @@ class KPMClient:
                 f"response:\n{response.for_jira_ui}"
             )
             if response.is_valid():
+                if last_change_date:
+                    self.step_cache.put(kpm_id, step_id, last_change_date, result)
                 return response
         except Exception as ex:
             self.logger.error(f"Exception: {ex}")
 
+    def process_steps(
+        self,
+        kpm_id: str,
+        step_ids: list[str],
+        last_change_dates: list[str] = None,
+        max_workers: int = PROCESS_STEPS_MAX_WORKERS,
+    ) -> list[ProcessStepResponse | None]:
+        """Request many Process Steps for given KPM ID concurrently.
+
+        The requests share the client session and run on a bounded thread pool.
+        The responses are returned in the same order as `step_ids`, with None
+        for every step that could not be fetched.
+        `last_change_dates` (same order as `step_ids`) enables the step cache.
+        """
+        if not step_ids:
+            return []
+        self._session()
+        last_change_dates = last_change_dates or [""] * len(step_ids)
+        workers = max(1, min(max_workers, len(step_ids)))
+        self.logger.info(
+            f"Requesting {len(step_ids)} process steps ({workers} workers)",
+            kpm_id=kpm_id,
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            responses = list(
+                pool.map(
+                    lambda step_id, last_change_date: self.process_step(
+                        kpm_id, step_id, last_change_date
+                    ),
+                    step_ids,
+                    last_change_dates,
+                )
+            )
+        for step_id, response in zip(step_ids, responses):
+            if not response:
+                self.logger.error(
+                    f"Failed to get process step {step_id}", kpm_id=kpm_id
+                )
+        return responses
+
     def get_document_list(self, kpm_id: str) -> list[DocumentReference]:
         """Request document list for given KPM ID"""
-        data = DocumentListRequest(kpm_id, self.user).to_string()
+        request = DocumentListRequest(kpm_id, self.user)
+        data = request.to_string()
         self.logger.info("Requesting document list from KPM.", kpm_id=kpm_id)
         # self.logger.debug(f"Requesting document list from KPM {data=}", kpm_id=kpm_id)
         try:
-            result = self._post(data=data)
+            result = self._post(data=data, action=request.action)
             # self.logger.debug(f'DocumentListRequest {result.text=}')
             response = DocumentListResponse(result)
             if response.is_valid():
                 document_list = response.as_list
-                self.logger.debug(f"DocumentListResponse:\n{document_list}")
+                deferred_logger.debug(
+                    "DocumentListResponse:\n{}",
+                    Deferred("".join, map(str, document_list)),
+                    kpm_id=kpm_id,
+                )
                 return document_list
         except Exception as ex:
             self.logger.error(f"Exception: {ex}")
@@ -213,47 +388,35 @@ class KPMClient:
 
     def get_document(
         self, kpm_id: str, doc_id: str, doc_name: str, suffix: str, size: str
-    ):
+    ) -> str | None:
         """Request document (attachment) for given KPM ID and DOC ID.
 
-        This method will download to the local cache
-        the attachment or attachment parts (without merging)
+        This method will download (streamed, in chunks) to the local cache
+        the attachment and return the path of the cached file.
         """
-
-        data = DocumentRequest(kpm_id, self.user, doc_id).to_string()
         self.logger.info(
             f"Requesting document (attachment) -> ID: {doc_id} ", kpm_id=kpm_id
         )
         self.logger.debug(f"{kpm_id=}, {doc_id=}, {doc_name=}, {suffix=}, {size=}")
         try:
-            result: Response = self._post(data=data)
-            now = datetime.now().date().strftime("%Y-%m-%d")
-            file_name = f"{doc_name}.{suffix}"
-            file_path = f"{now}/kpmid_{kpm_id}/stepid_{doc_id}/size_{size}"
-            dir_path = f"{APP_CACHE_DIR}/{file_path}"
-            full_path = f"{dir_path}/{file_name}"
-            Path(dir_path).mkdir(parents=True, exist_ok=True)
+            full_path = document_cache_path(kpm_id, doc_id, doc_name, suffix, size)
             if Path(full_path).is_file():
-                self.logger.warning(f"KPM file {file_path}/{file_name} already exists.")
-                with open(full_path, "rb") as f:
-                    try:
-                        self.validate_attachment_size(full_path, size)
-                        attachment = f.read()
-                        return attachment
-                    except Exception as ex:
-                        self.logger.error(
-                            f"Failed to read file {file_path}/{file_name} : {ex}"
-                        )
-            response = DocumentResponse(result)
-            if not response.is_valid():
-                return
-            attachment = response.attachment
-            if not attachment:
-                return
-            with open(full_path, "wb") as f:
-                f.write(attachment)
+                self.logger.warning(f"KPM file {full_path} already exists.")
+                if self.validate_attachment_size(full_path, size):
+                    return full_path
+            request = DocumentRequest(kpm_id, self.user, doc_id)
+            data = request.to_string()
+            result: Response = self._post(data=data, action=request.action, stream=True)
+            try:
+                response = DocumentResponse(result)
+                max_size = int(size) + ATTACHMENTS_VALIDATION_SIZE_TOLERANCE
+                # only saved (moved to FULL_PATH) if the response is valid
+                if not response.save_attachment(full_path, max_size):
+                    return
+            finally:
+                result.close()
             self.validate_attachment_size(full_path, size)
-            return attachment
+            return full_path
         except Exception as ex:
             self.logger.error(
                 f"Get XML SOAP MTOM/XOP Attachment Exception "
@@ -271,20 +434,15 @@ class KPMClient:
             for step in process_steps.as_list:
                 if step.step_type_desc == step_type_desc:
                     detailed_step: ProcessStepResponse = self.process_step(
-                        step.problem_number, step.step_id
+                        step.problem_number, step.step_id, step.last_change_date
                     )
                     # self.logger.debug(f'Last "{step_type_desc}" for
                     # KPM ID {kpm_id}:\n{detailed_step.yaml}')
                     return detailed_step
         except (KPMApiError, Exception) as e:
-            try:
-                self.logger.error(
-                    f"Failed to get last {step_type_desc}: {e}", kpm_id=kpm_id
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.error(
-                    f"Failed to get last {step_type_desc} for kpm id {kpm_id}: {e}"
-                )
+            deferred_logger.error(
+                "Failed to get last {}: {}", step_type_desc, e, kpm_id=kpm_id
+            )
 
     def get_last_supplier_response(self, kpm_id: str):
         self.logger.info("Will get last supplier response ... ", kpm_id=kpm_id)
@@ -323,17 +481,17 @@ class KPMClient:
             if text and approximate_comparison(
                 text, current_supplier_response.for_jira_ui
             ):
-                self.logger.warning(
-                    f"No new supplier response to post: [{strip_date_prefix(text)}] "
-                    f'already in last "Lieferantenaussage" ',
+                deferred_logger.warning(
+                    'No new supplier response to post: [{}] already in last "{}" ',
+                    strip_date_prefix(text),
+                    "Lieferantenaussage",
                     kpm_id=kpm_id,
                 )
                 return ALREADY_POSTED
         else:
             self.logger.debug("No supplier response found.", kpm_id=kpm_id)
-        data: str = AddSupplierResponseRequest(
-            kpm_id, self.user, ticket_id, status, text
-        ).to_string()
+        request = AddSupplierResponseRequest(kpm_id, self.user, ticket_id, status, text)
+        data = request.to_string()
         if not self.post_back_to_kpm:
             self.logger.warning(
                 f"POST BACK TO KPM is set to FALSE. "
@@ -342,41 +500,22 @@ class KPMClient:
             return
         log_msg = f"{ticket_id=} {status=} {text=}"
 
-        response = self._post(data=data)
+        response = self._post(data=data, action=request.action)
+        self.forget_issue(kpm_id)
         result = AddSupplierResponseResponse(response)
 
-        err_msg = f"❌ ❌ New supplier response POST to KPM -> FAILED for: {log_msg} ❌ ❌"  # noqa: E501
         if not result.is_valid():
-            self.logger.error(err_msg, kpm_id=kpm_id)
-            return
-
-        # this sleep allows KPM to process the request
-        # from AddSupplierResponseRequest to Process Step List
-        # in order to be able to get this/our supplier response
-        # as last "Lieferantenaussage"
-        sleep(1)
-
-        # check if new response was posted successfully to KPM /
-        # compare with what should have been posted
-        updated_supplier_response: ProcessStepResponse = (
-            self.get_last_supplier_response(kpm_id)
-        )
-
-        if updated_supplier_response and approximate_comparison(
-            text, updated_supplier_response.for_jira_ui
-        ):
-            self.logger.info(
-                f" ✅ ✅ New supplier response added successfully for: {log_msg} ✅ ✅",
+            deferred_logger.error(
+                "❌ ❌ New supplier response POST to KPM -> FAILED for: {} ❌ ❌",
+                log_msg,
                 kpm_id=kpm_id,
             )
-            return True
-
-        self.logger.debug(f"{updated_supplier_response=}")
-        self.logger.debug(f"{text=}")
-        if updated_supplier_response:
-            self.logger.debug(f"{updated_supplier_response.for_jira_ui=}")
+            return
 
-        self.logger.error(err_msg, kpm_id=kpm_id)
+        # check if new response was posted successfully to KPM:
+        # our supplier response has to become the last "Lieferantenaussage"
+        post = PendingPost(kpm_id, "Lieferantenaussage", text, log_msg)
+        return self._verify_or_defer(post)
 
     def post_supplier_question(self, kpm_id: str, question: str) -> bool | str | None:
         """
@@ -409,23 +548,27 @@ class KPMClient:
             if question and approximate_comparison(
                 question, current_supplier_question.for_jira_ui
             ):
-                self.logger.warning(
-                    f"No new supplier question to post: [{question}] "
-                    f'already in last "Rückfrage" ',
+                deferred_logger.warning(
+                    'No new supplier question to post: [{}] already in last "{}" ',
+                    question,
+                    "Rückfrage",
                     kpm_id=kpm_id,
                 )
                 return ALREADY_POSTED
         else:
             self.logger.debug("No supplier question found.", kpm_id=kpm_id)
 
-        data: str = AddSupplierQuestionRequest(kpm_id, self.user, question).to_string()
+        request = AddSupplierQuestionRequest(kpm_id, self.user, question)
+
+        data = request.to_string()
         if not self.post_back_to_kpm:
             self.logger.warning(
                 f"POST BACK TO KPM is set to FALSE. "
                 f"Just showing the AddSupplierQuestionRequest data:\n{data}"
             )
             return
-        response = self._post(data=data)
+        response = self._post(data=data, action=request.action)
+        self.forget_issue(kpm_id)
         result = AddSupplierQuestionResponse(response)
 
         err_msg = (
@@ -436,33 +579,92 @@ class KPMClient:
             self.logger.error(err_msg, kpm_id=kpm_id)
             return
 
-        # this sleep allows KPM to process the request
-        # from AddSupplierQuestionRequest to Process Step List
-        # in order to be able to find it in the Process Step List
-        sleep(1)
+        # check if new question was posted successfully to KPM:
+        # our question has to become the last "Rückfrage"
+        post = PendingPost(kpm_id, "Rückfrage", question, 'aka "Question to OEM"')
+        return self._verify_or_defer(post)
 
-        # check if new question was posted successfully to KPM /
-        # compare with what should have been posted
-        updated_supplier_question: ProcessStepResponse = (
-            self.get_last_supplier_question(kpm_id)
-        )
+    def _verify_or_defer(self, post: PendingPost) -> bool | None:
+        """Check that POST is in KPM (retried with backoff until the deadline)
+        or, in deferred mode inside a sync cycle, queue it for the end of the cycle.
+
+        return:
+            True if found (or queued)
 
-        if updated_supplier_question and approximate_comparison(
-            question, updated_supplier_question.for_jira_ui
-        ):
+            None if not found in time
+        """
+        if self.post_verify.deferred and self._cycle_depth:
             self.logger.info(
-                ' ✅ ✅ New supplier question aka "Question to OEM" '
-                "added successfully ✅ ✅ ",
-                kpm_id=kpm_id,
+                f'New "{post.step_type_desc}" posted, will be verified '
+                "at the end of the sync cycle.",
+                kpm_id=post.kpm_id,
             )
+            self._pending_posts.append(post)
             return True
+        if self._verify_posts([post]):
+            return
+        return True
+
+    def has_pending_posts(self, kpm_id: str) -> bool:
+        """Posts to KPM_ID queued for verification at the end of the cycle."""
+        return any(post.kpm_id == str(kpm_id) for post in self._pending_posts)
+
+    def verify_pending_posts(self) -> list[PendingPost]:
+        """Check all the posts queued in deferred mode together
+        and return the ones not found in KPM."""
+        posts, self._pending_posts = self._pending_posts, []
+        if not posts:
+            return []
+        self.logger.info(f"Will verify {len(posts)} posts to KPM ... ")
+        return self._verify_posts(posts)
+
+    def _verify_posts(self, posts: list[PendingPost]) -> list[PendingPost]:
+        """Look for POSTS in the KPM Process Step Lists: KPM needs some time
+        to add a posted step to the list, so check again with an exponential
+        backoff until all are found or the deadline is reached.
+        Return the posts not found."""
+        remaining = list(posts)
+        deadline = perf_counter() + self.post_verify.deadline
+        for delay in self.post_verify.delays():
+            if perf_counter() + delay > deadline:
+                break
+            sleep(delay)
+            remaining = [post for post in remaining if not self._is_posted(post)]
+            if not remaining:
+                break
+        for post in remaining:
+            # the posted text is a payload: "{...}" in it is never formatted
+            deferred_logger.error(
+                '❌ ❌ New "{}" {} POST to KPM -> NOT FOUND after {}s: {} ❌ ❌',
+                post.step_type_desc,
+                post.log_msg,
+                self.post_verify.deadline,
+                post,
+                kpm_id=post.kpm_id,
+            )
+        return remaining
 
-        self.logger.debug(f"{updated_supplier_question=}")
-        self.logger.debug(f"{question=}")
-        if updated_supplier_question:
-            self.logger.debug(f"{updated_supplier_question.for_jira_ui=}")
-
-        self.logger.error(err_msg, kpm_id=kpm_id)
+    def _is_posted(self, post: PendingPost) -> bool:
+        try:
+            last_step = self.get_last_step_of_type(post.kpm_id, post.step_type_desc)
+        except KPMApiError as e:
+            deferred_logger.warning(
+                'Failed to check new "{}" in KPM: {}',
+                post.step_type_desc,
+                e,
+                kpm_id=post.kpm_id,
+            )
+            return False
+        if last_step and approximate_comparison(post.text, last_step.for_jira_ui):
+            deferred_logger.info(
+                ' ✅ ✅ New "{}" {} added successfully ✅ ✅',
+                post.step_type_desc,
+                post.log_msg,
+                kpm_id=post.kpm_id,
+            )
+            return True
+        deferred_logger.debug('Not yet the last "{}": {}', post.step_type_desc, post)
+        return False
 
     def get_current_status(self, kpm_id: str):
         """get current status for KPM issue
@@ -491,10 +693,7 @@ class KPMClient:
     def user_has_no_access_to_ticket(self, kpm_id: str | int):
         """check if user has no access to ticket"""
         kpm_id: str = str(kpm_id)
-
-        data = DevelopmentProblemDataRequest(kpm_id, self.user).to_string()
         self.logger.info("Checking if user has access to KPM ticket", kpm_id=kpm_id)
-        response = self._post(data=data)
-        kpm_ticket = DevelopmentProblemDataResponse(response, kpm_id)
+        kpm_ticket = self.development_problem(kpm_id)
         if kpm_ticket.has_no_access():
             return True
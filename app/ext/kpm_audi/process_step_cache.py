@@ -0,0 +1,118 @@
+# standard
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+import os
+
+# external
+from requests import Response
+
+# project core
+from app.core.custom_logger import logger
+from app.core.core_config import KPM_STEPS_CACHE_DIR, KPM_STEPS_CACHE_MAX_SIZE
+
+
+CACHE_FILE_SUFFIX = ".step"
+
+
+class ProcessStepCache:
+    """Persistent on-disk cache for KPM process step responses.
+
+    A KPM process step never changes once created, so a raw GetProcessStep
+    response can be reused as long as the step `LastChangeDate` (from the
+    Process Step List) is the same. Entries are keyed on
+    (kpm_id, step_id, last_change_date) and survive restarts.
+
+    When the cache grows over `max_size` bytes, the least recently used
+    entries are removed until it is back under 90% of `max_size`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = KPM_STEPS_CACHE_DIR,
+        max_size: int = KPM_STEPS_CACHE_MAX_SIZE,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.logger = logger
+        self._lock = Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self._entries())
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.cache_dir}, {self._size} bytes)"
+
+    @property
+    def size(self) -> int:
+        """Current cache size in bytes."""
+        return self._size
+
+    def _entries(self) -> list[Path]:
+        return list(self.cache_dir.glob(f"*/*{CACHE_FILE_SUFFIX}"))
+
+    def _path(self, kpm_id: str, step_id: str, last_change_date: str) -> Path:
+        key = sha1(f"{step_id}|{last_change_date}".encode("utf-8")).hexdigest()
+        return self.cache_dir / str(kpm_id) / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def get(self, kpm_id: str, step_id: str, last_change_date: str) -> Response | None:
+        """Get the cached raw response or None if not (or no longer) cached."""
+        path = self._path(kpm_id, step_id, last_change_date)
+        try:
+            with open(path, "rb") as f:
+                content_type, _, content = f.read().partition(b"\n")
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return
+        except OSError as ex:
+            self.logger.error(f"Failed to read cached process step {step_id}: {ex}")
+            return
+        response = Response()
+        response.status_code = 200
+        response.headers["content-type"] = content_type.decode("utf-8")
+        response._content = content
+        return response
+
+    def put(
+        self, kpm_id: str, step_id: str, last_change_date: str, response: Response
+    ) -> None:
+        """Store the raw response of a process step."""
+        path = self._path(kpm_id, step_id, last_change_date)
+        content_type = response.headers.get("content-type", "")
+        data = content_type.encode("utf-8") + b"\n" + response.content
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with self._lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                old_size = path.stat().st_size if path.is_file() else 0
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._size += len(data) - old_size
+                if self._size > self.max_size:
+                    self._evict()
+        except OSError as ex:
+            self.logger.error(f"Failed to cache process step {step_id}: {ex}")
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under 90% of max size."""
+        target = int(self.max_size * 0.9)
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda entry: entry[0])
+        self._size = sum(entry[1] for entry in entries)
+        removed = 0
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            removed += 1
+        self.logger.info(
+            f"Process step cache over {self.max_size} bytes: "
+            f"removed {removed} entries, {self._size} bytes left"
+        )
@@ -2,27 +2,35 @@
 from uuid import uuid1
 
 # project
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    PROBLEM_NUMBER,
+    USER_AUTHENTIFICATION,
+)
 
 
 # Question to OEM / question_to_oem
 class AddSupplierQuestionRequest(BaseRequest):
+    action = "AddSupplierQuestionRequest"
+    body_template = (
+        "<v3:AddSupplierQuestion>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "<SupplierQuestion>{question_to_oem}</SupplierQuestion>"
+        "</v3:AddSupplierQuestion>"
+    )
+
     def __init__(
         self, kpm_id: str, user_id: str, question_to_oem: str, uuid=None
     ) -> None:
-        self.action = "AddSupplierQuestionRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
-        self.question_to_oem = self.escape_xml(question_to_oem)
+        self.question_to_oem = question_to_oem
 
-    def body(self):
-        return (
-            "<soapenv:Body>"
-            "<v3:AddSupplierQuestion>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            f"<SupplierQuestion>{self.question_to_oem}</SupplierQuestion>"
-            "</v3:AddSupplierQuestion>"
-            "</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "kpm_id": self.kpm_id,
+            "question_to_oem": self.question_to_oem,
+        }
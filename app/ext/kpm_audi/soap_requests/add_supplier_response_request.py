@@ -2,10 +2,27 @@
 from uuid import uuid1
 
 # project
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    PROBLEM_NUMBER,
+    USER_AUTHENTIFICATION,
+)
 
 
 class AddSupplierResponseRequest(BaseRequest):
+    action = "AddSupplierResponseRequest"
+    body_template = (
+        "<v3:AddSupplierResponse>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "<SupplierResponse>"
+        "<Status>{status}</Status>"
+        "<ErrorNumber>{ticket_id}</ErrorNumber>"
+        "</SupplierResponse>"
+        "<ResponseText>{response_text}</ResponseText>"
+        "</v3:AddSupplierResponse>"
+    )
+
     def __init__(
         self,
         kpm_id: str,
@@ -15,25 +32,18 @@ class AddSupplierResponseRequest(BaseRequest):
         text: str,
         uuid=None,
     ) -> None:
-        self.action = "AddSupplierResponseRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
         self.ticket_id = ticket_id  # external reference (e.g. JIRA ID)
         self.status = status
-        self.response_text = self.escape_xml(text)
+        self.response_text = text
 
-    def body(self):
-        return (
-            "<soapenv:Body>"
-            "<v3:AddSupplierResponse>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            "<SupplierResponse>"
-            f"<Status>{self.status}</Status>"
-            f"<ErrorNumber>{self.ticket_id}</ErrorNumber>"
-            "</SupplierResponse>"
-            f"<ResponseText>{self.response_text}</ResponseText>"
-            "</v3:AddSupplierResponse>"
-            "</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "kpm_id": self.kpm_id,
+            "status": self.status,
+            "ticket_id": self.ticket_id,
+            "response_text": self.response_text,
+        }
@@ -1,78 +1,104 @@
 import abc
+from os import getenv as env
 import xml.etree.ElementTree as ET
 
 
+XMLDEF_V3 = "http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
+XMLNS_SOAPENV = "http://schemas.xmlsoap.org/soap/envelope/"
+XMLNS_ADDR = "http://www.w3.org/2005/08/addressing"
+
+# parse every request before sending it (debug/test mode)
+VALIDATE_REQUESTS = env("KPM_VALIDATE_SOAP_REQUESTS", "").lower() in ("1", "true")
+
+# the same for all the requests, only {action} differs
+ENVELOPE_TEMPLATE = (
+    f'<soapenv:Envelope xmlns:soapenv="{XMLNS_SOAPENV}" xmlns:v3="{XMLDEF_V3}">'
+    "<soapenv:Header>"
+    f'<To xmlns="{XMLNS_ADDR}">'
+    "ws://volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
+    "</To>"
+    f'<Action xmlns="{XMLNS_ADDR}">{XMLDEF_V3}/KpmService/{{action}}</Action>'
+    f'<MessageID xmlns="{XMLNS_ADDR}">urn:uuid:{{{{uuid}}}}</MessageID>'
+    "</soapenv:Header>"
+    "<soapenv:Body>{body}</soapenv:Body>"
+    "</soapenv:Envelope>"
+)
+USER_AUTHENTIFICATION = (
+    "<UserAuthentification><UserId>{user_id}</UserId></UserAuthentification>"
+)
+PROBLEM_NUMBER = "<ProblemNumber>{kpm_id}</ProblemNumber>"
+
+_XML_SPECIAL_CHARS = frozenset("&<>\"'")
+
+
+def escape_xml(value) -> str:
+    """The escaping of every value filled into a request template."""
+    if value is None:
+        return ""
+    value = str(value)
+    if _XML_SPECIAL_CHARS.isdisjoint(value):
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+    )
+
+
 class BaseRequest:
+    """A KPM SOAP request.
+
+    Every request class declares its `action` and the `body_template`
+    of the SOAP Body content with `{field}` placeholders, filled in with
+    the escaped values of `fields()`. The whole envelope template is compiled
+    once per class (see `template()`), rendering a request is a single format.
+    """
+
+    action: str = None
+    body_template: str = None
+
     def __init__(self) -> None:
-        self.action = None
         self.uuid = None
         self.user_id = None
         self.kpm_id = None
 
+    @classmethod
+    def template(cls) -> str:
+        """The envelope template of this request class (compiled once)."""
+        if "_template" not in cls.__dict__:
+            cls._template = ENVELOPE_TEMPLATE.format(
+                action=cls.action, body=cls.body_template
+            )
+        return cls._template
+
     def escape_xml(self, xml_content: str):
-        return (
-            xml_content.replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&apos;")
-        )
+        return escape_xml(xml_content)
+
+    @abc.abstractmethod
+    def fields(self) -> dict:
+        "Values of the `body_template` placeholders (not escaped)"
+        return {}
+
+    def _document(self) -> str:
+        values = {key: escape_xml(value) for key, value in self.fields().items()}
+        return self.template().format(uuid=escape_xml(self.uuid), **values)
 
     def to_xml(self):
         return ET.fromstring(self._document())
 
-    def to_string(self, indent=False):
-        # The conversion to string serves like a xml validation
+    def to_string(self, indent=False, validate: bool = None):
+        """The request document to send.
+
+        With VALIDATE (default: VALIDATE_REQUESTS) or INDENT the document is
+        parsed and serialized again (e.g. to check it is valid XML)."""
+        if validate is None:
+            validate = VALIDATE_REQUESTS
+        if not (validate or indent):
+            return self._document()
         xml = self.to_xml()
         if indent:
             ET.indent(xml)
         str_xml = ET.tostring(xml, encoding="unicode")
         return str_xml
-
-    @abc.abstractmethod
-    def body(self):
-        "The Soapenv Envelope Body"
-        return
-
-    def soap_env_header(self):
-        return (
-            f"<soapenv:Header>"
-            f'<To xmlns="{self._xmlns_addr()}">'
-            f"ws://volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
-            f"</To>"
-            f'<Action xmlns="{self._xmlns_addr()}">'
-            f"{self._xmldef_v3()}/KpmService/{self.action}"
-            f"</Action>"
-            f'<MessageID xmlns="{self._xmlns_addr()}">'
-            f"urn:uuid:{self.uuid}"
-            f"</MessageID>"
-            f"</soapenv:Header>"
-        )
-
-    def _document(self):
-        return (
-            f'<soapenv:Envelope xmlns:soapenv="{self._xmlns_soapenv()}" '
-            f'xmlns:v3="{self._xmldef_v3()}">'
-            f"{self.soap_env_header()}"
-            f"{self.body()}"
-            f"</soapenv:Envelope>"
-        )
-
-    def _user_authentification(self):
-        return (
-            f"<UserAuthentification>"
-            f"<UserId>{self.user_id}</UserId>"
-            f"</UserAuthentification>"
-        )
-
-    def _problem_number(self):
-        return f"<ProblemNumber>{self.kpm_id}</ProblemNumber>"
-
-    def _xmldef_v3(self):
-        return "http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
-
-    def _xmlns_soapenv(self):
-        return "http://schemas.xmlsoap.org/soap/envelope/"
-
-    def _xmlns_addr(self):
-        return "http://www.w3.org/2005/08/addressing"
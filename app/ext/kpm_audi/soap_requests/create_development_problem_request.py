@@ -2,10 +2,67 @@
 from uuid import uuid1
 
 # project extension
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    USER_AUTHENTIFICATION,
+)
 
 
 class CreateDevelopmentProblemRequest(BaseRequest):
+    action = "CreateDevelopmentProblemRequest"
+    body_template = (
+        "<v3:CreateDevelopmentProblem>"
+        f"{USER_AUTHENTIFICATION}"
+        "<DevelopmentProblem>"
+        "<Workflow>42</Workflow>"
+        "<Rating>{rating}</Rating>"
+        "<Description>{desc}</Description>"
+        "<ShortText>{short_text}</ShortText>"
+        "<Origin>"
+        "<Phase>EL</Phase>"
+        "<PhaseAddition>ESRLABS</PhaseAddition>"
+        "<SubProcess>EE</SubProcess>"
+        "<MainProcess>PEP</MainProcess>"
+        "</Origin>"
+        "<Creator>"
+        "<Address>"
+        "<OrganisationalUnit>{org_unit}</OrganisationalUnit>"
+        "<Plant>{plant}</Plant>"
+        "</Address>"
+        "<PersonalContractor>"
+        "<UserId>{user_id}</UserId>"
+        "</PersonalContractor>"
+        "</Creator>"
+        "<Coordinator>"
+        "<Contractor>"
+        "<Address>"
+        "<OrganisationalUnit>{org_unit}</OrganisationalUnit>"  # HCP5
+        "<Plant>{plant}</Plant>"  # 21
+        "</Address>"
+        "<PersonalContractor>"
+        "<UserId>{user_id}</UserId>"  # EV6K03O
+        "</PersonalContractor>"
+        "</Contractor>"
+        "</Coordinator>"
+        "<ForemostGroupProject>"
+        "<Brand>{project_brand}</Brand>"  # AU
+        "<Project>{project}</Project>"  # 416
+        "</ForemostGroupProject>"
+        "<Frequency>{frequency}</Frequency>"
+        "<Repeatable>{repeatable}</Repeatable>"
+        "<ForemostTestPart>"
+        "<PartNumber>"
+        "<PreNumber>{pre_number}</PreNumber>"
+        "<MiddleGroup>{middle_group}</MiddleGroup>"
+        "<EndNumber>{end_number}</EndNumber>"
+        "</PartNumber>"
+        "<Hardware>{hardware}</Hardware>"
+        "<Software>{software}</Software>"
+        "</ForemostTestPart>"
+        "</DevelopmentProblem>"
+        "</v3:CreateDevelopmentProblem>"
+    )
+
     def __init__(
         self,
         user_id: str,
@@ -41,91 +98,25 @@ class CreateDevelopmentProblemRequest(BaseRequest):
         self.hardware = hardware
         self.software = software
         self.uuid = uuid or str(uuid1())
-        self.action = "CreateDevelopmentProblemRequest"
-
-    def body(self):
-        return (
-            f"<soapenv:Body>"
-            f"<v3:CreateDevelopmentProblem>"
-            f"{self._user_authentification()}"
-            f"<DevelopmentProblem>"
-            f"{self.development_problem()}"
-            f"</DevelopmentProblem>"
-            f"</v3:CreateDevelopmentProblem>"
-            f"</soapenv:Body>"
-        )
-
-    def development_problem(self):
-        return (
-            f"<Workflow>42</Workflow>"  #
-            f"<Rating>{self.rating}</Rating>"
-            f"<Description>{self.desc}</Description>"
-            f"<ShortText>{self.short_text}</ShortText>"
-            f"{self.origin()}"
-            f"{self.creator()}"
-            f"{self.coordinator()}"
-            f"{self.foremost_group_project()}"
-            f"<Frequency>{self.frequency}</Frequency>"
-            f"<Repeatable>{self.repeatable}</Repeatable>"
-            f"<ForemostTestPart>"
-            f"{self.part_number()}"
-            f"<Hardware>{self.hardware}</Hardware>"
-            f"<Software>{self.software}</Software>"
-            f"</ForemostTestPart>"
-        )
-        # -> past hardcoded params
-
-    def origin(self):
-        return (
-            "<Origin>"
-            "<Phase>EL</Phase>"  # EL
-            "<PhaseAddition>ESRLABS</PhaseAddition>"  # ESRLABS
-            "<SubProcess>EE</SubProcess>"  # EE
-            "<MainProcess>PEP</MainProcess>"  # PEP
-            "</Origin>"
-        )
-
-    def creator(self):
-        return (
-            f"<Creator>"
-            f"<Address>"
-            f"<OrganisationalUnit>{self.org_unit}</OrganisationalUnit>"
-            f"<Plant>{self.plant}</Plant>"
-            f"</Address>"
-            f"<PersonalContractor>"
-            f"<UserId>{self.user_id}</UserId>"
-            f"</PersonalContractor>"
-            f"</Creator>"
-        )
-
-    def coordinator(self):
-        return (
-            "<Coordinator>"
-            "<Contractor>"
-            "<Address>"
-            f"<OrganisationalUnit>{self.org_unit}</OrganisationalUnit>"  # HCP5
-            f"<Plant>{self.plant}</Plant>"  # 21
-            "</Address>"
-            "<PersonalContractor>"
-            f"<UserId>{self.user_id}</UserId>"  # EV6K03O
-            "</PersonalContractor>"
-            "</Contractor>"
-            "</Coordinator>"
-        )
-
-    def foremost_group_project(self):
-        return (
-            "<ForemostGroupProject>"
-            f"<Brand>{self.project_brand}</Brand>"  # AU
-            f"<Project>{self.project}</Project>"  # 416
-            "</ForemostGroupProject>"
-        )
 
-    def part_number(self):
-        return (
-            f"<PartNumber>"
-            f"<PreNumber>{self.pre_number}</PreNumber>"
-            f"<MiddleGroup>{self.middle_group}</MiddleGroup>"
-            f"<EndNumber>{self.end_number}</EndNumber>"
-            f"</PartNumber>"
-        )
+    def fields(self) -> dict:
+        return {
+            name: getattr(self, name)
+            for name in (
+                "user_id",
+                "plant",
+                "org_unit",
+                "project",
+                "project_brand",
+                "rating",
+                "desc",
+                "short_text",
+                "frequency",
+                "repeatable",
+                "pre_number",
+                "middle_group",
+                "end_number",
+                "hardware",
+                "software",
+            )
+        }
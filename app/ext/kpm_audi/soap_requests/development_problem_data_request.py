@@ -1,22 +1,26 @@
 from uuid import uuid1
 
 # project
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    PROBLEM_NUMBER,
+    USER_AUTHENTIFICATION,
+)
 
 
 class DevelopmentProblemDataRequest(BaseRequest):
+    action = "GetDevelopmentProblemDataRequest"
+    body_template = (
+        "<v3:GetDevelopmentProblemData>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "</v3:GetDevelopmentProblemData>"
+    )
+
     def __init__(self, kpm_id: str, user_id: str, uuid=None) -> None:
-        self.action = "GetDevelopmentProblemDataRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
 
-    def body(self):
-        return (
-            f"<soapenv:Body>"
-            f"<v3:GetDevelopmentProblemData>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            f"</v3:GetDevelopmentProblemData>"
-            f"</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {"user_id": self.user_id, "kpm_id": self.kpm_id}
@@ -2,45 +2,53 @@
 from uuid import uuid1
 
 # project
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    PROBLEM_NUMBER,
+    USER_AUTHENTIFICATION,
+)
 
 
 class DocumentRequest(BaseRequest):
+    action = "GetDocumentRequest"
+    body_template = (
+        "<v3:GetDocument>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "<DocumentId>{document_id}</DocumentId>"
+        "</v3:GetDocument>"
+    )
+
     def __init__(self, kpm_id: str, user_id: str, document_id: str, uuid=None) -> None:
-        self.action = "GetDocumentRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
         self.document_id = document_id
 
-    def body(self):
-        return (
-            f"<soapenv:Body>"
-            f"<v3:GetDocument>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            f"<DocumentId>{self.document_id}</DocumentId>"
-            f"</v3:GetDocument>"
-            f"</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "kpm_id": self.kpm_id,
+            "document_id": self.document_id,
+        }
 
 
 class DocumentListRequest(BaseRequest):
+    action = "GetDocumentListRequest"
+    body_template = (
+        "<v3:GetDocumentList>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "</v3:GetDocumentList>"
+    )
+
     def __init__(self, kpm_id: str, user_id: str, uuid=None) -> None:
-        self.action = "GetDocumentListRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
 
-    def body(self):
-        return (
-            f"<soapenv:Body>"
-            f"<v3:GetDocumentList>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            f"</v3:GetDocumentList>"
-            f"</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {"user_id": self.user_id, "kpm_id": self.kpm_id}
 
 
 # DocumentReference
@@ -2,10 +2,31 @@
 from uuid import uuid1
 
 # project
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    USER_AUTHENTIFICATION,
+)
 
 
 class MultipleProblemDataRequest(BaseRequest):
+    action = "GetMultipleProblemDataRequest"
+    body_template = (
+        "<v3:GetMultipleProblemData>"
+        f"{USER_AUTHENTIFICATION}"
+        "<LastChangeTimestamp>{since}</LastChangeTimestamp>"
+        "<OverviewAddress>"
+        "<AddressTimestamp>{addr_timestamp}</AddressTimestamp>"
+        "<ContactPerson>{contact}</ContactPerson>"
+        "<Description>{desc}</Description>"
+        "<OrganisationalUnit>{unit}</OrganisationalUnit>"
+        "<Group>{group}</Group>"
+        "<Plant>{plant}</Plant>"
+        "</OverviewAddress>"
+        "<ActiveOverview>true</ActiveOverview>"
+        "<PassiveOverview>false</PassiveOverview>"
+        "</v3:GetMultipleProblemData>"
+    )
+
     def __init__(
         self,
         user_id: str,
@@ -24,7 +45,6 @@ class MultipleProblemDataRequest(BaseRequest):
         contact: ContactPerson
         addr_timestamp: AddressTimestamp
         """
-        self.action = "GetMultipleProblemDataRequest"
         self.user_id = user_id
         self.uuid = uuid or str(uuid1())
         self.since = since
@@ -33,25 +53,17 @@ class MultipleProblemDataRequest(BaseRequest):
         self.contact = contact
         self.addr_timestamp = addr_timestamp
 
-    def body(self) -> str:
-        return (
-            f"<soapenv:Body>"
-            f"<v3:GetMultipleProblemData>"
-            f"{self._user_authentification()}"
-            f"<LastChangeTimestamp>{self.since}</LastChangeTimestamp>"
-            f"<OverviewAddress>"
-            f"<AddressTimestamp>{self.addr_timestamp}</AddressTimestamp>"
-            f"<ContactPerson>{self.contact}</ContactPerson>"
-            f"<Description>{self.desc}</Description>"
-            f"<OrganisationalUnit>{self._unit()}</OrganisationalUnit>"
-            f"<Group>{self._group()}</Group>"
-            f"<Plant>{self._plant()}</Plant>"
-            f"</OverviewAddress>"
-            f"<ActiveOverview>true</ActiveOverview>"
-            f"<PassiveOverview>false</PassiveOverview>"
-            f"</v3:GetMultipleProblemData>"
-            f"</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "since": self.since,
+            "addr_timestamp": self.addr_timestamp,
+            "contact": self.contact,
+            "desc": self.desc,
+            "unit": self._unit(),
+            "group": self._group(),
+            "plant": self._plant(),
+        }
 
     # TODO: FIXME: split errors not handled
     # 'NoneType' object has no attribute 'split'
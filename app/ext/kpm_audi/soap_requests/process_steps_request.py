@@ -2,42 +2,46 @@
 from uuid import uuid1
 
 # project
-from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from app.ext.kpm_audi.soap_requests.base_request import (
+    BaseRequest,
+    PROBLEM_NUMBER,
+    USER_AUTHENTIFICATION,
+)
 
 
 class ProcessStepRequest(BaseRequest):
+    action = "GetProcessStepRequest"
+    body_template = (
+        "<v3:GetProcessStep>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "<ProcessStepId>{step_id}</ProcessStepId>"
+        "</v3:GetProcessStep>"
+    )
+
     def __init__(self, kpm_id: str, user_id: str, step_id: str, uuid=None) -> None:
-        self.action = "GetProcessStepRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
         self.step_id = step_id
 
-    def body(self):
-        return (
-            f"<soapenv:Body>"
-            f"<v3:GetProcessStep>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            f"<ProcessStepId>{self.step_id}</ProcessStepId>"
-            f"</v3:GetProcessStep>"
-            f"</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {"user_id": self.user_id, "kpm_id": self.kpm_id, "step_id": self.step_id}
 
 
 class ProcessStepListRequest(BaseRequest):
+    action = "GetProcessStepListRequest"
+    body_template = (
+        "<v3:GetProcessStepList>"
+        f"{USER_AUTHENTIFICATION}"
+        f"{PROBLEM_NUMBER}"
+        "</v3:GetProcessStepList>"
+    )
+
     def __init__(self, kpm_id: str, user_id: str, uuid=None) -> None:
-        self.action = "GetProcessStepListRequest"
         self.uuid = uuid or str(uuid1())
         self.kpm_id = kpm_id
         self.user_id = user_id
 
-    def body(self):
-        return (
-            f"<soapenv:Body>"
-            f"<v3:GetProcessStepList>"
-            f"{self._user_authentification()}"
-            f"{self._problem_number()}"
-            f"</v3:GetProcessStepList>"
-            f"</soapenv:Body>"
-        )
+    def fields(self) -> dict:
+        return {"user_id": self.user_id, "kpm_id": self.kpm_id}
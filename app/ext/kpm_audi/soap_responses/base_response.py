@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from dataclasses import asdict, dataclass
 import re
 from requests import Response
 import xmltodict
@@ -6,11 +7,68 @@ import xml.etree.ElementTree as ET
 from json import dumps, loads
 
 # project core
-from app.core.custom_logger import logger
+from app.core.custom_logger import Deferred, deferred_logger, logger
 from app.core.utils import xml_to_yaml
 
 # project extension
 from app.ext.kpm_audi.exceptions import KpmResponseError
+from app.ext.kpm_audi.soap_responses.xml_backend import EtreeBackend, xml_backend
+from app.ext.kpm_audi.soap_responses.xop_stream import XopPart, index_parts
+
+
+MESSAGE_SUCCESS_ID = "INFO_001"
+MESSAGE_SUCCESS_TEXT = "Method completed successfully"
+MESSAGE_NO_ACCESS_ID = "FC_512"
+MESSAGE_NO_ACCESS_TEXT = "The user has no permission to read the problem"
+MESSAGE_TYPE_FAULT = "MT_FAULT"
+
+
+@dataclass(frozen=True)
+class ResponseMessage:
+    """The <ResponseMessage> every KPM SOAP response reports its outcome with:
+    Body / <X>Response / <X>ResponseInternal / ResponseMessage
+    """
+
+    message_id: str = ""
+    message_type: str = ""
+    message_text: str = ""
+    version_id: str = ""
+
+    @classmethod
+    def from_element(cls, element: ET.Element | None) -> "ResponseMessage":
+        if element is None:
+            return cls()
+        return cls(
+            message_id=element.findtext("MessageId") or "",
+            message_type=element.findtext("MessageType") or "",
+            message_text=element.findtext("MessageText") or "",
+            version_id=element.findtext("VersionId") or "",
+        )
+
+    def __bool__(self):
+        return bool(self.message_id or self.message_type or self.message_text)
+
+    @property
+    def is_success(self) -> bool:
+        return (
+            self.message_id == MESSAGE_SUCCESS_ID
+            or self.message_text == MESSAGE_SUCCESS_TEXT
+        )
+
+    @property
+    def is_no_access(self) -> bool:
+        return (
+            self.message_id == MESSAGE_NO_ACCESS_ID
+            or self.message_text == MESSAGE_NO_ACCESS_TEXT
+        )
+
+    @property
+    def is_fault(self) -> bool:
+        return self.message_type == MESSAGE_TYPE_FAULT
+
+    def to_dict(self) -> dict:
+        """The reported fields (e.g. to log an unexpected fault type)."""
+        return {key: value for key, value in asdict(self).items() if value}
 
 
 class BaseResponse:
@@ -18,9 +76,13 @@ class BaseResponse:
         self.kpm_id = kpm_id
         self.raw = response
         self.logger = logger
+        # lxml (compiled XPath) or ElementTree, see `xml_backend`
+        self.backend: EtreeBackend = xml_backend()
         self.content_type = response.headers.get("content-type", "")
         self._soap_envelope = None
         self._soap_fault = False
+        self._message = None
+        self._parts: list[XopPart] = None
 
     def __getitem__(self, key):
         return self._find(key)
@@ -32,7 +94,16 @@ class BaseResponse:
         return loads(dumps(self.to_ord_dict()))
 
     def to_string(self):
-        return ET.tostring(self.xml())
+        return self.backend.tostring(self.xml())
+
+    def select(self, path: str) -> list:
+        """Elements at PATH of the SOAP envelope, e.g.
+        "soap:Body/kpm:GetDocumentListResponse/GetDocumentListResponseInternal"
+        (prefixes: `xml_backend.NAMESPACES`), compiled once per backend."""
+        return self.backend.findall(self.xml(), path)
+
+    def select_one(self, path: str):
+        return self.backend.find(self.xml(), path)
 
     def is_valid(self) -> bool | None:
         """Validate KPM SOAP response"""
@@ -53,16 +124,52 @@ class BaseResponse:
             SupplierStatus: '0'
         """
 
-        yaml_body = xml_to_yaml(self.soap_body)
-
-        success_msg = "MessageText: Method completed successfully"
-        if success_msg in yaml_body:
+        if self.message.is_success:
             logger.info(
                 f'KPM "success" response validation passed for {type(self).__name__}'
             )
             return True
 
-        logger.error(f"KPM response validation failed:\n{yaml_body}")
+        self._log_validation_failed()
+
+    @property
+    def message(self) -> ResponseMessage:
+        """The typed <ResponseMessage> of the response (parsed once)."""
+        if self._message is None:
+            self._message = ResponseMessage.from_element(
+                self._response_message_element()
+            )
+        return self._message
+
+    def _response_message_element(self) -> ET.Element | None:
+        body = self.soap_body
+        if not len(body):
+            return None
+        # Body / <X>Response / <X>ResponseInternal / ResponseMessage
+        response = body[0]
+        if len(response):
+            element = response[0].find("ResponseMessage")
+            if element is not None:
+                return element
+        return next(body.iter("ResponseMessage"), None)
+
+    def _log_validation_failed(self):
+        message = self.message
+        name = type(self).__name__
+        if message.is_no_access:
+            logger.warning(f"NO KPM ACCESS - {name}", kpm_id=self.kpm_id)
+        elif message.is_fault:
+            deferred_logger.error(
+                "KPM fault response for {}: {}",
+                name,
+                message.to_dict,
+                kpm_id=self.kpm_id,
+            )
+        elif message:
+            logger.error(f"KPM response validation failed: {message.to_dict()}")
+        else:
+            logger.error("KPM response validation failed: no ResponseMessage")
+        deferred_logger.debug("{}", Deferred(xml_to_yaml, self.soap_body))
 
     @property
     def soap_envelope(self):
@@ -129,22 +236,22 @@ class BaseResponse:
         )
 
     def xml(self):
-        # TODO: Improve. We assume here that we have a valid xml+xop
-        # Therefore the first part is the xml with the xop references.
+        # The first (root) part is the xml with the xop references.
         # Following parts could be binary attachments referenced via xop.
         if self._soap_envelope is not None:
             return self._soap_envelope
         parts = self.parts()
         if parts:
-            header, body = parts[0].split(b"\r\n\r\n")
-            if "Content-Type: text/xml" in header.decode("utf-8"):
-                content = body.decode("utf-8")
+            root = parts[0]
+            if "text/xml" in root.content_type:
+                body = self.part_body(root)
                 try:
-                    self._soap_envelope = ET.fromstring(content)
+                    self._soap_envelope = self.backend.fromstring(body)
                     if self._soap_envelope is not None:
                         return self._soap_envelope
                     raise KpmResponseError(
-                        f"Could not find SOAP Envelope in response: {content}"
+                        "Could not find SOAP Envelope in response: "
+                        f"{str(body, 'utf-8')}"
                     )
                 except Exception as ex:
                     if isinstance(ex, KpmResponseError):
@@ -155,11 +262,11 @@ class BaseResponse:
             else:
                 raise KpmResponseError(
                     f"Unexpected first body content-type. Expected: 'text/xml' "
-                    f"but received {header.decode('utf-8')}"
+                    f"but received {root.content_type}"
                 )
         try:
             self._soap_fault = True
-            self._soap_envelope = ET.fromstring(self.raw.content.decode("utf-8"))
+            self._soap_envelope = self.backend.fromstring(self.raw.content)
             message = (
                 f"Request failed with error: {self.kpm_fault_error_code}, "
                 f"-> {self.kpm_fault_message}"
@@ -173,13 +280,18 @@ class BaseResponse:
                 f"Content-Type: {self.content_type}, Content: {self.raw.text}"
             ) from ex
 
-    def parts(self):
-        if self.is_multipart() and self.is_xop_xml():
-            boundary_string = f"--{self.boundary()}"
-            parts = self.raw.content.split(bytes(boundary_string, "utf-8"))
-            # Before the first boundary there is an empty line,
-            # the last one finishes with `--`
-            return parts[1::-2]
+    def parts(self) -> list[XopPart]:
+        """Index of the MTOM/XOP parts (built once, in one pass), empty if
+        the response is not multipart. Read their body with `part_body()`."""
+        if self._parts is None:
+            self._parts = []
+            if self.is_multipart() and self.is_xop_xml():
+                self._parts = index_parts(self.raw.content, self.boundary())
+        return self._parts
+
+    def part_body(self, part: XopPart) -> memoryview:
+        """The PART body, a view on the response content (no copy)."""
+        return part.body(self.raw.content)
 
     def is_multipart(self):
         return "multipart/related" in self.content_type
@@ -210,7 +322,7 @@ class BaseResponse:
 
     def _find_text(self, element: ET.Element = None, match: str = "") -> str:
         elem = self._find(element, match)
-        if elem is not None and isinstance(elem, ET.Element) and elem.text:
+        if elem is not None and not isinstance(elem, str) and elem.text:
             return elem.text
         return ""
 
@@ -229,18 +341,13 @@ class BaseResponse:
             VersionId: release_17.8.0
         """
 
-        yaml_body = xml_to_yaml(self.soap_body)
-
-        success_msg = "MessageText: Method completed successfully"
-        if success_msg in yaml_body:
+        message = self.message
+        if message.is_success:
             logger.info(f"KPM access validation passed for {type(self).__name__}")
             return
 
-        no_kpm_access_msg = (
-            "MessageText: The user has no permission to read the problem"
-        )
-        if no_kpm_access_msg in yaml_body:
+        if message.is_no_access:
             logger.warning(f"NO KPM ACCESS - {type(self).__name__}", kpm_id=self.kpm_id)
             return True
 
-        logger.error(f"KPM response validation failed:\n{yaml_body}")
+        self._log_validation_failed()
@@ -1,13 +1,63 @@
-from json import loads, dumps
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, is_dataclass
 
 import xml.etree.ElementTree as ET
-import xmltodict
 import yaml
 
+from app.core.custom_logger import deferred_logger
 from .base_response import BaseResponse
 
 
+def element_to_dict(element: ET.Element) -> dict | str | None:
+    """The `xmltodict` representation of an (unqualified) ELEMENT,
+    built with a single walk: stripped texts, None for empty elements,
+    "@attribute" and "#text" keys, lists for repeated children."""
+    text = element.text or ""
+    if len(element):
+        text += "".join(child.tail or "" for child in element)
+    text = text.strip() or None
+    if not len(element) and not element.attrib:
+        return text
+    result = {f"@{key}": value for key, value in element.attrib.items()}
+    for child in element:
+        value = element_to_dict(child)
+        if child.tag not in result:
+            result[child.tag] = value
+        elif isinstance(result[child.tag], list):
+            result[child.tag].append(value)
+        else:
+            result[child.tag] = [result[child.tag], value]
+    if text is not None:
+        result["#text"] = text
+    return result
+
+
+def dataclass_from_element(cls, element: ET.Element):
+    """Populate the dataclass CLS with the (stripped) texts of the ELEMENT
+    children of the same names, nested dataclasses from the inner elements.
+    Missing elements: "" for texts, None for dataclasses."""
+    children = {}
+    for child in element:  # a single pass (instead of a `find()` per field)
+        children.setdefault(child.tag, child)
+    values = {}
+    for field in fields(cls):
+        child = children.get(field.name)
+        if is_dataclass(field.type):
+            values[field.name] = (
+                None if child is None else dataclass_from_element(field.type, child)
+            )
+        else:
+            values[field.name] = "" if child is None else (child.text or "").strip()
+    return cls(**values)
+
+
+def _index_paths(value, prefix: str, paths: dict) -> None:
+    for key, inner in value.items():
+        path = f"{prefix}{key}"
+        paths[path] = inner
+        if isinstance(inner, dict):
+            _index_paths(inner, f"{path}/", paths)
+
+
 @dataclass
 class Address:
     AddressTimestamp: str
@@ -173,9 +223,18 @@ class DevelopmentProblem:
 
 @dataclass
 class DevelopmentProblemDataResponse(BaseResponse):
+    development_problem_path = (
+        "soap:Body/kpm:GetDevelopmentProblemDataResponse"
+        "/GetDevelopmentProblemDataResponseInternal/DevelopmentProblem"
+    )
+
     def __init__(self, response, kpm_id="") -> None:
         super().__init__(response, kpm_id)
-        self._output_ok_for_str_format = None
+        self._internal = None
+        self._development_problem = None
+        self._problem: DevelopmentProblem = None
+        self._as_dict: dict = None
+        self._paths: dict = None
 
     def summary(self):
         return (
@@ -188,33 +247,50 @@ class DevelopmentProblemDataResponse(BaseResponse):
         return self._find(element, match)
 
     def get_development_data_response_internal(self):
-        match = "GetDevelopmentProblemDataResponseInternal"
-        element = self.get_development_data_response()
-        return self._find(element, match)
+        if self._internal is None:
+            match = "GetDevelopmentProblemDataResponseInternal"
+            element = self.get_development_data_response()
+            self._internal = self._find(element, match)
+        return self._internal
 
     def log_other_fault_type(self):
-        resp_msg = self.response_message
-
-        def look(elem):
-            return self._find(resp_msg, elem)
-
-        msg = {
-            elem: look(elem).text
-            for elem in ["MessageId", "MessageType", "MessageText"]
-            if look(elem)
-        }
-        return msg
+        return self.message.to_dict()
 
     def development_problem_as_dict(self) -> dict:
-        if self.development_problem:
-            dev_problem = ET.tostring(self.development_problem)
-            return loads(dumps(xmltodict.parse(dev_problem)))
+        """{"DevelopmentProblem": {...}} as `xmltodict` would parse it.
+
+        Built once per response: shared by the mapper and the sync checks,
+        so it must not be modified."""
+        if self._as_dict is None and self.development_problem is not None:
+            self._as_dict = {
+                "DevelopmentProblem": element_to_dict(self.development_problem)
+            }
+        return self._as_dict
 
     def development_problem_as_yaml(self) -> str:
         d = self.development_problem_as_dict()
         if d:
             return yaml.safe_dump(d)
 
+    def value_at(self, path: str, default=None):
+        """Value at PATH of `development_problem_as_dict()`
+        e.g. DevelopmentProblem/Supplier/Contractor/PersonalContractor/UserId
+        (a dict for inner paths), DEFAULT if there is no such path."""
+        if self._paths is None:
+            self._paths = {}
+            if as_dict := self.development_problem_as_dict():
+                _index_paths(as_dict, "", self._paths)
+        return self._paths.get(path, default)
+
+    @property
+    def problem(self) -> DevelopmentProblem | None:
+        """The typed DevelopmentProblem (built once)."""
+        if self._problem is None and self.development_problem is not None:
+            self._problem = dataclass_from_element(
+                DevelopmentProblem, self.development_problem
+            )
+        return self._problem
+
     @property
     def response_message(self):
         match = "ResponseMessage"
@@ -223,22 +299,19 @@ class DevelopmentProblemDataResponse(BaseResponse):
 
     @property
     def development_problem(self):
-        match = "DevelopmentProblem"
-        element = self.get_development_data_response_internal()
-        dev_probl = self._find(element, match)
-        if dev_probl:
-            return dev_probl
-        self.logger.debug(self.log_other_fault_type())
+        if self._development_problem is None:
+            dev_probl = self.select_one(self.development_problem_path)
+            if dev_probl is None or not len(dev_probl):
+                self.logger.debug(self.log_other_fault_type())
+                return
+            self._development_problem = dev_probl
+        return self._development_problem
 
     @property
     def problem_number(self):
-        match = "ProblemNumber"
-        element = self.development_problem
-        if element:
-            xml_val = self._find(element, match).text
-            if xml_val:
-                self.kpmid = xml_val
-                return xml_val
+        if self.problem and self.problem.ProblemNumber:
+            self.kpmid = self.problem.ProblemNumber
+            return self.problem.ProblemNumber
         return ""
 
     @property
@@ -249,44 +322,25 @@ class DevelopmentProblemDataResponse(BaseResponse):
 
     @property
     def external_problem_number(self):
-        match = "ExternalProblemNumber"
-        element = self.development_problem
-        if element:
-            return self._find(element, match).text
-        return ""
+        return self.problem.ExternalProblemNumber if self.problem else ""
 
     @property
     def supplier_status(self):
-        match = "SupplierStatus"
-        element = self.development_problem
-        if element:
-            return self._find(element, match).text
-        return ""
+        return self.problem.SupplierStatus if self.problem else ""
 
     @property
     def problem_status(self):
-        match = "ProblemStatus"
-        element = self.development_problem
-        if element:
-            return self._find(element, match).text
-        return ""
+        return self.problem.ProblemStatus if self.problem else ""
 
     @property
     def engineering_status(self):
-        match = "EngineeringStatus"
-        element = self.development_problem
-        if element:
-            return self._find(element, match).text
-        return ""
+        return self.problem.EngineeringStatus if self.problem else ""
 
     def _get_inner_status(self, status_group: str):
-        element = self.development_problem
-        if not element:
-            return ""
-        inner = self._find(element, status_group)
+        inner = getattr(self.problem, status_group, None)
         if not inner:
             return ""
-        return self._find(inner, "Status").text
+        return inner.Status
 
     @property
     def supplier_inner_status(self):  # Supplier / Status
@@ -327,36 +381,11 @@ class DevelopmentProblemDataResponse(BaseResponse):
         return False
 
     def log_output_as_yaml(self):
-        # fields values (description field usually) contain code that might
-        # cause str format KeyError when added to logs
-        # e.g. src:DiagServiceEvents.hpp|lin:211|p_output:
-        # {"domainRepairInstructionId":1,"errorCode":50462751, ...
-        if self._output_ok_for_str_format is not None:
-            return self._output_ok_for_str_format
-        try:
-            kpm_yml = self.development_problem_as_yaml()
-            self.logger.debug(
-                f"Checking KPM DevelopmentProblem {self.kpm_id} for sync: \n{kpm_yml}",
-                kpm_id=self.kpm_id,
-            )
-            self._output_ok_for_str_format = True
-        except KeyError as e:
-            self.logger.warning(
-                f"KPM DevelopmentProblem output can't be added to f-strings. "
-                f"KeyError: {e}",
-                kpm_id=self.kpm_id,
-            )
-            self._output_ok_for_str_format = False
-        except IndexError as e:
-            self.logger.warning(
-                f"KPM DevelopmentProblem with KPM ID {self.kpm_id} -> "
-                f"output log str format has IndexError: {e}"
-            )
-            self._output_ok_for_str_format = False
-        except Exception as e:
-            self.logger.error(
-                f"KPM DevelopmentProblem with KPM ID {self.kpm_id} -> "
-                f"output log str format has Exception: {e}"
-            )
-            self._output_ok_for_str_format = False
-        return self._output_ok_for_str_format
+        """Log the DevelopmentProblem as YAML (only rendered if DEBUG is on)."""
+        deferred_logger.debug(
+            "Checking KPM DevelopmentProblem {} for sync: \n{}",
+            self.kpm_id,
+            self.development_problem_as_yaml,
+            kpm_id=self.kpm_id,
+        )
+        return True
@@ -1,13 +1,21 @@
 # standard
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
+from typing import Iterator
 from xml.etree.ElementTree import Element
 from requests import Response
+import os
 
 # 3rd party
 import yaml
 
 # project
+from app.ext.kpm_audi.exceptions import KpmResponseError
 from app.ext.kpm_audi.soap_responses.base_response import BaseResponse
+from app.ext.kpm_audi.soap_responses.xop_stream import (
+    XOP_STREAM_CHUNK_SIZE,
+    XopStreamParser,
+)
 
 """
 '{http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3}GetDocumentResponse':
@@ -53,23 +61,7 @@ class DocumentResponse(BaseResponse):
         xop = self._find(element, match)
         href = xop.attrib.get("href", "")
         if href.startswith("cid:"):
-            return href.lstrip("cid:")
-
-    def split_header(self, header: bytes):
-        header_dict = {}
-        for line in header.split(b"\r\n"):
-            if b": " in line:
-                key, value = line.split(b": ")
-                if b"Content-ID" in value:
-                    header_dict[key] = value.lstrip(b"<")
-                else:
-                    header_dict[key] = value
-        return header_dict
-
-    def clean_attachment(self, attachment: bytes):
-        split_list = attachment.split(b"\r\n--uuid:")
-        if len(split_list) == 2:
-            return split_list[0].lstrip(b"\r\n\r\n")
+            return href[len("cid:") :]
 
     def get_xop_data(self) -> dict | None:
         """Get MTOM/XOP raw binary attachment file"""
@@ -97,53 +89,101 @@ class DocumentResponse(BaseResponse):
         //Binary data here
 
         --uuid:8df5f235-fba1-492f-8425-example--
-        """
-        # try:
-        ROOT_CONTENT_ID = b"Content-ID: <root.message@cxf.apache.org>"
-        CONTENT_ID_CFX = b"@cxf.apache.org>"
-        SPLIT_SEPARATOR = (
-            b"</Data></Document></GetDocumentResponseInternal>"
-            b"</ns2:GetDocumentResponse></soap:Body></soap:Envelope>"
-        )
 
-        xop_mime_data = {}  # mtom/xop mime document/attachment details
-
-        if isinstance(self.raw, Response):
-            if self.raw.status_code != 200:
-                return
-            raw_content = self.raw.content
-        if not raw_content:
+        Return {"header": the part headers, "attachment": a view on its body}
+        read from the part index of the response (nothing is copied).
+        """
+        if isinstance(self.raw, Response) and self.raw.status_code != 200:
             return
-
-        split_content = raw_content.split(SPLIT_SEPARATOR)
-        for i, byte_seq in enumerate(split_content):
-            # self.logger.debug(f'\n\nbyte_seq: {i}')
-            if ROOT_CONTENT_ID in byte_seq:
-                continue
-            # self.logger.debug(f'\n\t\t\t{byte_seq[:500]=}')
-            # self.logger.debug(f'\n\t\t\t{byte_seq[-200:]=}')
-            split_inner = byte_seq.split(CONTENT_ID_CFX)
-            if len(split_inner) == 2:
-                xop_mime_data["header"] = self.split_header(split_inner[0])
-                xop_mime_data["attachment"] = self.clean_attachment(split_inner[1])
-                # self.logger.debug(f"\n\t{xop_mime_data['header']=}")
-                # self.logger.debug(f"\n\t{xop_mime_data['attachment'][:100]=}")
-                # self.logger.debug(f"\n\t{xop_mime_data['attachment'][-100:]=}")
-                return xop_mime_data
-        self.logger.error(
-            f"Unable to split raw binary attachment byte_seq using {CONTENT_ID_CFX}"
-        )
-        # except Exception as e:
-        #     self.logger.error(f'Unable to extract raw binary attachment: {e}')
+        attachments = self.parts()[1:]
+        if len(attachments) > 1:
+            # the part referenced by <xop:Include href="cid:...">
+            cid = self.get_xop_include_href_cid()
+            attachments = [part for part in attachments if part.content_id == cid]
+        if not attachments:
+            self.logger.error("No MTOM/XOP attachment part in response")
+            return
+        part = attachments[0]
+        return {"header": part.headers, "attachment": self.part_body(part)}
 
     @property
-    def attachment(self) -> bytes | None:
-        """Get MTOM/XOP raw binary attachment file"""
-        if not self.__dict__.get("_attachment"):
+    def attachment(self) -> memoryview | None:
+        """Get MTOM/XOP raw binary attachment file (a view on the response)"""
+        if self.__dict__.get("_attachment") is None:
             xop = self.get_xop_data()
             if isinstance(xop, dict):
                 self._attachment = xop.get("attachment")
-                return self._attachment
+        return self.__dict__.get("_attachment")
+
+    def has_xop_attachment(self) -> bool:
+        """A successful MTOM/XOP response (that can carry an attachment)"""
+        if self.raw.status_code != 200:
+            return False
+        return self.is_multipart() and self.is_xop_xml()
+
+    def save_attachment(
+        self,
+        file_path: str,
+        max_size: int = None,
+        chunk_size: int = XOP_STREAM_CHUNK_SIZE,
+    ) -> int | None:
+        """Stream the MTOM/XOP raw binary attachment straight to FILE_PATH.
+
+        For a response requested with `stream=True` the attachment is written
+        in chunks of CHUNK_SIZE and never held in memory; the download is
+        aborted as soon as it gets bigger than MAX_SIZE (in bytes).
+        The SOAP envelope is kept for the usual `is_valid()` checks.
+
+        Return the attachment size or None if there is no attachment
+        (or the response is not valid: nothing is saved then).
+        """
+        if not self.has_xop_attachment():
+            return
+        with self.attachment_writer(file_path, max_size) as parser:
+            parser.parse(self.raw.iter_content(chunk_size))
+        if len(parser.headers) > 1 and self.message.is_success:
+            return parser.attachment_size
+
+    @contextmanager
+    def attachment_writer(
+        self, file_path: str, max_size: int = None
+    ) -> Iterator[XopStreamParser]:
+        """Parser to `feed()` with the response chunks (e.g. from an async client).
+
+        The attachment is written to a temporary file, moved to FILE_PATH
+        only once the whole response was parsed and validated successfully."""
+        tmp_path = f"{file_path}.part"
+        try:
+            with open(tmp_path, "wb") as f:
+                parser = XopStreamParser(self.boundary(), f, max_size)
+                yield parser
+            if not parser.done:
+                raise KpmResponseError("Incomplete multipart response: no end boundary")
+            self._soap_envelope = self._root_envelope(parser)
+            if len(parser.headers) < 2:
+                self.logger.error("No MTOM/XOP attachment part in response")
+                os.remove(tmp_path)
+                return
+            if not self.is_valid():  # e.g. a KPM fault: no file in the cache
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _root_envelope(self, parser: XopStreamParser) -> Element:
+        content_type = parser.headers[0].get("content-type", "")
+        if "text/xml" not in content_type:
+            raise KpmResponseError(
+                f"Unexpected first body content-type. Expected: 'text/xml' "
+                f"but received {content_type}"
+            )
+        try:
+            return self.backend.fromstring(bytes(parser.root))
+        except Exception as ex:
+            raise KpmResponseError(f"Invalid XML in Response body: {ex}") from ex
 
 
 #######################################################################################################################
@@ -165,10 +205,16 @@ class DocumentReference:
         return f"\n{yaml.safe_dump({'DocumentReference': self.as_dict()})}"
 
     def __repr__(self) -> str:
-        return self.__str__()
+        # cheap (e.g. in log messages), the YAML is for `str()`
+        return f"DocumentReference(id={self.id!r}, name={self.name!r})"
 
 
 class DocumentListResponse(BaseResponse):
+    document_references_path = (
+        "soap:Body/kpm:GetDocumentListResponse"
+        "/GetDocumentListResponseInternal/DocumentReference"
+    )
+
     def get_document_list_response(self):
         match = "{http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3}GetDocumentListResponse"
         element = self.soap_body
@@ -184,18 +230,18 @@ class DocumentListResponse(BaseResponse):
         """List of KPM issue Documents"""
         if self.__dict__.get("_list"):
             return self._list
-        match = "DocumentReference"
-        element = self.get_document_list()
-        documents = element.findall(match)
+        documents = self.select(self.document_references_path)
         self._list = list(map(self._create_document_reference, documents))
         return self._list
 
     def _create_document_reference(self, step_item) -> DocumentReference:
+        # a single pass over the children (much cheaper than a `find()` each)
+        values = {child.tag: child.text for child in step_item}
         return DocumentReference(
-            id=self._find(step_item, "DocumentId").text,
-            name=self._find(step_item, "Name").text,
-            size=self._find(step_item, "Size").text,
-            access_right=self._find(step_item, "AccessRight").text,
-            suffix=self._find(step_item, "Suffix").text,
-            dtype=self._find(step_item, "Type").text,
+            id=values.get("DocumentId"),
+            name=values.get("Name"),
+            size=values.get("Size"),
+            access_right=values.get("AccessRight"),
+            suffix=values.get("Suffix"),
+            dtype=values.get("Type"),
         )
@@ -1,7 +1,18 @@
+# standard
+from typing import Iterator
+import xml.etree.ElementTree as ET
+
+# project extension
+from app.ext.kpm_audi.exceptions import KpmResponseError
 from app.ext.kpm_audi.soap_responses.base_response import BaseResponse
+from app.ext.kpm_audi.soap_responses.xop_stream import XOP_STREAM_CHUNK_SIZE
 
 
 class MultipleProblemDataResponse(BaseResponse):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._problem_references: list["ProblemReference"] = None
+
     def get_multiple_problem_data_response(self):
         match = f"{self.xmldef_kpm_v3}GetMultipleProblemDataResponse"
         element = self.soap_body
@@ -17,11 +28,82 @@ class MultipleProblemDataResponse(BaseResponse):
         element = self.get_multiple_problem_data_response_internal()
         return self._find(element, match)
 
-    def problem_references(self):
-        match = "ProblemReference"
-        element = self.get_multiple_problem_data_response_internal()
-        references = element.findall(match)
-        return list(map(self._create_reference, references))
+    def problem_references(self) -> list["ProblemReference"]:
+        """All the Problem References (built once, then cached)."""
+        if self._problem_references is None:
+            if self._soap_envelope is None and self.is_multipart():
+                # drain the incremental parser, it fills the cache
+                for _ in self.iter_problem_references():
+                    pass
+            else:
+                match = "ProblemReference"
+                element = self.get_multiple_problem_data_response_internal()
+                references = element.findall(match)
+                self._problem_references = list(map(self._create_reference, references))
+        return self._problem_references
+
+    def iter_problem_references(
+        self, chunk_size: int = XOP_STREAM_CHUNK_SIZE
+    ) -> Iterator["ProblemReference"]:
+        """Yield the Problem References one by one, as they are parsed.
+
+        The SOAP envelope is parsed incrementally (CHUNK_SIZE bytes at once)
+        and every <ProblemReference> element is dropped from the tree as soon
+        as it was read, so the caller can start working on the first problems
+        before the (possibly huge) response is parsed and the whole tree is
+        never held in memory. Once exhausted, the references are cached for
+        `problem_references()` and the envelope, without them, for the
+        usual `is_valid()` checks."""
+        if self._problem_references is not None:
+            yield from self._problem_references
+            return
+        if self._soap_envelope is not None or not self.is_multipart():
+            yield from self.problem_references()
+            return
+
+        content = self._root_part_content()
+        parser = ET.XMLPullParser(events=("start", "end"))
+        parents: list[ET.Element] = []
+        references: list[ProblemReference] = []
+        root = None
+        try:
+            for offset in range(0, len(content), chunk_size):
+                parser.feed(content[offset : offset + chunk_size])
+                for event, element in parser.read_events():
+                    if event == "start":
+                        if root is None:
+                            root = element
+                        parents.append(element)
+                        continue
+                    parents.pop()
+                    if element.tag != "ProblemReference":
+                        continue
+                    reference = self._create_reference(element)
+                    parents[-1].remove(element)
+                    references.append(reference)
+                    yield reference
+            parser.close()
+        except ET.ParseError as ex:
+            raise KpmResponseError(f"Invalid XML in Response body: {ex}") from ex
+        if root is None:
+            raise KpmResponseError("Could not find SOAP Envelope in response")
+
+        self._problem_references = references
+        self._soap_envelope = root
+
+    def _root_part_content(self) -> memoryview:
+        """The SOAP envelope (first part) of the multipart response."""
+        parts = self.parts()
+        if not parts:
+            # not a MTOM/XOP response: let `xml()` report what it is
+            self.xml()
+        root = parts[0]
+        if "text/xml" not in root.content_type:
+            raise KpmResponseError(
+                f"Unexpected first body content-type. Expected: 'text/xml' "
+                f"but received {root.content_type}"
+            )
+        return self.part_body(root)
 
     def kpm_ids(self):
         """Convenience method to get all KPM IDs."""
@@ -40,6 +122,8 @@ class MultipleProblemDataResponse(BaseResponse):
 
 
 class ProblemReference:
+    __slots__ = ("problem_number", "last_change_timestamp", "types")
+
     def __init__(self, number: str, timestamp: str, types: list[str]) -> None:
         self.problem_number = number
         self.last_change_timestamp = timestamp.split(".")[0]
@@ -1,5 +1,8 @@
 # standard
+from bisect import bisect_right
 from dataclasses import dataclass, asdict
+from datetime import datetime
+from heapq import merge
 from xml.etree.ElementTree import Element
 
 # 3rd party
@@ -10,6 +13,12 @@ from .base_response import BaseResponse
 from app.core.utils import xml_to_dict
 
 
+# ProcessStepTypeDescription of the steps the sync mirrors to Jira
+FEEDBACK_TO_OEM = "Lieferantenaussage"
+FEEDBACK_FROM_OEM = "Analyse abgeschlossen"
+ANSWER_FROM_OEM = "Antwort"  # e.g. "Antwort", any description containing it
+
+
 # ProcessStep:
 """
 '{http://schemas.xmlsoap.org/soap/envelope/}Body':
@@ -58,7 +67,7 @@ def user_data_to_dict(user: Element) -> dict:
     }
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessStep:
     creation_date: str
     creator: dict
@@ -78,10 +87,11 @@ class ProcessStep:
         return asdict(self)
 
     def __repr__(self) -> str:
-        return f"\n{yaml.safe_dump({'ProcessStep': self.as_dict()})}"
+        # cheap (e.g. in log messages), the YAML is for `str()`
+        return f"ProcessStep(step_id={self.step_id!r}, type={self.step_type_desc!r})"
 
     def __str__(self) -> str:
-        return self.__repr__()
+        return f"\n{yaml.safe_dump({'ProcessStep': self.as_dict()})}"
 
 
 class ProcessStepResponse(BaseResponse):
@@ -96,18 +106,29 @@ class ProcessStepResponse(BaseResponse):
         return self._find(element, match)
 
     def _create_process_step(self, step_item) -> ProcessStep:
+        # a single pass over the children (much cheaper than a `find()` each)
+        children = {child.tag: child for child in step_item}
+
+        def text(tag: str) -> str | None:
+            child = children.get(tag)
+            return None if child is None else child.text
+
+        def user(tag: str) -> dict:
+            child = children.get(tag)
+            return {} if child is None else user_data_to_dict(child)
+
         return ProcessStep(
-            creation_date=self._find(step_item, "CreationDate").text,
-            creator=user_data_to_dict(self._find(step_item, "Creator")),
-            last_change_date=self._find(step_item, "LastChangeDate").text,
-            last_changer=user_data_to_dict(self._find(step_item, "LastChanger")),
-            problem_number=self._find(step_item, "ProblemNumber").text,
-            step_id=self._find(step_item, "ProcessStepId").text,
-            step_type=self._find(step_item, "ProcessStepType").text,
-            step_type_desc=self._find(step_item, "ProcessStepTypeDescription").text,
-            sender_role=self._find(step_item, "SenderRole").text,
-            status=self._find(step_item, "Status").text,
-            text=self._find_text(step_item, "Text"),
+            creation_date=text("CreationDate"),
+            creator=user("Creator"),
+            last_change_date=text("LastChangeDate"),
+            last_changer=user("LastChanger"),
+            problem_number=text("ProblemNumber"),
+            step_id=text("ProcessStepId"),
+            step_type=text("ProcessStepType"),
+            step_type_desc=text("ProcessStepTypeDescription"),
+            sender_role=text("SenderRole"),
+            status=text("Status"),
+            text=text("Text") or "",
         )
 
     @property
@@ -156,7 +177,7 @@ class ProcessStepResponse(BaseResponse):
 ####################################################################################
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessStepItem:
     problem_number: str
     step_id: str
@@ -173,10 +194,117 @@ class ProcessStepItem:
         return f"\n{yaml.safe_dump({'ProcessStepItem': self.as_dict()})}"
 
     def __repr__(self) -> str:
-        return self.__str__()
+        return (
+            f"ProcessStepItem(step_id={self.step_id!r}, type={self.step_type_desc!r})"
+        )
+
+
+def change_date_key(last_change_date: str | datetime) -> str:
+    """Sortable key of a KPM LastChangeDate, whatever its format:
+    "2023-01-01-00.00.00.000001", "2023-01-01 00:00:00.000001" or a datetime
+    all become "20230101000000000001"."""
+    if isinstance(last_change_date, datetime):
+        return last_change_date.strftime("%Y%m%d%H%M%S%f")
+    return "".join(char for char in last_change_date or "" if char.isdigit())
+
+
+class ProcessStepIndex:
+    """The process steps of a list response grouped by step type code and by
+    step type description, each group ordered by LastChangeDate.
+
+    Built in a single pass over the steps: the groups only hold positions in
+    `items` (the response order), e.g. to select the steps newer than the last
+    one already synced with a binary search instead of a scan of the history.
+    """
+
+    __slots__ = ("items", "_keys", "_by_type", "_by_desc")
+
+    def __init__(self, items: list[ProcessStepItem]) -> None:
+        self.items = items
+        self._keys = [change_date_key(item.last_change_date) for item in items]
+        self._by_type: dict[str, list[int]] = {}
+        self._by_desc: dict[str, list[int]] = {}
+        for position, item in enumerate(items):
+            self._by_type.setdefault(item.step_type, []).append(position)
+            self._by_desc.setdefault(item.step_type_desc, []).append(position)
+        for groups in (self._by_type, self._by_desc):
+            for positions in groups.values():
+                positions.sort(key=self._keys.__getitem__)  # stable
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def step_types(self) -> list[str]:
+        return list(self._by_type)
+
+    @property
+    def step_type_descriptions(self) -> list[str]:
+        return list(self._by_desc)
+
+    def _positions(
+        self, step_type: str = None, step_type_desc: str = None, partial=False
+    ) -> list[int]:
+        """Positions of the selected steps, ordered by LastChangeDate.
+        PARTIAL: STEP_TYPE_DESC is a part of the description."""
+        if step_type is None and step_type_desc is None:
+            return sorted(range(len(self.items)), key=self._keys.__getitem__)
+        if step_type_desc is None:
+            return self._by_type.get(step_type, [])
+        if partial:
+            groups = [
+                positions
+                for desc, positions in self._by_desc.items()
+                if step_type_desc in (desc or "")
+            ]
+            positions = (
+                groups[0]
+                if len(groups) == 1
+                else list(merge(*groups, key=self._keys.__getitem__))
+            )
+        else:
+            positions = self._by_desc.get(step_type_desc, [])
+        if step_type is not None:
+            positions = [p for p in positions if self.items[p].step_type == step_type]
+        return positions
+
+    def steps(
+        self,
+        step_type: str = None,
+        step_type_desc: str = None,
+        partial=False,
+        newer_than: str | datetime = None,
+    ) -> list[ProcessStepItem]:
+        """The steps of type STEP_TYPE (code) and/or STEP_TYPE_DESC,
+        oldest first. NEWER_THAN: only the steps changed after that
+        LastChangeDate (e.g. the last one already synced)."""
+        positions = self._positions(step_type, step_type_desc, partial)
+        if newer_than is not None:
+            key = change_date_key(newer_than)
+            keys = [self._keys[position] for position in positions]
+            positions = positions[bisect_right(keys, key) :]
+        return [self.items[position] for position in positions]
+
+    def in_response_order(
+        self, step_type: str = None, step_type_desc: str = None, partial=False
+    ) -> list[ProcessStepItem]:
+        """The same selection as `steps()` in the order of the KPM response."""
+        positions = sorted(self._positions(step_type, step_type_desc, partial))
+        return [self.items[position] for position in positions]
+
+    def latest(
+        self, step_type: str = None, step_type_desc: str = None, partial=False
+    ) -> ProcessStepItem | None:
+        positions = self._positions(step_type, step_type_desc, partial)
+        return self.items[positions[-1]] if positions else None
 
 
 class ProcessStepListResponse(BaseResponse):
+    process_step_items_path = (
+        "soap:Body/kpm:GetProcessStepListResponse"
+        "/GetProcessStepListResponse/ProcessStepItem"
+    )
+
     def get_process_step_list_response(self):
         match = "{http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3}GetProcessStepListResponse"
         element = self.soap_body
@@ -192,59 +320,72 @@ class ProcessStepListResponse(BaseResponse):
         """List of Process steps."""
         if self.__dict__.get("_list"):
             return self._list
-        match = "ProcessStepItem"
-        element = self.get_process_step_list()
-        process_step_items = element.findall(match)
+        process_step_items = self.select(self.process_step_items_path)
         self._list = list(map(self._create_process_step_item, process_step_items))
         return self._list
 
     def _create_process_step_item(self, step_item) -> ProcessStepItem:
+        # a single pass over the children (much cheaper than a `find()` each)
+        values = {child.tag: child.text for child in step_item}
         return ProcessStepItem(
-            problem_number=self._find(step_item, "ProblemNumber").text,
-            step_id=self._find(step_item, "ProcessStepId").text,
-            last_change_date=self._find(step_item, "LastChangeDate").text,
-            step_type=self._find(step_item, "ProcessStepType").text,
-            step_type_desc=self._find(step_item, "ProcessStepTypeDescription").text,
-            status=self._find(step_item, "Status").text,
-            sender_role=self._find(step_item, "SenderRole").text,
+            problem_number=values.get("ProblemNumber"),
+            step_id=values.get("ProcessStepId"),
+            last_change_date=values.get("LastChangeDate"),
+            step_type=values.get("ProcessStepType"),
+            step_type_desc=values.get("ProcessStepTypeDescription"),
+            status=values.get("Status"),
+            sender_role=values.get("SenderRole"),
         )
 
+    @property
+    def index(self) -> ProcessStepIndex:
+        """The process steps grouped by type (built once per response)."""
+        if self.__dict__.get("_index") is None:
+            self._index = ProcessStepIndex(self.as_list)
+        return self._index
+
+    def steps_newer_than(
+        self,
+        last_change_date: str | datetime,
+        step_type: str = None,
+        step_type_desc: str = None,
+        partial=False,
+    ) -> list[ProcessStepItem]:
+        """The (selected) process steps changed after LAST_CHANGE_DATE,
+        oldest first: the delta since the last sync instead of the history."""
+        return self.index.steps(
+            step_type, step_type_desc, partial, newer_than=last_change_date
+        )
+
+    def _step_list(self, step_type_desc: str, partial=False) -> list[ProcessStepItem]:
+        # the step lists keep the order of the KPM response (as the Jira fields)
+        step_lists = self.__dict__.setdefault("_step_lists", {})
+        if (step_type_desc, partial) not in step_lists:
+            step_lists[(step_type_desc, partial)] = self.index.in_response_order(
+                step_type_desc=step_type_desc, partial=partial
+            )
+        return step_lists[(step_type_desc, partial)]
+
     @property
     def feedback_to_oem_step_list(self) -> list[ProcessStepItem]:
         """select all process steps where
         step['ProcessStepTypeDescription'] == "Lieferantenaussage" """
-        feedback_items: list = []
-        for process_step in self.as_list:
-            if process_step.step_type_desc == "Lieferantenaussage":
-                feedback_items.append(process_step)
-        return feedback_items
+        return self._step_list(FEEDBACK_TO_OEM)
 
     @property
     def feedback_from_oem_step_list(self) -> list[ProcessStepItem]:
         """select all process steps where
         step['ProcessStepTypeDescription'] == "Analyse abgeschlossen" """
-        feedback_items: list = []
-        for process_step in self.as_list:
-            if process_step.step_type_desc == "Analyse abgeschlossen":
-                feedback_items.append(process_step)
-        return feedback_items
+        return self._step_list(FEEDBACK_FROM_OEM)
 
     @property
     def questions_to_oem_step_list(self) -> list[ProcessStepItem]:
         """select all process steps where
         step['ProcessStepTypeDescription'] == "Analyse abgeschlossen" """
-        questions_to_oem: list = []
-        for process_step in self.as_list:
-            if process_step.step_type_desc == "Analyse abgeschlossen":
-                questions_to_oem.append(process_step)
-        return questions_to_oem
+        return self._step_list(FEEDBACK_FROM_OEM)
 
     @property
     def answers_from_oem_step_list(self) -> list[ProcessStepItem]:
         """select all process steps where
         step['ProcessStepTypeDescription'] == "Antwort" """
-        answers_from_oem: list = []
-        for process_step in self.as_list:
-            if "Antwort" in process_step.step_type_desc:
-                answers_from_oem.append(process_step)
-        return answers_from_oem
+        return self._step_list(ANSWER_FROM_OEM, partial=True)
@@ -0,0 +1,148 @@
+# standard
+from contextlib import suppress
+from os import getenv as env
+from threading import local
+from typing import Callable
+import xml.etree.ElementTree as ET
+
+# 3rd party
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - lxml is a regular dependency
+    lxml_etree = None
+
+
+NAMESPACES = {
+    "soap": "http://schemas.xmlsoap.org/soap/envelope/",
+    "kpm": "http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3",
+    "xop": "http://www.w3.org/2004/08/xop/include",
+}
+
+# "lxml" (default, if installed) or "etree" (the standard library)
+XML_BACKEND = env("KPM_XML_BACKEND", "lxml").lower()
+# bytes copied at a time when lxml parses a memoryview (e.g. an MTOM part)
+FEED_CHUNK_SIZE = 64 * 1024
+
+
+class EtreeBackend:
+    """Parse and query the KPM SOAP envelopes with `xml.etree.ElementTree`.
+
+    Paths are ElementPath expressions relative to the element they are
+    applied to, with the NAMESPACES prefixes, e.g.
+    "soap:Body/kpm:GetDocumentListResponse/GetDocumentListResponseInternal".
+    """
+
+    name = "etree"
+
+    def __init__(self) -> None:
+        self._compiled: dict[str, Callable] = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+    def fromstring(self, content: bytes):
+        return ET.fromstring(content)
+
+    def tostring(self, element) -> bytes:
+        return ET.tostring(element)
+
+    def findall(self, element, path: str) -> list:
+        """All the elements matching PATH (compiled once per backend)."""
+        compiled_paths = self._compiled_paths()
+        compiled = compiled_paths.get(path)
+        if compiled is None:
+            compiled = compiled_paths[path] = self._compile(path)
+        return compiled(element)
+
+    def find(self, element, path: str):
+        found = self.findall(element, path)
+        return found[0] if found else None
+
+    def _compiled_paths(self) -> dict[str, Callable]:
+        return self._compiled
+
+    def _compile(self, path: str) -> Callable:
+        def findall(element) -> list:
+            return element.findall(path, NAMESPACES)
+
+        return findall
+
+
+class LxmlBackend(EtreeBackend):
+    """Parse with lxml and query with compiled XPath expressions.
+
+    Elements parsed by another backend (e.g. the incremental ElementTree
+    parser of the query responses) are still queried with ElementPath.
+    Parser and XPath expressions are per thread (lxml objects are not
+    meant to be shared between threads)."""
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = local()
+
+    def _compiled_paths(self) -> dict[str, Callable]:
+        if not hasattr(self._local, "compiled"):
+            self._local.compiled = {}
+        return self._local.compiled
+
+    def fromstring(self, content: bytes):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if not hasattr(self._local, "parser"):
+            self._local.parser = lxml_etree.XMLParser(
+                remove_comments=True,
+                remove_pis=True,
+                resolve_entities=False,
+                no_network=True,
+                huge_tree=True,
+            )
+        if isinstance(content, memoryview):
+            return self._feed(self._local.parser, content)
+        return lxml_etree.fromstring(content, self._local.parser)
+
+    @staticmethod
+    def _feed(parser, content: memoryview):
+        """Parse CONTENT chunk by chunk: lxml only parses bytes, so copy
+        one chunk at a time and not the whole buffer."""
+        content = content.cast("B")
+        try:
+            for start in range(0, len(content), FEED_CHUNK_SIZE):
+                parser.feed(content[start : start + FEED_CHUNK_SIZE].tobytes())
+        except BaseException:
+            with suppress(lxml_etree.XMLSyntaxError):
+                parser.close()  # reset the (shared) parser
+            raise
+        return parser.close()
+
+    def tostring(self, element) -> bytes:
+        if isinstance(element, lxml_etree._Element):
+            return lxml_etree.tostring(element)
+        return super().tostring(element)
+
+    def _compile(self, path: str) -> Callable:
+        xpath = lxml_etree.XPath(path, namespaces=NAMESPACES)
+        fallback = super()._compile(path)
+
+        def findall(element) -> list:
+            if isinstance(element, lxml_etree._Element):
+                return xpath(element)
+            return fallback(element)
+
+        return findall
+
+
+_BACKENDS: dict[str, EtreeBackend] = {}
+
+
+def xml_backend(name: str = None) -> EtreeBackend:
+    """The (shared) backend NAME, XML_BACKEND by default.
+    ElementTree if lxml is not installed."""
+    name = (name or XML_BACKEND).lower()
+    if name == LxmlBackend.name and lxml_etree is None:
+        name = EtreeBackend.name
+    if name not in _BACKENDS:
+        backend_class = LxmlBackend if name == LxmlBackend.name else EtreeBackend
+        _BACKENDS[name] = backend_class()
+    return _BACKENDS[name]
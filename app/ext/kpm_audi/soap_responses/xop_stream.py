@@ -0,0 +1,186 @@
+# standard
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable
+
+# project extension
+from app.ext.kpm_audi.exceptions import KpmResponseError
+
+
+XOP_STREAM_CHUNK_SIZE = 64 * 1024  # in bytes
+XOP_ROOT_PART_MAX_SIZE = 10 * 1024 * 1024  # in bytes
+
+_PREAMBLE, _BOUNDARY, _HEADERS, _BODY, _END = range(5)
+
+
+def parse_part_headers(raw_headers: bytes) -> dict[str, str]:
+    """Headers of a multipart part, lower case names."""
+    headers = {}
+    for line in raw_headers.decode("utf-8", errors="replace").split("\r\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+@dataclass(frozen=True)
+class XopPart:
+    """A part of a multipart/related (MTOM/XOP) response:
+    its headers and where its body is in the response buffer."""
+
+    headers: dict[str, str]
+    offset: int
+    length: int
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "")
+
+    @property
+    def content_id(self) -> str:
+        return self.headers.get("content-id", "").strip("<>")
+
+    def body(self, buffer: bytes | memoryview) -> memoryview:
+        """The part body: a view on BUFFER, nothing is copied."""
+        return memoryview(buffer)[self.offset : self.offset + self.length]
+
+
+def index_parts(buffer: bytes, boundary: str) -> list[XopPart]:
+    """Index of all the parts of a complete multipart BUFFER, in one pass.
+
+    Only the (small) part headers are decoded, the bodies are read from the
+    buffer with `XopPart.body()`. Binary bodies may contain anything but the
+    delimiter (CRLF + "--" + BOUNDARY)."""
+    dash_boundary = f"--{boundary}".encode("utf-8")
+    delimiter = b"\r\n" + dash_boundary
+    parts = []
+    position = buffer.find(dash_boundary)
+    if position < 0:
+        return parts
+    position += len(dash_boundary)
+    end = len(buffer)
+    while end > position and buffer[end - 1] in b" \t\r\n":
+        end -= 1
+    # the close delimiter, or a last delimiter without its "--" (some recordings)
+    while position < end and not buffer.startswith(b"--", position):
+        line_end = buffer.find(b"\r\n", position)
+        headers_end = buffer.find(b"\r\n\r\n", line_end)
+        if line_end < 0 or headers_end < 0:
+            raise KpmResponseError("Incomplete multipart response: part headers")
+        headers = parse_part_headers(buffer[line_end + 2 : headers_end])
+        body_start = headers_end + 4
+        body_end = buffer.find(delimiter, body_start)
+        if body_end < 0:
+            raise KpmResponseError("Incomplete multipart response: no end boundary")
+        parts.append(XopPart(headers, body_start, body_end - body_start))
+        position = body_end + len(delimiter)
+    return parts
+
+
+class XopStreamParser:
+    """Incremental multipart/related (MTOM/XOP) parser.
+
+    Feed it the response chunks as they come from the network:
+    the first (root) part - the SOAP envelope - is kept in memory
+    (up to XOP_ROOT_PART_MAX_SIZE) and all the following (binary) parts
+    are written to ATTACHMENT_FILE without ever holding them in memory.
+
+    MAX_SIZE: abort as soon as the written attachment gets bigger.
+    """
+
+    def __init__(
+        self, boundary: str, attachment_file: BinaryIO, max_size: int = None
+    ) -> None:
+        self.boundary = f"--{boundary}".encode("utf-8")
+        self.delimiter = b"\r\n" + self.boundary
+        self.attachment_file = attachment_file
+        self.max_size = max_size
+        self.root = bytearray()
+        self.headers: list[dict[str, str]] = []  # headers of every part
+        self.attachment_size = 0
+        self._buffer = bytearray()
+        self._state = _PREAMBLE
+
+    @property
+    def done(self) -> bool:
+        return self._state == _END
+
+    def parse(self, chunks: Iterable[bytes]) -> "XopStreamParser":
+        for chunk in chunks:
+            self.feed(chunk)
+        if not self.done:
+            raise KpmResponseError("Incomplete multipart response: no end boundary")
+        return self
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done or not chunk:
+            return
+        self._buffer += chunk
+        while self._step():
+            pass
+
+    def _step(self) -> bool:
+        """Consume as much of the buffer as possible for the current state.
+        Return True if the state changed and there might be more to consume."""
+        buffer = self._buffer
+        if self._state == _PREAMBLE:
+            index = buffer.find(self.boundary)
+            if index < 0:
+                # keep what might be the beginning of the boundary
+                del buffer[: max(0, len(buffer) - len(self.boundary) + 1)]
+                return False
+            del buffer[: index + len(self.boundary)]
+            self._state = _BOUNDARY
+            return True
+        if self._state == _BOUNDARY:
+            if len(buffer) < 2:
+                return False
+            if buffer[:2] == b"--":
+                self._state = _END
+                buffer.clear()
+                return False
+            index = buffer.find(b"\r\n")
+            if index < 0:
+                return False
+            del buffer[: index + 2]
+            self._state = _HEADERS
+            return True
+        if self._state == _HEADERS:
+            index = buffer.find(b"\r\n\r\n")
+            if index < 0:
+                if len(buffer) > XOP_ROOT_PART_MAX_SIZE:
+                    raise KpmResponseError("Multipart part headers too long")
+                return False
+            self.headers.append(parse_part_headers(bytes(buffer[:index])))
+            del buffer[: index + 4]
+            self._state = _BODY
+            return True
+        if self._state == _BODY:
+            index = buffer.find(self.delimiter)
+            if index < 0:
+                # keep what might be the beginning of the delimiter
+                end = max(0, len(buffer) - len(self.delimiter) + 1)
+                self._write(buffer[:end])
+                del buffer[:end]
+                return False
+            self._write(buffer[:index])
+            del buffer[: index + len(self.delimiter)]
+            self._state = _BOUNDARY
+            return True
+        return False
+
+    def _write(self, data: bytearray) -> None:
+        if not data:
+            return
+        if len(self.headers) == 1:
+            self.root += data
+            if len(self.root) > XOP_ROOT_PART_MAX_SIZE:
+                raise KpmResponseError(
+                    f"SOAP envelope part bigger than {XOP_ROOT_PART_MAX_SIZE} bytes"
+                )
+            return
+        self.attachment_size += len(data)
+        if self.max_size is not None and self.attachment_size > self.max_size:
+            raise KpmResponseError(
+                f"Attachment bigger than expected: over {self.max_size} bytes"
+            )
+        self.attachment_file.write(data)
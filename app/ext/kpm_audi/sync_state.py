@@ -0,0 +1,159 @@
+# standard
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import os
+import re
+
+# project core
+from app.core.custom_logger import logger
+from app.core.core_config import (
+    KPM_SYNC_MAX_RETRIES,
+    KPM_SYNC_STATE_DIR,
+    KPM_SYNC_WATERMARK_OVERLAP_MINUTES,
+)
+
+# project extension
+from app.ext.kpm_audi.soap_responses.multiple_problem_data_response import (
+    ProblemReference,
+)
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"  # ProblemReference.last_change_timestamp
+
+
+class KpmSyncState:
+    """Persisted state of the KPM -> Jira sync of one KPM inbox (per service).
+
+    watermark: the highest `LastChangeTimestamp` of a sync cycle (that read
+    all the KPM issues). The next cycle queries KPM since the watermark minus
+    a safety overlap instead of a fixed lookback.
+
+    synced: `LastChangeTimestamp` of every KPM ticket at its last successful
+    sync. A ticket returned again by the query without a newer timestamp
+    (because of the overlap) has nothing new to sync.
+
+    failed: the tickets that failed to sync (`LastChangeTimestamp` and
+    attempts), retried by KPM ID in the next cycles, at most MAX_RETRIES
+    times, instead of holding the watermark back (a ticket that fails on
+    every run, e.g. no access, would pin it). A new change in KPM brings the
+    ticket back with the query anyway.
+    """
+
+    def __init__(
+        self,
+        inbox: str,
+        service: str = "",
+        state_dir: str = KPM_SYNC_STATE_DIR,
+        overlap_minutes: int = KPM_SYNC_WATERMARK_OVERLAP_MINUTES,
+        max_retries: int = KPM_SYNC_MAX_RETRIES,
+    ) -> None:
+        self.inbox = inbox
+        self.service = service
+        self.overlap = timedelta(minutes=overlap_minutes)
+        self.max_retries = max_retries
+        self.logger = logger
+        Path(state_dir).mkdir(parents=True, exist_ok=True)
+        file_name = re.sub(r"\W+", "_", f"{service}_{inbox}").strip("_") or "default"
+        self.path = Path(state_dir) / f"{file_name}.json"
+        self.watermark: str | None = None
+        self.synced: dict[str, str] = {}
+        self.failed: dict[str, dict] = {}
+        self.load()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.inbox}, watermark={self.watermark})"
+
+    def load(self) -> None:
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ignoring unreadable KPM sync state {self.path}: {e}")
+            return
+        self.watermark = state.get("watermark")
+        self.synced = state.get("synced", {})
+        self.failed = state.get("failed", {})
+
+    def save(self) -> None:
+        state = {"service": self.service, "inbox": self.inbox}
+        state["watermark"] = self.watermark
+        state["synced"] = self.synced
+        state["failed"] = self.failed
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def since(self, default: str) -> str:
+        """KPM query `since`: the watermark minus the overlap or DEFAULT."""
+        if not self.watermark:
+            return default
+        since = datetime.strptime(self.watermark, TIMESTAMP_FORMAT) - self.overlap
+        return f"{since.strftime(TIMESTAMP_FORMAT)}.0"
+
+    def is_unchanged(self, reference: ProblemReference) -> bool:
+        """True if the ticket did not change since its last successful sync."""
+        synced_timestamp = self.synced.get(reference.problem_number)
+        return bool(
+            synced_timestamp and reference.last_change_timestamp <= synced_timestamp
+        )
+
+    def retry_kpm_ids(self) -> list[str]:
+        """The KPM IDs of the tickets that failed to sync, to retry."""
+        return list(self.failed)
+
+    def _failed(self, kpm_id: str, timestamp: str) -> None:
+        failure = self.failed.get(kpm_id)
+        if not failure or timestamp > failure["timestamp"]:  # a new change
+            failure = {"timestamp": timestamp, "attempts": 0}
+        failure["attempts"] += 1
+        if failure["attempts"] > self.max_retries:
+            self.logger.warning(
+                f"KPM {kpm_id} failed to sync {failure['attempts']} times: "
+                "not retried until it changes in KPM again"
+            )
+            self.failed.pop(kpm_id, None)
+        else:
+            self.failed[kpm_id] = failure
+
+    def update(
+        self,
+        references: list[ProblemReference],
+        synced_kpm_ids: list[str],
+        retried_kpm_ids: list[str] = (),
+    ) -> None:
+        """Record the successfully synced tickets, the failed ones (returned
+        by the query or RETRIED_KPM_IDS) to retry, and move the watermark up
+        to the newest change of the query."""
+        synced_kpm_ids = set(synced_kpm_ids)
+        queried = set()
+        for reference in references:
+            kpm_id = reference.problem_number
+            queried.add(kpm_id)
+            if kpm_id in synced_kpm_ids:
+                self.synced[kpm_id] = max(
+                    reference.last_change_timestamp, self.synced.get(kpm_id, "")
+                )
+                self.failed.pop(kpm_id, None)
+            elif not self.is_unchanged(reference):
+                self._failed(kpm_id, reference.last_change_timestamp)
+        for kpm_id in set(retried_kpm_ids) - queried:
+            if kpm_id in synced_kpm_ids:
+                self.failed.pop(kpm_id, None)
+            elif kpm_id in self.failed:
+                self._failed(kpm_id, self.failed[kpm_id]["timestamp"])
+
+        timestamps = [reference.last_change_timestamp for reference in references]
+        watermark = max(timestamps) if timestamps else self.watermark
+        if watermark and (not self.watermark or watermark > self.watermark):
+            self.watermark = watermark
+
+        # older tickets can't be returned by the next query without a new change
+        oldest = self.since(default="").split(".")[0]
+        self.synced = {
+            kpm_id: timestamp
+            for kpm_id, timestamp in self.synced.items()
+            if timestamp >= oldest
+        }
+        self.save()
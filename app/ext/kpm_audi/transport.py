@@ -0,0 +1,179 @@
+# standard
+from dataclasses import dataclass, field
+from random import uniform
+from threading import Lock
+
+# external
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+
+# SOAP actions (BaseRequest.action) that only read data and are safe to resend
+IDEMPOTENT_ACTIONS = (
+    "GetDevelopmentProblemDataRequest",
+    "GetMultipleProblemDataRequest",
+    "GetProcessStepListRequest",
+    "GetProcessStepRequest",
+    "GetDocumentListRequest",
+    "GetDocumentRequest",
+)
+RETRY_ON_STATUS = (502, 503, 504)
+RETRY_ON_EXCEPTIONS = (ConnectionError, Timeout)
+LATENCY_SAMPLES = 1000  # per operation
+
+
+@dataclass
+class KpmTransportConfig:
+    """HTTP transport settings of the KPM client.
+
+    Timeouts are in seconds, `read_timeouts` per SOAP action
+    (e.g. the attachments download needs far more than the step list).
+    Only the `idempotent_actions` are retried, with a jittered exponential
+    backoff: random between 0 and min(backoff_max, backoff_base * 2 ** attempt).
+    """
+
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    keep_alive: bool = True
+    connect_timeout: float = 10
+    read_timeout: float = 60
+    read_timeouts: dict[str, float] = field(
+        default_factory=lambda: {
+            "GetProcessStepListRequest": 30,
+            "GetProcessStepRequest": 30,
+            "GetDocumentListRequest": 30,
+            "GetDevelopmentProblemDataRequest": 30,
+            "GetMultipleProblemDataRequest": 120,
+            "GetDocumentRequest": 600,
+        }
+    )
+    retries: int = 3
+    backoff_base: float = 1
+    backoff_max: float = 20
+    idempotent_actions: tuple[str] = IDEMPOTENT_ACTIONS
+
+    def timeout(self, action: str = None) -> tuple[float, float]:
+        """(connect, read) timeout for the given SOAP action"""
+        return (
+            self.connect_timeout,
+            self.read_timeouts.get(action, self.read_timeout),
+        )
+
+    def can_retry(self, action: str = None) -> bool:
+        return self.retries > 0 and action in self.idempotent_actions
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number ATTEMPT (starting with 0)."""
+        return uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def mount(self, session: Session) -> Session:
+        """Mount the pooled HTTP adapter on SESSION.
+
+        The retries are handled by the client (per SOAP action),
+        not by the adapter, since all SOAP calls are POST requests."""
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {"Connection": "keep-alive" if self.keep_alive else "close"}
+        )
+        return session
+
+
+@dataclass
+class PostVerifyConfig:
+    """How to check that a process step posted to KPM (supplier response,
+    supplier question) made it into the Process Step List.
+
+    The checks are retried after `first_delay`, then with an exponential
+    backoff (`backoff_factor`, capped to `max_delay`), until `deadline`
+    (all in seconds, from the post or from the start of a batch).
+    `deferred`: don't wait after posting, queue the check and do all the
+    queued ones together at the end of the sync cycle.
+    """
+
+    first_delay: float = 0.25
+    backoff_factor: float = 2
+    max_delay: float = 4
+    deadline: float = 15
+    deferred: bool = False
+
+    def delays(self):
+        """Seconds to wait before each check, as long as the deadline allows."""
+        delay, waited = self.first_delay, 0
+        while waited + delay <= self.deadline:
+            yield delay
+            if delay <= 0:  # no backoff possible, check only once
+                return
+            waited += delay
+            delay = min(self.max_delay, delay * self.backoff_factor)
+
+
+class OperationLatency:
+    """Thread safe latency numbers per SOAP operation."""
+
+    def __init__(self, max_samples: int = LATENCY_SAMPLES) -> None:
+        self.max_samples = max_samples
+        self._lock = Lock()
+        self._samples: dict[str, list[float]] = {}
+        self._retries: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+
+    def record(self, action: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(action, [])
+            samples.append(seconds)
+            if len(samples) > self.max_samples:
+                del samples[0]
+
+    def retried(self, action: str) -> None:
+        with self._lock:
+            self._retries[action] = self._retries.get(action, 0) + 1
+
+    def failed(self, action: str) -> None:
+        with self._lock:
+            self._errors[action] = self._errors.get(action, 0) + 1
+
+    def stats(self, action: str) -> dict:
+        """count, avg, p50, p95, max (in seconds), retries and errors"""
+        with self._lock:
+            samples = sorted(self._samples.get(action, []))
+            retries = self._retries.get(action, 0)
+            errors = self._errors.get(action, 0)
+        stats = {"count": len(samples), "retries": retries, "errors": errors}
+        if samples:
+            stats.update(
+                avg=round(sum(samples) / len(samples), 3),
+                p50=round(samples[int(0.5 * (len(samples) - 1))], 3),
+                p95=round(samples[int(0.95 * (len(samples) - 1))], 3),
+                max=round(samples[-1], 3),
+            )
+        return stats
+
+    def summary(self) -> dict[str, str]:
+        """One line per SOAP operation, e.g. for the sync report."""
+        with self._lock:
+            actions = sorted({*self._samples, *self._retries, *self._errors})
+        summary = {}
+        for action in actions:
+            stats = self.stats(action)
+            line = f"n={stats['count']}"
+            if stats["count"]:
+                line += (
+                    f" avg={stats['avg']}s p50={stats['p50']}s"
+                    f" p95={stats['p95']}s max={stats['max']}s"
+                )
+            line += f" retries={stats['retries']} errors={stats['errors']}"
+            summary[action] = line
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._retries.clear()
+            self._errors.clear()
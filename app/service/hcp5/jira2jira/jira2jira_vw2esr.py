@@ -10,6 +10,7 @@ from jira.exceptions import JIRAError
 import yaml
 
 # project core
+from app.core.custom_logger import Deferred, as_yaml, deferred_logger
 from app.core.utils import timed_cache, performance_check, approximate_comparison
 
 
@@ -62,7 +63,9 @@ class NewEsrJiraFromVwAudiJira:
             self.logger.debug("Not a valid ticket", vw_id=vw_id)
             return
 
-        self.logger.debug(f"{vw_id} VW Audi ticket yaml:\n{vw_ticket.yaml}")
+        deferred_logger.debug(
+            "{} VW Audi ticket yaml:\n{}", vw_id, Deferred(vw_ticket.as_yaml)
+        )
 
         # 3. Convert VW Jira ticket to Jira ticket
         ticket_ready_for_esr_jira: EsrIssueForVwJiraSync = self.transformer.to_esr_jira(
@@ -113,7 +116,7 @@ class NewEsrJiraFromVwAudiJira:
         # ESR Jira -> VW Jira
         # 5. ADD ESR Labs label to VW
         if POST_BACK_TO_VW_JIRA:
-            self.vw_jira.add_label(vw_id, "ESR")
+            self.vw_jira.add_label(vw_ticket, "ESR")
         else:
             self.logger.warning(
                 "POST_BACK_TO_VW_JIRA is set to False. "
@@ -194,10 +197,10 @@ class SyncHCP5JiraEsrFromJiraVwAudi(NewEsrJiraFromVwAudiJira):
         # compare lists
         docs_missing_or_different = self.compare_docs_details(vw_docs, esr_docs)
         if docs_missing_or_different:
-            self.logger.warning(
-                f"There are {len(docs_missing_or_different)} "
-                "VW docs missing or different in ESR Jira:\n"
-                f"{yaml.safe_dump(docs_missing_or_different)}",
+            deferred_logger.warning(
+                "There are {} VW docs missing or different in ESR Jira:\n{}",
+                len(docs_missing_or_different),
+                as_yaml(docs_missing_or_different),
                 vw_id=vw_id,
                 esr_id=esr_id,
             )
@@ -407,21 +410,15 @@ class SyncHCP5JiraEsrFromJiraVwAudi(NewEsrJiraFromVwAudiJira):
                 f" | 📆 updated: {updated_date}", ""
             )  # noqa: E501
         if not comment_header:
-            try:
-                err_msg = (
-                    "Failed to create the Comment header -> "
-                    f"Comment ID {comment} raw:\n{yaml.safe_dump(comment.raw)}"
-                )
-                self.logger.error(err_msg, vw_id=source_vw_jira_id)
-            except Exception:
-                err_msg = "Failed to create the Comment header"
-                self.logger.error(err_msg, vw_id=source_vw_jira_id)
-                print(
-                    f"FAILED conversion for Comment ID {comment} raw:\n"
-                    f"{yaml.safe_dump(comment.raw)}"
-                )
-            finally:
-                raise JiraCommentConversionError(err_msg)
+            deferred_logger.error(
+                "Failed to create the Comment header -> Comment ID {} raw:\n{}",
+                comment,
+                as_yaml(comment.raw),
+                vw_id=source_vw_jira_id,
+            )
+            raise JiraCommentConversionError(
+                f"Failed to create the Comment header -> Comment ID {comment}"
+            )
 
         return comment_header
 
@@ -540,7 +537,7 @@ class SyncHCP5JiraEsrFromJiraVwAudi(NewEsrJiraFromVwAudiJira):
             vw_description, esr_id
         )
         if not approximate_comparison(modified_vw_description, esr_description):
-            if self.esr_jira.update_description(esr_id, modified_vw_description):
+            if self.esr_jira.update_description(esr_issue, modified_vw_description):
                 self.logger.info(
                     "ESR Labs Jira Ticket description was different "
                     "than Cariad's and was updated successfully.",
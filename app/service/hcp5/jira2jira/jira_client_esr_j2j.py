@@ -1,11 +1,12 @@
 # standard
+import re
 
 # external
 from jira import JIRA, Issue
 from jira.exceptions import JIRAError
-import yaml
 
 # project core
+from app.core.custom_logger import Deferred, as_yaml, deferred_logger
 from app.core.utils import connection_retry
 from app.core.processors.exceptions import APIServerConnectionError
 from app.core.jira.exceptions import (
@@ -70,38 +71,21 @@ class ESRLabsJiraClientForVwJiraSync(ESRLabsJiraClient):
             )
             return
         if not fields:
-            try:
-                self.logger.error(
-                    'EsrIssueForVwJiraSync is missing ".fields" to be used '
-                    "for new Jira issue creation",
-                    vw_id=vw_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "vw_id" and "esr_id" extras'
-                )
-                self.logger.error(
-                    'EsrIssueForVwJiraSync is missing ".fields" to be used '
-                    "for new Jira issue creation"
-                )
-            return
-        try:
-            # FIXME: loguru inconsistent format error:
-            # ValueError: unmatched '{' in format spec
-            self.logger.debug(
-                f"Jira Issue {vw_id} .fields: \n{yaml.safe_dump(fields)}",
+            self.logger.error(
+                'EsrIssueForVwJiraSync is missing ".fields" to be used '
+                "for new Jira issue creation",
                 vw_id=vw_id,
             )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"{e} - loguru lib inconsistent custom format error when "
-                f'adding "vw_id" and "esr_id" extras'
-            )
-            self.logger.debug(f"Jira Issue {vw_id} .fields: \n{yaml.safe_dump(fields)}")
+            return
+        deferred_logger.debug(
+            "Jira Issue {} .fields: \n{}",
+            vw_id,
+            as_yaml(fields),
+            vw_id=vw_id,
+        )
 
-        self.logger.debug(
-            f"Issue Fields keys present (mapped from VW): {[k for k in fields.keys()]}"
+        deferred_logger.debug(
+            "Issue Fields keys present (mapped from VW): {}", Deferred(list, fields)
         )
 
         # actual posting the new Jira issue to Jira API server
@@ -137,7 +121,17 @@ class ESRLabsJiraClientForVwJiraSync(ESRLabsJiraClient):
         try:
             jql = f"{self.base_jql} AND {external_ref_jql}"
 
-            single_issue: list = self.query(jql)  # should be a list of one item
+            # the External Reference as text: "HCP5- 1234", "hcp5-1234" ...
+            pattern = r"\s*".join(re.escape(part) for part in ext_id.split())
+            if self.mirror and (
+                mirrored := self.mirror.issues_by_reference(
+                    rf"(?i)(?<!\w){pattern}(?!\d)"
+                )
+            ):
+                single_issue = self.from_mirror(mirrored)
+            else:
+                # should be a list of one item
+                single_issue: list = self.query(jql)
             if len(single_issue) > 1:
                 msg = (
                     f" ❌ ❌ Same External Reference for multiple Jira issues, "
@@ -148,7 +142,9 @@ class ESRLabsJiraClientForVwJiraSync(ESRLabsJiraClient):
             elif not single_issue:
                 msg = f"No issue found in Jira, based on the JQL: {jql}"
                 self.logger.warning(msg, vw_id=ext_id.strip(" "))
-                iss_by_ext_ref: list = self.query(external_ref_jql)
+                iss_by_ext_ref: list = self.query(
+                    external_ref_jql, self.field_map.overview_fields
+                )
                 if iss_by_ext_ref:
                     external_ref_issues = self.issues_relevant_data(iss_by_ext_ref)
                     msg = f"{external_ref_issues} ≠ JQL: " f"{jql.replace('\"', '')} "
@@ -176,26 +172,12 @@ class ESRLabsJiraClientForVwJiraSync(ESRLabsJiraClient):
                     f"Same Jira Issue Key [{ahcp5_id}]for multiple Jira issues, "
                     f"based on the JQL: {jql}"
                 )
-                try:
-                    self.logger.error(msg, esr_id=ahcp5_id)
-                except (ValueError, KeyError, IndexError) as e:
-                    self.logger.warning(
-                        f"{e} - loguru lib inconsistent custom "
-                        f'format error when adding "esr_id" extra'
-                    )
-                    self.logger.error(msg)
+                deferred_logger.error("{}", msg, esr_id=ahcp5_id)
                 # raise MultipleJiraIssuesFound(msg)
                 return
             elif not single_issue:
                 msg = f"No issue found in Jira, based on the JQL: {jql}"
-                try:
-                    self.logger.error(msg, esr_id=ahcp5_id)
-                except (ValueError, KeyError, IndexError) as e:
-                    self.logger.warning(
-                        f"{e} - loguru lib inconsistent custom "
-                        f'format error when adding "esr_id" extra'
-                    )
-                    self.logger.error(msg)
+                deferred_logger.error("{}", msg, esr_id=ahcp5_id)
                 # raise IssueNotFound(msg)
                 return
             return single_issue[0]
@@ -220,47 +202,23 @@ class ESRLabsJiraClientForVwJiraSync(ESRLabsJiraClient):
                 f"2 possible arguments: {vw_id=} / {esr_id=} "
             )
             return
-        try:
-            self.logger.debug(
-                "Checking if ticket already present in JIRA ... ",
-                vw_id=vw_id,
-                esr_id=esr_id,
-            )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"{e} - loguru lib inconsistent custom format "
-                f'error when adding "vw_id" and "esr_id" extras'
-            )
-            self.logger.debug(
-                f"Checking if ticket {vw_id=} {esr_id=} already present in JIRA ... "
-            )
+        self.logger.debug(
+            "Checking if ticket already present in JIRA ... ",
+            vw_id=vw_id,
+            esr_id=esr_id,
+        )
         if vw_id and (jira_issue := self.issue_by_ext_id(vw_id)):
-            try:
-                self.logger.warning(
-                    f"VW Jira ID already in Jira: {jira_issue}",
-                    vw_id=vw_id,
-                    esr_id=esr_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "vw_id" and "esr_id" extras'
-                )
-                self.logger.warning(f"VW Jira ID already in Jira: {jira_issue}")
+            deferred_logger.warning(
+                "VW Jira ID already in Jira: {}", jira_issue, vw_id=vw_id, esr_id=esr_id
+            )
             return jira_issue
         if esr_id and (jira_issue := self.issue(esr_id)):
-            try:
-                self.logger.warning(
-                    f"JIRA ID already exists in Jira: {jira_issue}",
-                    vw_id=vw_id,
-                    esr_id=esr_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "vw_id" and "esr_id" extras'
-                )
-                self.logger.warning(f"JIRA ID already exists in Jira: {jira_issue}")
+            deferred_logger.warning(
+                "JIRA ID already exists in Jira: {}",
+                jira_issue,
+                vw_id=vw_id,
+                esr_id=esr_id,
+            )
             return jira_issue
 
 
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 # external
 
 # project core
+from app.core.custom_logger import deferred_logger
 
 # project extension
 from app.ext.jira_esr.jira_issue import EsrLabsJiraIssue
@@ -51,24 +52,11 @@ class EsrIssueForVwJiraSync(EsrLabsJiraIssue):
         )
 
     def output_ok(self) -> bool:
-        # fields values (description field usually) contain code that might
-        # cause str format KeyError when added to logs
-        # e.g. src:DiagServiceEvents.hpp|lin:211|p_output:
-        # {"domainRepairInstructionId":1,"errorCode":50462751, ...
-        if self._output_ok_for_str_format is not None:
-            return self._output_ok_for_str_format
-        try:
-            jira_yml = self.get_all_fields_as_yaml()
-            self.logger.debug(
-                f"Checking JiraIssue for sync: \n{jira_yml}",
-                vw_id=self.vw_id,
-                esr_id=self.esr_id,
-            )
-            self._output_ok_for_str_format = True
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"logger failed to display value for ESR Jira Id {self.esr_id} "
-                f"| VW Jira Id {self.vw_id} , due to {e}"
-            )
-            self._output_ok_for_str_format = False
-        return self._output_ok_for_str_format
+        """`JiraIssueCore.output_ok()` with the VW and ESR Jira IDs in the log."""
+        deferred_logger.debug(
+            "Checking JiraIssue for sync: \n{}",
+            self.get_all_fields_as_yaml,
+            vw_id=self.vw_id,
+            esr_id=self.esr_id,
+        )
+        return True
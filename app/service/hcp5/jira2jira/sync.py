@@ -6,6 +6,9 @@ from time import sleep, perf_counter
 import yaml
 
 # project core
+from app.core.custom_logger import LOG_FORMATTING
+from app.core.http_cassette import http_cassette
+from app.core.jira.jira_mirror import JiraIssueMirror
 from app.core.utils import performance_check
 from app.core.jira.jira_utils import aggregated_tickets_link
 
@@ -26,6 +29,7 @@ from app.service.hcp5.jira2jira.config import (
     J2J_ESR_USE_JIRA_SERVER,
     J2J_VW_USE_JIRA_SERVER,
     MAPPER_BY_ISSUE_TYPE,
+    SERVICE_NAME,
     VW_JQL,
 )
 
@@ -43,6 +47,10 @@ class HCP5JiraJiraMainSync:
         if not self.esr_jira:
             if esrc := j2j_esr_jira_client():
                 self.esr_jira: ESRLabsJiraClient = esrc
+                # lookups by VW ID (External Reference) answered locally
+                esrc.mirror = JiraIssueMirror(
+                    esrc, SERVICE_NAME, esrc.field_map.external_reference
+                )
             else:
                 logger.error(
                     f"Failed to connect to ESR JIRA server {J2J_ESR_USE_JIRA_SERVER}"
@@ -120,50 +128,56 @@ class HCP5JiraJiraMainSync:
         except Exception as e:
             self.logger.error(f"Sync Cycle FAILED:\n{e}")
 
-        for ticket_type, vw_tickets_list in vw_tickets.items():
-            for vw_ticket in vw_tickets_list:
-                try:
-                    sleep(1)
-                    if vw_ticket.issue_type not in VW_JIRA_ISSUE_TYPES_TO_SYNC:
-                        msg = (
-                            f'Type {vw_ticket.issue_type} not in the "To Sync" list'
-                            f" {VW_JIRA_ISSUE_TYPES_TO_SYNC}"
-                        )
-                        self.logger.warning(
-                            f"Skipping VW issue {vw_ticket.info} -> " f"{msg}"
-                        )
-                        raise JiraIssueTypeNotAcceptedForSync(msg)
-
-                    self.logger.info(
-                        "\n\n\n#################### Starting to sync VW Jira ID "
-                        f"{vw_ticket.info} ####################\n\n\n"
-                    )
-                    ###### MAIN SYNC ENTRY POINT FOR SYNCING ONE ######
-                    esr_ticket: EsrIssueForVwJiraSync = self.sync_one(vw_ticket.jira_id)
+        # comments requested once per issue for the whole cycle
+        with self.vw_jira.sync_cycle(), self.esr_jira.sync_cycle():
+            for ticket_type, vw_tickets_list in vw_tickets.items():
+                for vw_ticket in vw_tickets_list:
+                    try:
+                        sleep(1)
+                        if vw_ticket.issue_type not in VW_JIRA_ISSUE_TYPES_TO_SYNC:
+                            msg = (
+                                f'Type {vw_ticket.issue_type} not in the "To Sync" list'
+                                f" {VW_JIRA_ISSUE_TYPES_TO_SYNC}"
+                            )
+                            self.logger.warning(
+                                f"Skipping VW issue {vw_ticket.info} -> " f"{msg}"
+                            )
+                            raise JiraIssueTypeNotAcceptedForSync(msg)
 
-                    if esr_ticket:
                         self.logger.info(
-                            "\n\n\n#################### Sync done for VW Jira ID "
-                            f"{esr_ticket.info} ####################\n\n\n"
+                            "\n\n\n#################### Starting to sync VW Jira ID "
+                            f"{vw_ticket.info} ####################\n\n\n"
                         )
-                    else:
-                        self.logger.error(f"Failed to sync VW ticket: {vw_ticket.info}")
-                        sync_report["FAILED"][vw_ticket.jira_id] = (
-                            f"No ESR ticket returned from the sync - please check "
-                            f"{self.__class__.__name__}.sync_one() code flow"
+                        ###### MAIN SYNC ENTRY POINT FOR SYNCING ONE ######
+                        esr_ticket: EsrIssueForVwJiraSync = self.sync_one(
+                            vw_ticket.jira_id
                         )
-                        continue
-                    if not sync_report["SYNCED"].get(ticket_type):
-                        sync_report["SYNCED"][ticket_type] = {}
-                    sync_report["SYNCED"][ticket_type][
-                        vw_ticket.ui_url
-                    ] = esr_ticket.ui_url
-                    all_synced_esr_ids.append(esr_ticket.esr_id)
-
-                except Exception as e:
-                    if not sync_report["FAILED"].get(ticket_type):
-                        sync_report["FAILED"][ticket_type] = {}
-                    sync_report["FAILED"][ticket_type][vw_ticket.jira_id] = f"{e}"
+
+                        if esr_ticket:
+                            self.logger.info(
+                                "\n\n\n#################### Sync done for VW Jira ID "
+                                f"{esr_ticket.info} ####################\n\n\n"
+                            )
+                        else:
+                            self.logger.error(
+                                f"Failed to sync VW ticket: {vw_ticket.info}"
+                            )
+                            sync_report["FAILED"][vw_ticket.jira_id] = (
+                                f"No ESR ticket returned from the sync - please check "
+                                f"{self.__class__.__name__}.sync_one() code flow"
+                            )
+                            continue
+                        if not sync_report["SYNCED"].get(ticket_type):
+                            sync_report["SYNCED"][ticket_type] = {}
+                        sync_report["SYNCED"][ticket_type][
+                            vw_ticket.ui_url
+                        ] = esr_ticket.ui_url
+                        all_synced_esr_ids.append(esr_ticket.esr_id)
+
+                    except Exception as e:
+                        if not sync_report["FAILED"].get(ticket_type):
+                            sync_report["FAILED"][ticket_type] = {}
+                        sync_report["FAILED"][ticket_type][vw_ticket.jira_id] = f"{e}"
 
         total_synced = len(all_synced_esr_ids)
         sync_report["TOTAL_SYNCED"] = total_synced
@@ -171,6 +185,11 @@ class HCP5JiraJiraMainSync:
 
         duration = ceil(int(perf_counter() - start) / 60)
         sync_report["DURATION"] = f"{duration} minutes"
+        # time spent rendering the (deferred) log payloads
+        sync_report["LOG_FORMATTING"] = LOG_FORMATTING.summary()
+        if cassette := http_cassette():
+            # recorded/replayed HTTP exchanges (e.g. to time an offline replay)
+            sync_report["HTTP_CASSETTE"] = cassette.summary()
 
         self.logger.info(f"Sync report:\n{yaml.safe_dump(sync_report, width=200)}")
 
@@ -1,5 +1,8 @@
 # standard
 
+# project core
+from app.core.custom_logger import deferred_logger
+
 # project extension
 from app.ext.jira_esr.jira_map import (
     ClusterMap,
@@ -216,14 +219,12 @@ class EsrJira2VwAudiJiraTransformer:
                 if labels:
                     new_esr_issue.labels = labels
 
-        yml = new_esr_issue.get_all_fields_as_yaml()
-        if new_esr_issue.output_ok():
-            self.logger.debug(
-                f"Devstack Cariad VW Audi Jira ticket {vw_id} "
-                f"is READY for ESR Jira:\n{yml}"
-            )
-        else:
-            self.logger.debug("TICKET READY FOR JIRA.", vw_id=vw_id)
+        deferred_logger.debug(
+            "Devstack Cariad VW Audi Jira ticket {} is READY for ESR Jira:\n{}",
+            vw_id,
+            new_esr_issue.get_all_fields_as_yaml,
+            vw_id=vw_id,
+        )
 
         return new_esr_issue
 
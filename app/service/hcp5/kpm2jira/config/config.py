@@ -49,6 +49,12 @@ if USE_KPM_SERVER != USE_JIRA_SERVER:
 else:
     logger.info(f"POST BACK TO KPM is set to TRUE for {USE_KPM_SERVER} server.")
 
+# optional: check the posts to KPM all together at the end of the sync cycle
+# instead of waiting for KPM after each one (a post is then reported as done
+# before it is verified: the ones not found are logged at the end and their
+# sync step runs again on the next cycle)
+DEFER_KPM_POST_VERIFICATION = False
+
 # VAULT SECRETS
 SECRETS_TO_SET = [
     "KPM_USER_ID",
@@ -6,6 +6,7 @@ from jira import Issue, JIRA
 from jira.exceptions import JIRAError
 
 # project core
+from app.core.custom_logger import deferred_logger
 from app.core.jira.exceptions import JiraApiError
 
 # project extension
@@ -93,27 +94,14 @@ class EsrLabsJiraIssueForKpmSync(EsrLabsJiraIssue):
         )
 
     def output_ok(self) -> bool:
-        # fields values (description field usually) contain code that might
-        # cause str format KeyError when added to logs
-        # e.g. src:DiagServiceEvents.hpp|lin:211|p_output:
-        # {"domainRepairInstructionId":1,"errorCode":50462751, ...
-        if self._output_ok_for_str_format is not None:
-            return self._output_ok_for_str_format
-        try:
-            jira_yml = self.get_all_fields_as_yaml()
-            self.logger.debug(
-                f"Checking JiraIssue for sync: \n{jira_yml}",
-                kpm_id=self.kpm_id,
-                jira_id=self.jira_id,
-            )
-            self._output_ok_for_str_format = True
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"logger failed to display value for Jira Id {self.jira_id} "
-                f"| KPM ID {self.kpm_id} , due to {e}"
-            )
-            self._output_ok_for_str_format = False
-        return self._output_ok_for_str_format
+        """`JiraIssueCore.output_ok()` with the KPM ID in the log."""
+        deferred_logger.debug(
+            "Checking JiraIssue for sync: \n{}",
+            self.get_all_fields_as_yaml,
+            kpm_id=self.kpm_id,
+            jira_id=self.jira_id,
+        )
+        return True
 
     def update_server_custom_fields(self, jira_client: JIRA, fields_to_update: list):
         """Update all changed field values to jira server
@@ -135,30 +123,20 @@ class EsrLabsJiraIssueForKpmSync(EsrLabsJiraIssue):
             if jira_ui_field_name not in fields_to_update:
                 continue
             field_value = self.get_field(custom_field_name)
-            try:
-                self.logger.debug(
-                    f"updating [{jira_ui_field_name}] to\n{field_value}",
-                    kpm_id=self.kpm_id,
-                    jira_id=self.jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.error(
-                    f"logger failed to display value for updating [{jira_ui_field_name}]"  # noqa: E501
-                    f" for Jira Id {self.jira_id} | KPM ID {self.kpm_id} , due to {e}"
-                )
+            deferred_logger.debug(
+                "updating [{}] to\n{}",
+                jira_ui_field_name,
+                field_value,
+                kpm_id=self.kpm_id,
+                jira_id=self.jira_id,
+            )
             update_fields_dict[custom_field_name] = field_value
         if not update_fields_dict:
-            try:
-                self.logger.info(
-                    "No custom fields to update to jira server. ",
-                    kpm_id=self.kpm_id,
-                    jira_id=self.jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"logger failed to display value for "
-                    f"Jira Id {self.jira_id} | KPM ID {self.kpm_id} , due to {e}"
-                )
+            self.logger.info(
+                "No custom fields to update to jira server. ",
+                kpm_id=self.kpm_id,
+                jira_id=self.jira_id,
+            )
             return
         try:
             self.logger.info(
@@ -166,8 +144,9 @@ class EsrLabsJiraIssueForKpmSync(EsrLabsJiraIssue):
                 f"for kpm_id {self.kpm_id} | jira_id {self.jira_id}"
             )
             server_issue.update(fields=update_fields_dict, jira=jira_client)
-            self.logger.info(
-                f"Successfully updated custom fields {fields_to_update} to jira server",
+            deferred_logger.info(
+                "Successfully updated custom fields {} to jira server",
+                fields_to_update,
                 kpm_id=self.kpm_id,
                 jira_id=self.jira_id,
             )
@@ -176,12 +155,6 @@ class EsrLabsJiraIssueForKpmSync(EsrLabsJiraIssue):
                 f"Failed to update fields to jira server due to Jira error: {e} ",
             )
             # kpm_id=self.kpm_id, jira_id=self.jira_id)
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"logger failed to display bulk fields update dict due to {e}",
-                kpm_id=self.kpm_id,
-                jira_id=self.jira_id,
-            )
         except Exception:
             self.logger.error(
                 "Failed to update fields to jira server. ",
@@ -1,7 +1,7 @@
 import json
 
 # proect core
-from app.core.custom_logger import logger
+from app.core.custom_logger import deferred_logger, logger
 
 # project extension
 from app.ext.kpm_audi.soap_responses.development_problem_data_response import (
@@ -204,11 +204,12 @@ class Mapper:
 
         jira_converted_ticket = self._mapper_to_jira(kpm_ticket)
 
-        yml = jira_converted_ticket.get_all_fields_as_yaml()
-        if jira_converted_ticket.output_ok():
-            self.logger.debug(f"KPM TICKET {kpm_id} READY FOR JIRA: {yml}")
-        else:
-            self.logger.debug("TICKET READY FOR JIRA.", kpm_id=kpm_id)
+        deferred_logger.debug(
+            "KPM TICKET {} READY FOR JIRA: {}",
+            kpm_id,
+            jira_converted_ticket.get_all_fields_as_yaml,
+            kpm_id=kpm_id,
+        )
         return jira_converted_ticket
 
 
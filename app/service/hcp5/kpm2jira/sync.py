@@ -6,7 +6,9 @@ from time import sleep, perf_counter
 import yaml
 
 # project core
-from app.core.custom_logger import logger
+from app.core.custom_logger import LOG_FORMATTING, logger
+from app.core.http_cassette import http_cassette
+from app.core.jira.jira_mirror import JiraIssueMirror
 from app.core.jira.jira_utils import aggregated_tickets_link
 from app.core.utils import (
     since_timestamp,
@@ -16,7 +18,12 @@ from app.core.utils import (
     save_json_sync_report,
 )
 from app.core.processors.exceptions import SyncConditionNotMet
-from app.core.core_config import APP_CACHE_DIR, APP_CACHE_HOLD_DAYS
+from app.core.sync_fingerprints import SyncFingerprintStore
+from app.core.core_config import (
+    APP_CACHE_DIR,
+    APP_CACHE_HOLD_DAYS,
+    APP_CACHE_PERSISTENT_DIRS,
+)
 
 # project extension
 from app.ext.kpm_audi.kpm_client import KPMClient
@@ -25,6 +32,7 @@ from app.ext.kpm_audi.soap_responses.multiple_problem_data_response import (
     ProblemReference,
 )
 from app.ext.kpm_audi.exceptions import KPMApiError
+from app.ext.kpm_audi.sync_state import KpmSyncState
 
 # project service
 from app.service.hcp5.kpm2jira.jira_esr_client_k2j import ESRLabsJiraClientForKpmSync
@@ -36,6 +44,7 @@ from .config import (
     USE_KPM_SERVER,
     USE_JIRA_SERVER,
     KPM_INBOX,
+    SERVICE_NAME,
     ENV,
     JIRA_SERVER_URL,
     JIRA_ID_FOR_SYNC_REPORTS,
@@ -47,6 +56,8 @@ class KPMJiraMainSync:
         self.logger = logger
         self.kpm: KPMClient = None
         self.jira: ESRLabsJiraClientForKpmSync = None
+        self.sync_state = KpmSyncState(KPM_INBOX, SERVICE_NAME)
+        self.fingerprints = SyncFingerprintStore(SERVICE_NAME)
 
     def connect(self) -> bool:
         if not self.kpm:
@@ -58,41 +69,60 @@ class KPMJiraMainSync:
         if not self.jira:
             if jc := esr_jira_client():
                 self.jira: ESRLabsJiraClientForKpmSync = jc
+                # lookups by KPM ID and updated time answered locally
+                jc.mirror = JiraIssueMirror(
+                    jc,
+                    SERVICE_NAME,
+                    jc.field_map.external_reference,
+                    # also "Question to OEM": tickets with a question to post
+                    fields=(
+                        *jc.field_map.key_fields,
+                        jc.field_map.extras.question_to_oem,
+                    ),
+                )
             else:
                 logger.error(f"Failed to connect to JIRA server {USE_JIRA_SERVER}")
                 return
         return True
 
     @performance_check
-    def sync_one(self, kpm_id: str):
+    def sync_one(self, kpm_id: str, full_resync: bool = False):
         if not self.connect():
             self.logger.error(
                 "Sync One Connection Error: Failed to connect to KPM or JIRA.",
                 kpm_id=kpm_id,
             )
             return
-        k2j = SyncJiraFromKPM(self.jira, self.kpm)
+        # the KPM Development Problem is requested only once for this ticket
+        with self.kpm.sync_cycle():
+            k2j = SyncJiraFromKPM(self.jira, self.kpm, fingerprints=self.fingerprints)
 
-        # Check if user has access to KPM ticket
-        if k2j.user_has_no_access_to_kpm_ticket(kpm_id):
-            raise KPMApiError(f"User has no access to KPM ticket {kpm_id}")
+            # Check if user has access to KPM ticket
+            if k2j.user_has_no_access_to_kpm_ticket(kpm_id):
+                raise KPMApiError(f"User has no access to KPM ticket {kpm_id}")
 
-        if not USE_KPM_SERVER == ENV.DEV:
-            if not k2j.validate_plant_and_org_unit(kpm_id):
-                raise SyncConditionNotMet(f"Different KPM INBOX than {KPM_INBOX}")
-        jira_ticket: EsrLabsJiraIssueForKpmSync = k2j.sync_one(kpm_id)
-        return jira_ticket
+            if not USE_KPM_SERVER == ENV.DEV:
+                if not k2j.validate_plant_and_org_unit(kpm_id):
+                    raise SyncConditionNotMet(f"Different KPM INBOX than {KPM_INBOX}")
+            jira_ticket: EsrLabsJiraIssueForKpmSync = k2j.sync_one(kpm_id, full_resync)
+            return jira_ticket
 
     @performance_check
-    def sync(self, since: str = None):
+    def sync(self, since: str = None, full_resync: bool = False):
         """
         Main sync function for synchronising CARIAD KPM to ESR LABS JIRA
         for multiple tickets: KPM to JIRA and JIRA to KPM sync.
+
+        FULL_RESYNC: sync every ticket found and all its sync steps,
+        even the ones unchanged since their last sync.
         """
         start = perf_counter()
 
-        if not since:
-            since = since_timestamp()
+        # incremental sync: only what changed since the last successful cycle
+        # (a given SINCE syncs again everything changed since then)
+        incremental = not since
+        if incremental:
+            since = self.sync_state.since(default=since_timestamp())
 
         try:
             if not self.connect():
@@ -101,8 +131,11 @@ class KPMJiraMainSync:
                 )
                 return
 
-            clean_cache_dir(APP_CACHE_DIR, APP_CACHE_HOLD_DAYS)
+            clean_cache_dir(
+                APP_CACHE_DIR, APP_CACHE_HOLD_DAYS, APP_CACHE_PERSISTENT_DIRS
+            )
             clean_reports_dir()
+            self.kpm.latency.reset()
 
             response: MultipleProblemDataResponse = self.kpm.query(since)
 
@@ -110,11 +143,6 @@ class KPMJiraMainSync:
                 self.logger.error(f"Failed to get KPM issues since {since}")
                 return
 
-            kpm_issues: list[ProblemReference] = response.problem_references()
-            kpm_issues.reverse()
-
-            tickets_by_kpm_id = [ticket.problem_number for ticket in kpm_issues]
-
             hours_to_check = 4
 
             jira_tickets_found: list[
@@ -132,11 +160,6 @@ class KPMJiraMainSync:
             jira_tickets_found.extend(question_to_oem_tickets)
             jira_tickets_found.extend(updated_tickets)
 
-            for jira_ticket in jira_tickets_found:
-                kpm_id = jira_ticket.kpm_id
-                if kpm_id.isnumeric() and kpm_id not in tickets_by_kpm_id:
-                    tickets_by_kpm_id.append(kpm_id)
-
         except KPMApiError as kpm_error:
             self.logger.error(
                 "Failed to request KPM issues -> "
@@ -144,16 +167,6 @@ class KPMJiraMainSync:
             )
             return
 
-        self.logger.info(
-            f"\n\n\nFound {len(kpm_issues)} KPM issues changed "
-            f"since: {since} for {USE_KPM_SERVER} KPM inbox:\n"
-        )
-        self.logger.info("-------------------------------------------------------")
-
-        for ticket in kpm_issues:
-            self.logger.info(ticket.summary)
-        self.logger.info("---------------------------------------------------------\n")
-
         self.logger.info(
             f"\n\n\nFound {len(jira_tickets_found)} JIRA issues "
             f"with ticket status or 'Question to OEM' changed "
@@ -168,53 +181,126 @@ class KPMJiraMainSync:
         self.logger.debug(f"Using KPM {USE_KPM_SERVER} server: {self.kpm}")
         self.logger.debug(f"Using JIRA {USE_JIRA_SERVER} server: {self.jira}")
         self.logger.info(
-            f"Will start to sync {len(tickets_by_kpm_id)} tickets KPM to JIRA "
-            "(and back) in 5 seconds..."
+            f"Will start to sync KPM issues changed since: {since} for "
+            f"{USE_KPM_SERVER} KPM inbox, then {len(jira_tickets_found)} JIRA "
+            "issues, KPM to JIRA (and back) in 5 seconds..."
         )
         sleep(4)
 
+        kpm_references: list[ProblemReference] = []
+        tickets_by_kpm_id: list[str] = []
+        skip_unchanged = incremental and not full_resync
+        unchanged_skipped = 0
+        kpm_query_error = None
+        retried: list[str] = []
+
+        def tickets_to_sync():
+            """KPM IDs to sync: the KPM issues of the query response
+            (unchanged ones skipped), the ones that failed in previous cycles,
+            then the ones of the JIRA issues found."""
+            nonlocal unchanged_skipped, kpm_query_error
+            try:
+                for ticket in response.iter_problem_references():
+                    kpm_references.append(ticket)
+                    if skip_unchanged and self.sync_state.is_unchanged(ticket):
+                        unchanged_skipped += 1
+                        continue
+                    self.logger.info(f"Found {ticket.summary}")
+                    tickets_by_kpm_id.append(ticket.problem_number)
+                    yield ticket.problem_number
+            except KPMApiError as kpm_error:
+                kpm_query_error = f"{kpm_error.__class__.__name__} -> {kpm_error}"
+                self.logger.error(f"Failed to read KPM issues -> {kpm_query_error}")
+            self.logger.info(
+                f"Found {len(kpm_references)} KPM issues changed since: {since}, "
+                f"skipped {unchanged_skipped} unchanged since their last sync."
+            )
+
+            for kpm_id in self.sync_state.retry_kpm_ids():
+                if kpm_id not in tickets_by_kpm_id:
+                    tickets_by_kpm_id.append(kpm_id)
+                    retried.append(kpm_id)
+                    yield kpm_id
+
+            for jira_ticket in jira_tickets_found:
+                kpm_id = jira_ticket.kpm_id
+                if kpm_id.isnumeric() and kpm_id not in tickets_by_kpm_id:
+                    tickets_by_kpm_id.append(kpm_id)
+                    yield kpm_id
+
         sync_report = {"SYNCED": {}, "FAILED": {}}
         all_synced_esr_ids = []
 
         # TODO: aggregate sync cycle results and send email report with webpage link
         # TODO: attachments downloaded & uploaded
         # TODO: how many attachments MB / minute
-        for kpm_id in tickets_by_kpm_id:
-            try:
-                sleep(1)
-
-                self.logger.info(
-                    "\n\n\n#################### "
-                    f"Starting to sync KPM {kpm_id} "
-                    "####################\n\n\n"
-                )
+        # Development Problems are fetched once per cycle, cleared at the end,
+        # and the Jira issues of the KPM IDs are resolved KPM_IDS_PER_QUERY at
+        # a time, as they are read from the KPM query response
+        with self.kpm.sync_cycle(), self.jira.sync_cycle():
+            for kpm_id in self.jira.resolving(tickets_to_sync()):
+                try:
+                    sleep(1)
+
+                    self.logger.info(
+                        "\n\n\n#################### "
+                        f"Starting to sync KPM {kpm_id} "
+                        "####################\n\n\n"
+                    )
 
-                ########### Sync one KPM to JIRA (and back) ##############
-                jira_ticket: EsrLabsJiraIssueForKpmSync = self.sync_one(kpm_id)
+                    ########### Sync one KPM to JIRA (and back) ##############
+                    jira_ticket: EsrLabsJiraIssueForKpmSync = self.sync_one(
+                        kpm_id, full_resync
+                    )
 
-                if not jira_ticket:
-                    err_msg = f"Failed to sync KPM {kpm_id} to JIRA."
-                    self.logger.error(err_msg)
-                    sync_report["FAILED"][kpm_id] = err_msg
-                    continue
+                    if not jira_ticket:
+                        err_msg = f"Failed to sync KPM {kpm_id} to JIRA."
+                        self.logger.error(err_msg)
+                        sync_report["FAILED"][kpm_id] = err_msg
+                        continue
+
+                    sync_report["SYNCED"][kpm_id] = jira_ticket.ui_url
+                    self.logger.info(
+                        "\n\n\n#################### "
+                        f"Sync done for {jira_ticket} | KPM {kpm_id} "
+                        "####################\n\n\n"
+                    )
+                    all_synced_esr_ids.append(jira_ticket.jira_id)
 
-                sync_report["SYNCED"][kpm_id] = jira_ticket.ui_url
-                self.logger.info(
-                    "\n\n\n#################### "
-                    f"Sync done for {jira_ticket} | KPM {kpm_id} "
-                    "####################\n\n\n"
-                )
-                all_synced_esr_ids.append(jira_ticket.jira_id)
-
-            except Exception as e:
-                self.logger.error(f"Failed to sync issue with KPM ID [{kpm_id}] -> {e}")
-                fail_reason_msg = f"{e.__class__.__name__} -> {e}"
-                if the_len := len(fail_reason_msg) > 500:
-                    fail_reason_msg = (
-                        f"{fail_reason_msg[:500]} "
-                        f"... [sliced to 500 chars of {the_len}] ..."
+                except Exception as e:
+                    self.logger.error(
+                        f"Failed to sync issue with KPM ID [{kpm_id}] -> {e}"
                     )
-                sync_report["FAILED"][kpm_id] = fail_reason_msg
+                    fail_reason_msg = f"{e.__class__.__name__} -> {e}"
+                    if the_len := len(fail_reason_msg) > 500:
+                        fail_reason_msg = (
+                            f"{fail_reason_msg[:500]} "
+                            f"... [sliced to 500 chars of {the_len}] ..."
+                        )
+                    sync_report["FAILED"][kpm_id] = fail_reason_msg
+
+            # posts to KPM queued during the cycle (deferred verification)
+            not_verified = self.kpm.verify_pending_posts()
+            # the status steps with a queued post are done if it was found
+            self.fingerprints.release(post.kpm_id for post in not_verified)
+            if not_verified:
+                sync_report["KPM_POSTS_NOT_VERIFIED"] = [
+                    str(post) for post in not_verified
+                ]
+
+        if kpm_query_error:
+            # not all the KPM issues were read: keep the previous watermark
+            sync_report["KPM_QUERY_FAILED"] = kpm_query_error
+        else:
+            try:
+                self.sync_state.update(
+                    kpm_references, list(sync_report["SYNCED"]), retried
+                )
+            except OSError as e:
+                self.logger.error(f"Failed to save KPM sync state: {e}")
+        sync_report["KPM_SINCE"] = since
+        sync_report["KPM_UNCHANGED_SKIPPED"] = unchanged_skipped
+        sync_report["KPM_FAILED_RETRIED"] = retried
 
         sync_report["TOTAL_SYNCED"] = len(sync_report["SYNCED"])
         sync_report["TOTAL_FAILED"] = len(sync_report["FAILED"])
@@ -226,6 +312,13 @@ class KPMJiraMainSync:
         )
         duration = ceil(int(perf_counter() - start) / 60)
         sync_report["DURATION"] = f"{duration} minutes"
+        # per SOAP operation latency numbers (to tune the KPM transport settings)
+        sync_report["KPM_LATENCY"] = self.kpm.latency.summary()
+        # time spent rendering the (deferred) log payloads
+        sync_report["LOG_FORMATTING"] = LOG_FORMATTING.summary()
+        if cassette := http_cassette():
+            # recorded/replayed HTTP exchanges (e.g. to time an offline replay)
+            sync_report["HTTP_CASSETTE"] = cassette.summary()
 
         yaml_sync_report = f"Sync report:\n{yaml.safe_dump(sync_report, width=200)}"
         self.logger.info(yaml_sync_report)
@@ -148,8 +148,14 @@ def processsteps(ctx, kpm_id: str) -> None:
         steps: list[ProcessStepItem] = response.as_list
         click.echo(f"Found {len(steps)} KPM process steps for issue: {kpm_id}.")
         click.echo("----------------------------------------------------------")
-        for step in steps:
-            client.process_step(kpm_id, step.step_id)
+        step_ids = [step.step_id for step in steps]
+        last_change_dates = [step.last_change_date for step in steps]
+        details = client.process_steps(kpm_id, step_ids, last_change_dates)
+        for step_id, step_details in zip(step_ids, details):
+            if not step_details:
+                click.echo(f"{step_id}   FAILED")
+                continue
+            click.echo(f"{step_id}   {step_details.step.step_type_desc}")
     except KPMApiError as ex:
         sys.exit(f"Failed to request KPM issue: {kpm_id} -> {ex}")
 
@@ -186,11 +192,13 @@ def query(ctx, since: str) -> None:  # noqa: F811
     try:
         client: KPMClient = ctx.obj["kpm_client"]
         response: MultipleProblemDataResponse = client.query(since=since)
-        issues: list[ProblemReference] = response.problem_references()
-        click.echo(f"Found {len(issues)} KPM issues changed since: {since}")
+        click.echo(f"KPM issues changed since: {since}")
         click.echo("--------------------------------------------------")
-        for ticket in issues:
+        for ticket in response.iter_problem_references():
             click.echo(ticket.summary)
+        issues: list[ProblemReference] = response.problem_references()
+        click.echo("--------------------------------------------------")
+        click.echo(f"Found {len(issues)} KPM issues changed since: {since}")
     except KPMApiError as kpm_error:
         sys.exit(
             "Failed to request KPM issues -> "
@@ -228,11 +236,12 @@ def diff(ctx, kpm_id: str) -> None:
 
 @k2j.command()
 @click.argument("kpm_id")
-def syncone(kpm_id: str) -> None:
+@click.option("--full", is_flag=True, help="Sync all, even what did not change")
+def syncone(kpm_id: str, full: bool) -> None:
     """Create a new Jira issue by KPM ID (External Reference)"""
     click.echo("Starting sync one from cli ...")
     try:
-        jira_ticket = KPMJiraMainSync().sync_one(kpm_id)
+        jira_ticket = KPMJiraMainSync().sync_one(kpm_id, full_resync=full)
 
         if jira_ticket:
             logger.info(
@@ -275,11 +284,16 @@ def sync1noerrcatch(kpm_id: str) -> None:
 
 
 @k2j.command()
-@click.option("--since", default=since_timestamp(), help="Last changed date")
-def sync(since) -> None:
+@click.option(
+    "--since",
+    default=None,
+    help="Last changed date (default: since the last successful sync)",
+)
+@click.option("--full", is_flag=True, help="Sync all, even what did not change")
+def sync(since, full: bool) -> None:
     """Create many new Jira issue by KPM IDS list from kpm query (External Reference)"""
     click.echo("Starting main sync from cli ...")
-    KPMJiraMainSync().sync(since)
+    KPMJiraMainSync().sync(since, full_resync=full)
 
 
 @k2j.command()
@@ -1,15 +1,21 @@
 # standard
+from contextlib import contextmanager
+from itertools import batched
+import re
+from typing import Iterable, Iterator
 
 # external
 from jira import JIRA, Issue
 from jira.exceptions import JIRAError
-import yaml
 
 # project core
+from app.core.custom_logger import Deferred, as_yaml, deferred_logger
 from app.core.utils import connection_retry, logger
 from app.core.processors.exceptions import APIServerConnectionError
+from app.core.jira.jira_client import ALL_FIELDS
 from app.core.jira.exceptions import (
     JiraApiError,
+    JiraRequestError,
     MultipleJiraIssuesFound,
     JQLorAppConfigQueryError,
 )
@@ -34,6 +40,10 @@ from app.service.mod.kpm2jira.config import (
 )
 
 
+# KPM IDs per "External Reference" query of `issues_by_kpm_ids()`
+KPM_IDS_PER_QUERY = 50
+
+
 class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
     """Wrapper around ESRLabsJiraClient client."""
 
@@ -64,6 +74,8 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
         )
         self.jira_issue_type = EsrLabsJiraIssueForKpmSync
         self.field_map = field_map if field_map else EsrLabsAhcp5JiraFieldMap()
+        # sync cycle: Jira issues (list) of each KPM ID resolved up front
+        self._cycle_issues: dict[str, list[EsrLabsJiraIssueForKpmSync]] = {}
 
     def add_ticket(self, jira_issue: EsrLabsJiraIssueForKpmSync) -> Issue | None:
         """Post a new Jira issue to Jira API server"""
@@ -76,42 +88,23 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
             )
             return
         if not fields:
-            try:
-                self.logger.error(
-                    'EsrLabsJiraIssueForKpmSync is missing ".fields" to be used '
-                    "for new Jira issue creation",
-                    kpm_id=kpm_id,
-                    jira_id=jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "kpm_id" and "jira_id" extras'
-                )
-                self.logger.error(
-                    'EsrLabsJiraIssueForKpmSync is missing ".fields" to be used '
-                    "for new Jira issue creation"
-                )
-            return
-        try:
-            # FIXME: loguru inconsistent format error:
-            # ValueError: unmatched '{' in format spec
-            self.logger.debug(
-                f"Jira Issue {jira_id} .fields: \n{yaml.safe_dump(fields)}",
+            self.logger.error(
+                'EsrLabsJiraIssueForKpmSync is missing ".fields" to be used '
+                "for new Jira issue creation",
                 kpm_id=kpm_id,
                 jira_id=jira_id,
             )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"{e} - loguru lib inconsistent custom format error when "
-                f'adding "kpm_id" and "jira_id" extras'
-            )
-            self.logger.debug(
-                f"Jira Issue {jira_id} .fields: \n{yaml.safe_dump(fields)}"
-            )
+            return
+        deferred_logger.debug(
+            "Jira Issue {} .fields: \n{}",
+            jira_id,
+            as_yaml(fields),
+            kpm_id=kpm_id,
+            jira_id=jira_id,
+        )
 
-        self.logger.debug(
-            f"Issue Fields keys present (mapped from KPM): {[k for k in fields.keys()]}"
+        deferred_logger.debug(
+            "Issue Fields keys present (mapped from KPM): {}", Deferred(list, fields)
         )
 
         # actual posting the new Jira issue to Jira API server
@@ -142,7 +135,96 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
             return issues_new_list[0]
         return issues_new_list
 
-    def issue_by_kpm_id(self, kpm_id: str) -> EsrLabsJiraIssueForKpmSync | None:
+    def _issues_of_kpm_ids(
+        self, kpm_ids: list[str], fields: str | tuple[str, ...] = ALL_FIELDS
+    ) -> dict[str, list[EsrLabsJiraIssueForKpmSync]]:
+        """The Jira issues of every KPM ID (an empty list if none), with one
+        query per KPM_IDS_PER_QUERY KPM IDs."""
+        kpm_ids = list(dict.fromkeys(k for k in kpm_ids if k and k.isdigit()))
+        issues: dict[str, list] = {kpm_id: [] for kpm_id in kpm_ids}
+        if self.mirror:  # only the KPM IDs not in the mirror are searched
+            mirrored: dict[str, list[dict]] = {}
+            for kpm_id in kpm_ids:
+                if (found := self.mirror.issues_by_number(kpm_id)) is not None:
+                    mirrored[kpm_id] = found
+            kpm_ids = [kpm_id for kpm_id in kpm_ids if kpm_id not in mirrored]
+            raw_issues = [raw for found in mirrored.values() for raw in found]
+            by_key = {i.jira_id: i for i in self.from_mirror(raw_issues, fields)}
+            for kpm_id, found in mirrored.items():
+                issues[kpm_id] = [by_key[r["key"]] for r in found if r["key"] in by_key]
+        for i in range(0, len(kpm_ids), KPM_IDS_PER_QUERY):
+            chunk = kpm_ids[i : i + KPM_IDS_PER_QUERY]
+            external_refs = " OR ".join(f'"External Reference" ~ {k}' for k in chunk)
+            jql = f"{self.base_jql} AND ({external_refs})"
+            for issue in self.query(jql, fields):
+                # "~" is a text search: keep the KPM IDs actually referenced
+                for kpm_id in set(chunk).intersection(
+                    re.findall(r"\d+", issue.kpm_id or "")
+                ):
+                    issues[kpm_id].append(issue)
+        return issues
+
+    def issues_by_kpm_ids(
+        self, kpm_ids: list[str], fields: str | tuple[str, ...] = ALL_FIELDS
+    ) -> dict[str, EsrLabsJiraIssueForKpmSync | None]:
+        """The Jira issues of many KPM IDs, instead of one "External Reference"
+        text search per KPM ID. The KPM IDs not in Jira are not in the dict,
+        the ones referenced by several Jira issues are flagged with None."""
+        issues = {}
+        for kpm_id, kpm_issues in self._issues_of_kpm_ids(kpm_ids, fields).items():
+            if len(kpm_issues) > 1:
+                self.logger.error(
+                    " ❌ ❌ Same External Reference for multiple Jira issues: "
+                    f"{[issue.jira_id for issue in kpm_issues]} ❌ ❌ ",
+                    kpm_id=kpm_id,
+                )
+                issues[kpm_id] = None
+            elif kpm_issues:
+                issues[kpm_id] = kpm_issues[0]
+        return issues
+
+    def resolve_kpm_ids(self, kpm_ids: list[str]) -> None:
+        """Resolve the Jira issues of KPM_IDS for the sync cycle (see
+        `sync_cycle()`), one query per KPM_IDS_PER_QUERY KPM IDs."""
+        try:
+            resolved = self._issues_of_kpm_ids(kpm_ids)
+        except (JIRAError, JiraRequestError) as e:
+            # each KPM ID is then looked up on its own
+            self.logger.error(f"Failed to resolve the Jira issues of KPM IDs: {e}")
+            return
+        self._cycle_issues.update(resolved)
+        self.logger.info(
+            f"Resolved {sum(map(bool, resolved.values()))} Jira issues "
+            f"for {len(resolved)} KPM IDs"
+        )
+
+    def resolving(self, kpm_ids: Iterable[str]) -> Iterator[str]:
+        """KPM_IDS as they come (e.g. streamed from the KPM query response),
+        their Jira issues resolved for the sync cycle KPM_IDS_PER_QUERY at a
+        time: one query per batch, without reading all the KPM IDs first."""
+        for batch in batched(kpm_ids, KPM_IDS_PER_QUERY):
+            self.resolve_kpm_ids(batch)
+            yield from batch
+
+    @contextmanager
+    def sync_cycle(self, kpm_ids: Iterable[str] = ()):
+        """Scope of a sync cycle: the Jira issues of KPM_IDS are resolved up
+        front (or per batch, see `resolving()`). `issue_by_kpm_id()` uses each
+        of them once (e.g. to find the issue to sync), later lookups (e.g. once
+        the issue is updated) query Jira again. The comments are cached as for
+        any Jira client cycle."""
+        if kpm_ids:
+            self.resolve_kpm_ids(kpm_ids)
+        try:
+            with super().sync_cycle():
+                yield self
+        finally:
+            self._cycle_issues = {}
+
+    def issue_by_kpm_id(
+        self, kpm_id: str, fields: str | tuple[str, ...] = ALL_FIELDS
+    ) -> EsrLabsJiraIssueForKpmSync | None:
+        """The Jira issue of KPM_ID (with FIELDS, all of them by default)."""
         try:
             if not kpm_id.isdigit():
                 return
@@ -150,7 +232,13 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
             external_ref_jql = f'"External Reference" ~ {kpm_id}'
             jql = f"{self.base_jql} AND {external_ref_jql}"
 
-            single_issue: list = self.query(jql)  # should be a list of one item
+            if kpm_id in self._cycle_issues:  # resolved for the sync cycle
+                single_issue: list = self._cycle_issues.pop(kpm_id)
+            elif self.mirror and (mirrored := self.mirror.issues_by_number(kpm_id)):
+                single_issue = self.from_mirror(mirrored, fields)
+            else:
+                # should be a list of one item
+                single_issue: list = self.query(jql, fields)
             if len(single_issue) > 1:
                 msg = (
                     f" ❌ ❌ Same External Reference for multiple Jira issues, "
@@ -163,7 +251,8 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
                 msg = f"No issue found in Jira, based on the JQL: {jql}"
                 self.logger.warning(msg, kpm_id=kpm_id)
                 iss_by_ext_ref: list = self.query(
-                    f'PROJECT = "{self.project_key}" ' f"AND {external_ref_jql}"
+                    f'PROJECT = "{self.project_key}" ' f"AND {external_ref_jql}",
+                    self.field_map.overview_fields,
                 )
                 if iss_by_ext_ref:
                     external_ref_issues = self.issues_relevant_data(iss_by_ext_ref)
@@ -192,32 +281,20 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
                     f"Same Jira Issue Key [{ahcp5_id}]for multiple Jira issues, "
                     f"based on the JQL: {jql}"
                 )
-                try:
-                    self.logger.error(msg, jira_id=ahcp5_id)
-                except (ValueError, KeyError, IndexError) as e:
-                    self.logger.warning(
-                        f"{e} - loguru lib inconsistent custom "
-                        f'format error when adding "jira_id" extra'
-                    )
-                    self.logger.error(msg)
+                deferred_logger.error("{}", msg, jira_id=ahcp5_id)
                 # raise MultipleJiraIssuesFound(msg)
                 return
             elif not single_issue:
                 msg = f"No issue found in Jira, based on the JQL: {jql}"
-                try:
-                    self.logger.error(msg, jira_id=ahcp5_id)
-                except (ValueError, KeyError, IndexError) as e:
-                    self.logger.warning(
-                        f"{e} - loguru lib inconsistent custom "
-                        f'format error when adding "jira_id" extra'
-                    )
-                    self.logger.error(msg)
+                deferred_logger.error("{}", msg, jira_id=ahcp5_id)
                 # raise IssueNotFound(msg)
                 return
             return single_issue[0]
 
     def get_jira_id_by_kpm_id(self, kpm_id: str) -> str:
-        jira_issue: EsrLabsJiraIssueForKpmSync = self.issue_by_kpm_id(kpm_id)
+        jira_issue: EsrLabsJiraIssueForKpmSync = self.issue_by_kpm_id(
+            kpm_id, self.field_map.key_fields
+        )
         if jira_issue:
             return jira_issue.jira_id
 
@@ -236,47 +313,23 @@ class ESRLabsJiraClientForKpmSync(ESRLabsJiraClient):
                 f"2 possible arguments: {kpm_id=} / {jira_id=} "
             )
             return
-        try:
-            self.logger.debug(
-                "Checking if ticket already present in JIRA ... ",
-                kpm_id=kpm_id,
-                jira_id=jira_id,
-            )
-        except (ValueError, KeyError, IndexError) as e:
-            self.logger.warning(
-                f"{e} - loguru lib inconsistent custom format "
-                f'error when adding "kpm_id" and "jira_id" extras'
-            )
-            self.logger.debug(
-                f"Checking if ticket {kpm_id=} {jira_id=} already present in JIRA ... "
-            )
+        self.logger.debug(
+            "Checking if ticket already present in JIRA ... ",
+            kpm_id=kpm_id,
+            jira_id=jira_id,
+        )
         if kpm_id and (jira_issue := self.issue_by_kpm_id(kpm_id)):
-            try:
-                self.logger.warning(
-                    f"KPM ID already in Jira: {jira_issue}",
-                    kpm_id=kpm_id,
-                    jira_id=jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "kpm_id" and "jira_id" extras'
-                )
-                self.logger.warning(f"KPM ID already in Jira: {jira_issue}")
+            deferred_logger.warning(
+                "KPM ID already in Jira: {}", jira_issue, kpm_id=kpm_id, jira_id=jira_id
+            )
             return jira_issue
         if jira_id and (jira_issue := self.issue(jira_id)):
-            try:
-                self.logger.warning(
-                    f"JIRA ID already exists in Jira: {jira_issue}",
-                    kpm_id=kpm_id,
-                    jira_id=jira_id,
-                )
-            except (ValueError, KeyError, IndexError) as e:
-                self.logger.warning(
-                    f"{e} - loguru lib inconsistent custom "
-                    f'format error when adding "kpm_id" and "jira_id" extras'
-                )
-                self.logger.warning(f"JIRA ID already exists in Jira: {jira_issue}")
+            deferred_logger.warning(
+                "JIRA ID already exists in Jira: {}",
+                jira_issue,
+                kpm_id=kpm_id,
+                jira_id=jira_id,
+            )
             return jira_issue
 
 
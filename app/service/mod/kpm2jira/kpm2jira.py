@@ -6,8 +6,9 @@ from jira import Issue
 from jira.exceptions import JIRAError
 
 # project core
-from app.core.custom_logger import logger
+from app.core.custom_logger import deferred_logger, logger
 from app.core.processors.exceptions import SyncConditionNotMet
+from app.core.sync_fingerprints import SyncFingerprintStore, fingerprint
 from app.core.utils import clean_str, clean_str_list, timed_cache
 
 # project extension
@@ -16,9 +17,11 @@ from app.ext.kpm_audi.soap_responses.development_problem_data_response import (
     DevelopmentProblemDataResponse,
 )
 from app.ext.kpm_audi.soap_responses.process_steps_response import (
+    ProcessStepItem,
     ProcessStepListResponse,
     ProcessStepResponse,
 )
+from app.ext.kpm_audi.soap_responses import DocumentReference
 from app.ext.kpm_audi.exceptions import KpmResponseError
 
 # project service
@@ -85,51 +88,35 @@ class NewJiraFromKPM(BaseSync):
         msg: str = "",
     ) -> bool | None:
         """It checks the inner filed data of a dict by providing:
-        ticket: kpm_ticket in the form of a dict
+        kpm_ticket: its DevelopmentProblem dict paths are indexed once
         filed_path: DevelopmentProblem/Supplier/Contractor/PersonalContractor/UserId
         data_to_match: in the form of a list of strings or single str
 
         return: True or None
         """
-        ticket = kpm_ticket.development_problem_as_dict()
-        if not isinstance(ticket, dict):
-            self.logger.error("Please pass ticket as dict here.")
+        if not kpm_ticket.development_problem_as_dict():
+            self.logger.error("No DevelopmentProblem in KPM ticket.", kpm_id=kpm_id)
             return
-        try:
-            self.logger.debug(
-                f"Splitting [{field_path}] inner dict path "
-                f"to look for {data_to_match}",
-                kpm_id=kpm_id,
-            )
-        except (ValueError, KeyError, IndexError):
-            self.logger.debug(
-                f"KPM ID {kpm_id} Splitting [{field_path}] inner dict path "
-            )
-        inner_keys_path = field_path.split("/")
-        val = ticket
-        for key in inner_keys_path:
-            val = val.get(key, {})
+        deferred_logger.debug(
+            "Looking up [{}] inner dict path to look for {}",
+            field_path,
+            data_to_match,
+            kpm_id=kpm_id,
+        )
+        val = kpm_ticket.value_at(field_path, {})
         if val and (val in data_to_match):
-            try:
-                self.logger.debug(
-                    f"{field_path}: {val} matches {data_to_match}", kpm_id=kpm_id
-                )
-            except (ValueError, KeyError, IndexError):
-                self.logger.debug(f"{field_path}: {val} match.")
+            deferred_logger.debug(
+                "{}: {} matches {}", field_path, val, data_to_match, kpm_id=kpm_id
+            )
             return True
         if val and not data_to_match:
-            self.logger.debug(f"{field_path} exists. Value {val}", kpm_id=kpm_id)
+            deferred_logger.debug("{} exists. Value {}", field_path, val, kpm_id=kpm_id)
             return True
         if not val:
             val = ""
-        try:
-            self.logger.error(
-                f"{field_path}: {val} not in {data_to_match}. {msg}", kpm_id=kpm_id
-            )
-        except Exception:
-            self.logger.error(
-                f"KPM ID {kpm_id} {field_path}: {val} not in {data_to_match}. {msg}"
-            )
+        deferred_logger.error(
+            "{}: {} not in {}. {}", field_path, val, data_to_match, msg, kpm_id=kpm_id
+        )
 
     @timed_cache
     def validate_plant_and_org_unit(self, kpm_id: str):
@@ -303,6 +290,9 @@ class SyncJiraFromKPM(NewJiraFromKPM):
     KPM -> Jira (most of the methods)
 
     Jira -> KPM (only for kpm.post_supplier_question (question to oem) + status changed)
+
+    With FINGERPRINTS, the sync phases whose inputs did not change
+    since their last successful run are skipped.
     """
 
     def __init__(
@@ -310,8 +300,10 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         jira_client: ESRLabsJiraClientForKpmSync,
         kpm_client: KPMClient,
         mapper: Mapper = None,
+        fingerprints: SyncFingerprintStore = None,
     ):
         super().__init__(jira_client, kpm_client, mapper)
+        self.fingerprints = fingerprints
 
     def jira_substeps_len(self, step: str) -> int:
         """Return the length of the process substep in Jira."""
@@ -321,6 +313,20 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         SPLIT_BY = "\n\n 📆 \t "
         return len(step.strip("\n\n").split(SPLIT_BY))
 
+    def process_steps_details(
+        self, kpm_id: str, process_steps: list[ProcessStepItem]
+    ) -> list[ProcessStepResponse | None]:
+        """Fetch the details of all given process steps in one KPM batch.
+
+        Returns the responses in the order of `process_steps`,
+        None for the steps that failed (already logged by the KPM client).
+        """
+        step_ids = [process_step.step_id for process_step in process_steps]
+        last_change_dates = [
+            process_step.last_change_date for process_step in process_steps
+        ]
+        return self.kpm.process_steps(kpm_id, step_ids, last_change_dates)
+
     # KPM -> Jira
     # Handle "Feedback to OEM":
     # TODO: merge with _add_feedback_from_oem and _add_answer_from_oem
@@ -348,15 +354,11 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         feedback_steps_to_post = 0
         kpm_feedback_steps_len = len(process_step_list.feedback_to_oem_step_list)
 
-        for i, process_step in enumerate(process_step_list.feedback_to_oem_step_list):
-            step_response_details: ProcessStepResponse = self.kpm.process_step(
-                process_step.problem_number, process_step.step_id
-            )
+        feedback_steps = self.process_steps_details(
+            jira_issue.kpm_id, process_step_list.feedback_to_oem_step_list
+        )
+        for i, step_response_details in enumerate(feedback_steps):
             if not step_response_details:
-                self.logger.error(
-                    f"Failed to get process step {process_step.step_id} ",
-                    kpm_id=process_step.problem_number,
-                )
                 continue
 
             kpm_step_for_jira_ui = step_response_details.for_jira_ui
@@ -421,15 +423,10 @@ class SyncJiraFromKPM(NewJiraFromKPM):
             return
         # set feedback from oem to jira issue
         all_feedback_from_oem: str = ""
-        for process_step in process_step_list.feedback_from_oem_step_list:
-            step_response_details: ProcessStepResponse = self.kpm.process_step(
-                process_step.problem_number, process_step.step_id
-            )
+        for step_response_details in self.process_steps_details(
+            jira_issue.kpm_id, process_step_list.feedback_from_oem_step_list
+        ):
             if not step_response_details:
-                self.logger.error(
-                    f"Failed to get process step {process_step.step_id} ",
-                    kpm_id=process_step.problem_number,
-                )
                 continue
             all_feedback_from_oem += step_response_details.for_jira_ui
         jira_issue.feedback_from_oem = all_feedback_from_oem
@@ -462,18 +459,13 @@ class SyncJiraFromKPM(NewJiraFromKPM):
             return
         # set answer from oem to jira issue
         all_answers_from_oem: str = ""
-        reverse_answers_from_oem = reversed(
-            process_step_list.answers_from_oem_step_list
+        reverse_answers_from_oem = list(
+            reversed(process_step_list.answers_from_oem_step_list)
         )
-        for process_step in reverse_answers_from_oem:
-            step_response_details: ProcessStepResponse = self.kpm.process_step(
-                process_step.problem_number, process_step.step_id
-            )
+        for step_response_details in self.process_steps_details(
+            jira_issue.kpm_id, reverse_answers_from_oem
+        ):
             if not step_response_details:
-                self.logger.error(
-                    f"Failed to get process step {process_step.step_id} ",
-                    kpm_id=process_step.problem_number,
-                )
                 continue
             all_answers_from_oem += step_response_details.for_jira_ui
         jira_issue.answer_from_oem = all_answers_from_oem
@@ -496,64 +488,67 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         self,
         jira_issue: EsrLabsJiraIssueForKpmSync,
         kpm_doc_name: str,
-        kpm_doc_data: bytes | str,
+        kpm_doc_path: str,
     ):
-        # Jira: Post attachment to Jira issue
-        attachment_response = self.jira.add_attachment(
-            jira_issue, kpm_doc_name, kpm_doc_data
-        )
+        # Jira: Post attachment to Jira issue (streamed from the KPM cache file)
+        with open(kpm_doc_path, "rb") as kpm_doc_file:
+            attachment_response = self.jira.add_attachment(
+                jira_issue, kpm_doc_name, kpm_doc_file
+            )
         self.logger.debug(f"{jira_issue}\n{attachment_response=}")
         return attachment_response
 
     # KPM -> Jira
     # KPM: Fetch document list
-    def sync_attachments(self, jira_issue: EsrLabsJiraIssueForKpmSync):
+    def sync_attachments(
+        self,
+        jira_issue: EsrLabsJiraIssueForKpmSync,
+        kpm_documents: list[DocumentReference] = None,
+    ) -> bool:
+        """Return False if any KPM document failed to get to Jira."""
         # Iterate attachments
         # kpm-attachments = list(attachment["Name"]}.{att["Suffix"]})
-        kpm_documents = self.kpm.get_document_list(jira_issue.kpm_id)
+        if kpm_documents is None:
+            kpm_documents = self.kpm.get_document_list(jira_issue.kpm_id)
         if not kpm_documents:
             self.logger.info(f"No documents found for KPM ticket {jira_issue.kpm_id}.")
-            return
+            return True
+        all_synced = True
         existing_jira_attachments = self.get_attachments_from_jira(jira_issue)
         existing_jira_attachments = clean_str_list(existing_jira_attachments)
         # download all documents
         for doc_ref in kpm_documents:
             kpm_doc_full_name = clean_str(f"{doc_ref.name}.{doc_ref.suffix}")
             if kpm_doc_full_name in existing_jira_attachments:
-                try:
-                    self.logger.info(
-                        f"Attachment {kpm_doc_full_name} already present. "
-                        "Ignoring it ...",
-                        kpm_id=jira_issue.kpm_id,
-                        jira_id=jira_issue.jira_id,
-                    )
-                except (ValueError, KeyError, IndexError):
-                    att_name = kpm_doc_full_name.strip("{").strip("}")
-                    self.logger.info(
-                        f"Attachment {att_name} already present. Ignoring it ..."
-                    )
+                deferred_logger.info(
+                    "Attachment {} already present. Ignoring it ...",
+                    kpm_doc_full_name,
+                    kpm_id=jira_issue.kpm_id,
+                    jira_id=jira_issue.jira_id,
+                )
                 continue
 
-            # KPM: Download Document
-            kpm_doc = self.kpm.get_document(
+            # KPM: Download Document (to the cache file)
+            kpm_doc_path = self.kpm.get_document(
                 jira_issue.kpm_id,
                 doc_ref.id,
                 doc_ref.name,
                 doc_ref.suffix,
                 doc_ref.size,
             )
-            # self.logger.debug(f'{kpm_doc=}')
+            # self.logger.debug(f'{kpm_doc_path=}')
 
             # Jira: Post attachment
-            if kpm_doc:
+            if kpm_doc_path:
                 jira_doc_post_success = self.post_attachment_to_jira(
-                    jira_issue, kpm_doc_full_name, kpm_doc
+                    jira_issue, kpm_doc_full_name, kpm_doc_path
                 )
             else:
                 self.logger.error(
                     f"KPM document download failed: {kpm_doc_full_name} "
                     f"[size: {doc_ref.size}] to {jira_issue}"
                 )
+                all_synced = False
                 continue
             if jira_doc_post_success:
                 self.logger.debug(
@@ -565,36 +560,35 @@ class SyncJiraFromKPM(NewJiraFromKPM):
                     f"Jira attachment post failed: {kpm_doc_full_name} "
                     f"[size: {doc_ref.size}]  to {jira_issue}"
                 )
+                all_synced = False
+        return all_synced
 
     # KPM -> Jira
-    def sync_ticket_extras_kpm2jira(self, jira_issue: EsrLabsJiraIssueForKpmSync):
+    def sync_ticket_extras_kpm2jira(
+        self,
+        jira_issue: EsrLabsJiraIssueForKpmSync,
+        process_steps: ProcessStepListResponse = None,
+    ):
         """Method of adding extra fields to an existing Jira issue
 
         jira_id: Already existing (in the Jira server)
         ticket ID 'AHCP5-...' (jira issue key)
 
-        kpm_ticket: the actual KPM ticket data, not only id
+        process_steps: the KPM process step list (requested if not given)
         """
-        process_steps: ProcessStepListResponse = self.kpm.process_step_list(
-            jira_issue.kpm_id
-        )
+        if process_steps is None:
+            process_steps = self.kpm.process_step_list(jira_issue.kpm_id)
 
         # self.logger.debug(f'process step list: {process_steps.as_list}',
         #                   kpm_id=jira_issue.kpm_id, jira_id=jira_issue.jira_id)
 
         if not process_steps.as_list:
-            try:
-                self.logger.warning(
-                    f"No process steps found: {process_steps}. "
-                    'Ignoring "extra/custom fields sync".',
-                    kpm_id=jira_issue.kpm_id,
-                    jira_id=jira_issue.jira_id,
-                )
-            except Exception:
-                self.logger.warning(
-                    f"No process steps found: {process_steps}. "
-                    'Ignoring "extra/custom fields sync".'
-                )
+            deferred_logger.warning(
+                'No process steps found: {}. Ignoring "extra/custom fields sync".',
+                process_steps,
+                kpm_id=jira_issue.kpm_id,
+                jira_id=jira_issue.jira_id,
+            )
             return True
 
         update = []
@@ -607,6 +601,7 @@ class SyncJiraFromKPM(NewJiraFromKPM):
             update.append(field)
 
         jira_issue.update_server_custom_fields(self.jira._client, update)
+        return True
 
     @timed_cache
     def add_issue(self, kpm_id: str) -> EsrLabsJiraIssueForKpmSync | None:
@@ -689,7 +684,7 @@ class SyncJiraFromKPM(NewJiraFromKPM):
                 f"{kpm_id=} != {jira_issue.kpm_id=}"
             )
             return
-        self.sync_status_and_question_to_oem_jira2kpm(jira_issue)
+        return self.sync_status_and_question_to_oem_jira2kpm(jira_issue)
 
     def user_has_no_access_to_kpm_ticket(self, kpm_id: str):
         """Check if user has access to KPM ticket"""
@@ -733,7 +728,7 @@ class SyncJiraFromKPM(NewJiraFromKPM):
 
     # KPM -> JIRA
     # JIRA -> KPM
-    def sync_one(self, kpm_id: str):
+    def sync_one(self, kpm_id: str, full_resync: bool = False):
         """Sync KPM -> JIRA entrypoint:
 
         1. CREATE new Jira issue from KPM id (if doesn't exist)
@@ -741,6 +736,9 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         2. ADD/UPDATE custom fields
 
         3. ADD/UPDATE attachments
+
+        Steps 2, 3 and 4 are skipped if their inputs did not change
+        since their last successful run (unless FULL_RESYNC).
         """
         # 1. CREATE/GET new Jira issue based on KPM id
         jira_issue: EsrLabsJiraIssueForKpmSync = self.add_issue(
@@ -749,17 +747,102 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         if not jira_issue:
             return
 
+        # fingerprints of the inputs of each step (None: inputs not available)
+        # Jira "updated" is not one of them: the steps themselves change it
+        process_steps = self.kpm.process_step_list(kpm_id)
+        extras_fingerprint = None
+        if process_steps:
+            steps = [(s.step_id, s.last_change_date) for s in process_steps.as_list]
+            extras_fingerprint = fingerprint(steps)
+        # the same for both XML backends (lxml / ElementTree)
+        kpm_ticket = self.kpm.development_problem(kpm_id)
+        development_problem = kpm_ticket.development_problem_as_dict()
+        status_fingerprint = None
+        if development_problem is not None:
+            status_fingerprint = self.status_fingerprint(
+                jira_issue, development_problem
+            )
+        kpm_documents = self.kpm.get_document_list(kpm_id)
+        attachments_fingerprint = None
+        if kpm_documents is not None:
+            documents = [(doc.id, doc.size) for doc in kpm_documents]
+            attachments_fingerprint = fingerprint(documents)
+
         # 2. ADD/UPDATE JIRA custom fields (KPM -> JIRA)
-        self.sync_ticket_extras_kpm2jira(jira_issue)
+        if full_resync or not self.phase_unchanged(
+            jira_issue, "extras", extras_fingerprint
+        ):
+            if self.sync_ticket_extras_kpm2jira(jira_issue, process_steps):
+                self.phase_done(jira_issue, "extras", extras_fingerprint)
 
         # 3. ADD/UPDATE JIRA custom fields + status (JIRA -> KPM)
-        self.sync_status_and_extras_jira2kpm(jira_issue)
+        if full_resync or not self.phase_unchanged(
+            jira_issue, "status", status_fingerprint
+        ):
+            if self.sync_status_and_extras_jira2kpm(jira_issue) and status_fingerprint:
+                # the Jira fields as the step left them (question sent, status ...)
+                self.phase_done(
+                    jira_issue,
+                    "status",
+                    self.status_fingerprint(jira_issue, development_problem),
+                    # a post queued for verification: done once it is found in KPM
+                    verified=not self.kpm.has_pending_posts(kpm_id),
+                )
 
         # 4. ADD/UPDATE attachments
-        self.sync_attachments(jira_issue)
+        if full_resync or not self.phase_unchanged(
+            jira_issue, "attachments", attachments_fingerprint
+        ):
+            if self.sync_attachments(jira_issue, kpm_documents):
+                self.phase_done(jira_issue, "attachments", attachments_fingerprint)
 
         return jira_issue
 
+    def phase_unchanged(
+        self, jira_issue: EsrLabsJiraIssueForKpmSync, phase: str, value: str
+    ) -> bool:
+        """True if the inputs of sync PHASE did not change since its last run."""
+        if not self.fingerprints:
+            return False
+        if self.fingerprints.unchanged(jira_issue.kpm_id, phase, value):
+            self.logger.info(
+                f'Nothing changed for "{phase}" since last sync. Skipping ...',
+                kpm_id=jira_issue.kpm_id,
+                jira_id=jira_issue.jira_id,
+            )
+            return True
+        return False
+
+    def phase_done(
+        self,
+        jira_issue: EsrLabsJiraIssueForKpmSync,
+        phase: str,
+        value: str,
+        verified: bool = True,
+    ) -> None:
+        """Record the fingerprint of sync PHASE, held until the posts to KPM
+        are verified if not VERIFIED yet (see `SyncFingerprintStore.hold()`)."""
+        if not self.fingerprints or value is None:
+            return
+        if verified:
+            self.fingerprints.put(jira_issue.kpm_id, phase, value)
+        else:
+            self.fingerprints.hold(jira_issue.kpm_id, phase, value)
+
+    @staticmethod
+    def status_fingerprint(
+        jira_issue: EsrLabsJiraIssueForKpmSync, development_problem: dict
+    ) -> str:
+        """The inputs of the JIRA -> KPM status step: the KPM Development
+        Problem and the Jira fields the step reads."""
+        return fingerprint(
+            development_problem,
+            jira_issue.status,
+            jira_issue.question_to_oem,
+            jira_issue.cause_of_reject,
+            jira_issue.answer_from_oem,
+        )
+
     ######################### JIRA -> KPM status change ##########################
 
     def check_jira_status_change(
@@ -905,7 +988,7 @@ class SyncJiraFromKPM(NewJiraFromKPM):
                 return
 
         updated_jira_issue: EsrLabsJiraIssueForKpmSync = self.jira.update_status(
-            jira_issue.jira_id, to_status, comment
+            jira_issue, to_status, comment
         )
         if not updated_jira_issue:
             self.logger.error(
@@ -924,7 +1007,12 @@ class SyncJiraFromKPM(NewJiraFromKPM):
     ):
         """Sync JIRA -> KPM status for all Jira issues
         if status was changed in JIRA
-            ticket: EsrLabsJiraIssueForKpmSync | jira_id | kpm_id"""
+            ticket: EsrLabsJiraIssueForKpmSync | jira_id | kpm_id
+
+        return:
+            True if synced (or nothing to post to KPM)
+
+            False if a post to KPM failed"""
         # Jira: Check if issue in Jira has a status change
         # KPM: Set status
         if isinstance(ticket, str):
@@ -951,8 +1039,9 @@ class SyncJiraFromKPM(NewJiraFromKPM):
                 self.logger.info(
                     msg, jira_id=jira_issue.jira_id, kpm_id=jira_issue.kpm_id
                 )
-                return self.add_question_to_oem(jira_issue) and self.update_kpm_status(
-                    jira_issue
+                return bool(
+                    self.add_question_to_oem(jira_issue)
+                    and self.update_kpm_status(jira_issue)
                 )
             msg = (
                 "Jira issue has status recently changed to "
@@ -966,7 +1055,9 @@ class SyncJiraFromKPM(NewJiraFromKPM):
         elif self.check_jira_status_change(
             jira_issue, status_not_in=STATUSES_THAT_NEED_QUESTION_TO_OEM
         ):
-            return self.update_kpm_status(jira_issue)
+            return bool(self.update_kpm_status(jira_issue))
 
         if jira_issue.status not in STATUSES_THAT_NEED_QUESTION_TO_OEM:
-            return self.add_question_to_oem(jira_issue)
+            if jira_issue.question_to_oem:
+                return bool(self.add_question_to_oem(jira_issue))
+        return True
@@ -4,6 +4,7 @@ from app.core.processors.exceptions import APIServerConnectionError
 
 # project extension
 from app.ext.kpm_audi.kpm_client import KPMClient
+from app.ext.kpm_audi.transport import PostVerifyConfig
 from app.ext.kpm_audi.exceptions import KPMApiError
 
 # project service
@@ -14,6 +15,7 @@ from .config import (
     KPM_CERT_FILE_PATH,
     KPM_INBOX,
     POST_BACK_TO_KPM,
+    DEFER_KPM_POST_VERIFICATION,
 )
 
 
@@ -24,6 +26,7 @@ def kpm_client(
     cert_file_path: str = KPM_CERT_FILE_PATH,
     inbox: str = KPM_INBOX,
     post_back_to_kpm: bool = POST_BACK_TO_KPM,
+    defer_post_verification: bool = DEFER_KPM_POST_VERIFICATION,
 ) -> KPMClient:
     """Interact with the KPM server.
 
@@ -38,6 +41,7 @@ def kpm_client(
             cert_path=cert_file_path,
             inbox=inbox,
             post_back_to_kpm=post_back_to_kpm,
+            post_verify=PostVerifyConfig(deferred=defer_post_verification),
         ).connect()
         logger.debug("Testing connection to KPM server with a simple query ... ")
         kpm.query(since_timestamp(1))
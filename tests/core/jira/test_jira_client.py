@@ -0,0 +1,310 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import json
+
+from jira import Comment
+
+from app.core.jira import jira_client as jira_client_module
+from app.core.jira.jira_client import ALL_FIELDS, JiraClientCore
+from app.core.jira.jira_issue import JiraIssueCore
+from app.ext.jira_esr.jira_map import EsrLabsAhcp5JiraFieldMap
+
+
+class FakeJira:
+    def __init__(self):
+        self.searches = []
+
+    def search_issues(self, **kwargs):
+        self.searches.append(kwargs)
+        return {"issues": [{"id": "1", "key": "AHCP5-1", "fields": {}}]}
+
+
+class PagedJira(FakeJira):
+    """250 issues, at most 100 per page"""
+
+    _is_cloud = False
+
+    def search_issues(self, **kwargs):
+        self.searches.append(kwargs)
+        start_at = kwargs["startAt"]
+        keys = range(start_at, min(start_at + 100, 250))
+        issues = [{"id": str(i), "key": f"AHCP5-{i}"} for i in keys]
+        return {"startAt": start_at, "maxResults": 100, "total": 250, "issues": issues}
+
+
+class FilteredPagedJira(PagedJira):
+    """The first page without 2 of its issues (e.g. not permitted)"""
+
+    def search_issues(self, **kwargs):
+        result = super().search_issues(**kwargs)
+        if not kwargs["startAt"]:
+            result["issues"] = result["issues"][2:]
+        return result
+
+
+class CloudJira(PagedJira):
+    """Jira Cloud with a jira library without the token based search"""
+
+    _is_cloud = True
+
+
+class TokenPagedJira(FakeJira):
+    _is_cloud = True
+
+    def enhanced_search_issues(self, **kwargs):
+        self.searches.append(kwargs)
+        page = int(kwargs["nextPageToken"] or 0)
+        issues = [{"id": str(page), "key": f"AHCP5-{page}"}]
+        if page < 2:
+            return {"issues": issues, "nextPageToken": str(page + 1), "isLast": False}
+        return {"issues": issues, "isLast": True}
+
+
+def jira_date(days_ago: float) -> str:
+    date = datetime.now().astimezone() - timedelta(days=days_ago)
+    return date.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+
+
+class CommentsJira(FakeJira):
+    """150 comments, one a day (the last one today), at most 100 per page"""
+
+    _options = {"server": "https://jira.example"}
+    _session = None
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+        self.comments = [
+            {"id": str(i), "body": f"comment {i}", "created": jira_date(149 - i)}
+            for i in range(150)
+        ]
+        for comment in self.comments:
+            comment["updated"] = comment["created"]
+
+    def _get_json(self, path, params):
+        self.requests.append(params)
+        comments = self.comments[::-1] if params.get("orderBy") else self.comments
+        start_at = params["startAt"]
+        page = comments[start_at : start_at + params["maxResults"]]
+        return {"startAt": start_at, "total": len(comments), "comments": page}
+
+    def add_comment(self, issue, body):
+        return Comment(self._options, None, {"id": "150", "body": body})
+
+
+def jira_client(field_map=None) -> JiraClientCore:
+    client = JiraClientCore("https://jira.example", "x", "x", field_map=field_map)
+    client._client = FakeJira()
+    return client
+
+
+def test_query_projection():
+    client = jira_client()
+    assert client.query("key = AHCP5-1")[0].jira_id == "AHCP5-1"
+    assert client._client.searches[-1]["fields"] == [ALL_FIELDS]
+
+    client.query("key = AHCP5-1", ("status", "labels"), "changelog")
+    assert client._client.searches[-1]["fields"] == ["status", "labels"]
+    assert client._client.searches[-1]["expand"] == "changelog"
+
+
+def test_ticket_lists_default_to_key_fields():
+    client = jira_client(EsrLabsAhcp5JiraFieldMap())
+    client.get_tickets_updated(4)
+    assert client._client.searches[-1]["fields"] == ["status", "customfield_10503"]
+    client.get_tickets_with_field_not_empty("Question to OEM", 4, fields="summary")
+    assert client._client.searches[-1]["fields"] == ["summary"]
+
+
+def test_mirrored_issues_read_by_key_for_other_fields(monkeypatch):
+    monkeypatch.setattr(jira_client_module, "KEYS_PER_QUERY", 2)
+    client = jira_client()
+    client.mirror = SimpleNamespace(covers=lambda fields: fields == ("status",))
+    mirrored = [{"key": f"AHCP5-{i}", "fields": {}} for i in (1, 2, 1, 3)]
+
+    issues = client.from_mirror(mirrored, ("status",))
+    keys = [issue.jira_id for issue in issues]
+    assert keys == ["AHCP5-1", "AHCP5-2", "AHCP5-1", "AHCP5-3"]
+    assert client._client.searches == []
+
+    client.from_mirror(mirrored)
+    assert [search["jql_str"] for search in client._client.searches] == [
+        "key in (AHCP5-1, AHCP5-2)",
+        "key in (AHCP5-3)",
+    ]
+    assert client._client.searches[-1]["fields"] == [ALL_FIELDS]
+
+
+def test_query_pages_concurrently():
+    client = jira_client()
+    client._client = PagedJira()
+    issues = client.query("project = AHCP5")
+    assert [issue.jira_id for issue in issues] == [f"AHCP5-{i}" for i in range(250)]
+    assert sorted(s["startAt"] for s in client._client.searches) == [0, 100, 200]
+
+    client._client = PagedJira()
+    first = next(client.iter_query("project = AHCP5"))
+    assert first.jira_id == "AHCP5-0"
+    assert len(client._client.searches) == 1  # the other pages not requested yet
+
+
+def test_query_page_size_granted_by_the_server():
+    client = jira_client()
+    client._client = FilteredPagedJira()
+    issues = client.query("project = AHCP5")
+    assert len(issues) == 248
+    assert sorted(s["startAt"] for s in client._client.searches) == [0, 100, 200]
+
+
+def test_query_cloud_without_token_search():
+    client = jira_client()
+    client._client = CloudJira()
+    assert len(client.query("project = AHCP5")) == 250
+
+
+def test_query_token_pages():
+    client = jira_client()
+    client._client = TokenPagedJira()
+    issues = client.query("project = AHCP5")
+    assert [issue.jira_id for issue in issues] == ["AHCP5-0", "AHCP5-1", "AHCP5-2"]
+    assert [s["nextPageToken"] for s in client._client.searches] == [None, "1", "2"]
+
+
+def test_comments_paged_once_per_cycle():
+    client = jira_client()
+    client._client = CommentsJira()
+    issue = JiraIssueCore({"id": "1", "key": "AHCP5-1", "fields": {}})
+
+    # an old comment edited since
+    client._client.comments[10]["updated"] = jira_date(1)
+    recent = client.get_all_comments_for_issue_since(issue, since_days=3)
+    assert [body for _, body in recent] == ["comment 10"] + [
+        f"comment {i}" for i in range(147, 150)
+    ]
+    assert len(client._client.requests) == 2  # the 2 pages
+
+    client._client.requests = []
+    assert client.is_equal_to_last_comment(issue, "comment 149")
+    assert client._client.requests[0]["maxResults"] == 1
+
+    with client.sync_cycle():
+        client._client.requests = []
+        comments = client.get_all_comments(issue)
+        assert [c.id for c in comments] == [str(i) for i in range(150)]
+        assert client.get_all_comments_merged_as_str(issue).endswith("comment 149")
+        assert client.is_equal_to_last_comment(issue, "comment 149")
+        assert len(client.get_all_comments_for_issue_since(issue, since_days=3)) == 4
+        assert len(client._client.requests) == 2  # the 2 pages, once
+
+        client.add_comment(issue, "new comment")
+        assert client.get_all_comments(issue)[-1].raw["body"].endswith("new comment")
+    assert not client._comments  # not kept beyond the cycle
+
+
+def test_comments_since_days_boundary():
+    client = jira_client()
+    client._client = CommentsJira()
+    issue = JiraIssueCore({"id": "1", "key": "AHCP5-1", "fields": {}})
+    today = datetime.now().date()
+    client._client.comments = [
+        # the day SINCE_DAYS ago is not "since", even late that day
+        {
+            "id": "1",
+            "body": "old",
+            "updated": f"{today - timedelta(days=3)}T23:59:59.000+0000",
+        },
+        {
+            "id": "2",
+            "body": "new",
+            "updated": f"{today - timedelta(days=2)}T00:00:00.000+0000",
+        },
+    ]
+    recent = client.get_all_comments_for_issue_since(issue, since_days=3)
+    assert recent == [(f"{today - timedelta(days=2)}", "new")]
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.text = json.dumps(raw)
+
+    def json(self):
+        return self.raw
+
+
+class WritesJira(FakeJira):
+    """Records the writes, answers as Jira Cloud (the issue in the response)"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+        self._session = self
+
+    def _get_url(self, path):
+        return f"https://jira.example/rest/api/2/{path}"
+
+    def put(self, url, params, data):
+        self.requests.append(("PUT", url, params))
+        return FakeResponse({"id": "1", "fields": json.loads(data).get("fields", {})})
+
+    def transitions(self, issue):
+        self.requests.append(("GET", issue))
+        return [{"id": "31", "to": {"name": "Done"}}]
+
+    def transition_issue(self, issue, transition, comment=None):
+        self.requests.append(("POST", issue, transition))
+
+
+def test_writes_by_id():
+    client = jira_client()
+    client._client = WritesJira()
+    assert client.update_description("AHCP5-1", "Sync report")
+    client.update_field("AHCP5-1", "description", "Sync report", verify=True)
+    assert client._client.requests == [
+        ("PUT", "https://jira.example/rest/api/2/issue/AHCP5-1", None),
+        (
+            "PUT",
+            "https://jira.example/rest/api/2/issue/AHCP5-1",
+            {"returnIssue": "true"},
+        ),
+    ]
+
+    client._client.requests = []
+    for i in range(2):
+        issue = JiraIssueCore(
+            {
+                "id": str(i),
+                "key": f"AHCP5-{i}",
+                "fields": {
+                    "project": {"key": "AHCP5"},
+                    "issuetype": {"name": "Bug"},
+                    "status": {"name": "Open"},
+                },
+            }
+        )
+        assert client.update_status(issue, "Done", "closed") is issue
+        assert issue.status == "Done"
+    # the workflow is requested once, then a single transition request each
+    assert client._client.requests == [
+        ("GET", "0"),
+        ("POST", "0", "31"),
+        ("POST", "1", "31"),
+    ]
+
+
+def test_labels_added_atomically():
+    client = jira_client()
+    client._client = WritesJira()
+    issue = JiraIssueCore({"id": "7", "key": "AHCP5-7", "fields": {"labels": ["VW"]}})
+    assert client.add_label(issue, "ESR")
+    assert issue.labels == ["VW", "ESR"]
+    assert client._client.requests == [
+        ("PUT", "https://jira.example/rest/api/2/issue/7", None)
+    ]
+
+    client._client.requests = []
+    added = client.add_labels([f"AHCP5-{i}" for i in range(10)], "ESR")
+    assert added == {f"AHCP5-{i}": True for i in range(10)}
+    assert len(client._client.requests) == 10  # one request per issue
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from time import time
+from types import SimpleNamespace
+
+from app.core.jira import jira_mirror as jira_mirror_module
+from app.core.jira.jira_issue import JiraIssueCore
+from app.core.jira.jira_mirror import JiraIssueMirror
+
+
+def jira_date(hours_ago: float) -> str:
+    date = datetime.now().astimezone() - timedelta(hours=hours_ago)
+    return date.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+
+
+class FakeClient:
+    base_jql = 'PROJECT = "AHCP5"'
+    field_map = SimpleNamespace(key_fields=("status", "customfield_10503"))
+
+    def __init__(self, issues):
+        self.issues = issues
+        self.queries = []
+        self.fields = []
+
+    def iter_query(self, jql, fields):
+        self.queries.append(jql)
+        self.fields.append(fields)
+        return (JiraIssueCore(raw) for raw in self.issues)
+
+
+def jira_mirror(client, db_path, **kwargs) -> JiraIssueMirror:
+    return JiraIssueMirror(
+        client,
+        "TEST",
+        "customfield_10503",
+        fields=(*client.field_map.key_fields, "customfield_12759"),
+        db_path=db_path,
+        **kwargs,
+    )
+
+
+def issue(key: str, reference: str, hours_ago: float, question: str = None):
+    fields = {"customfield_10503": reference, "updated": jira_date(hours_ago)}
+    if question:
+        fields["customfield_12759"] = question
+    return {"id": key[-1], "key": key, "fields": fields}
+
+
+def test_mirror_lookups(tmp_path):
+    client = FakeClient(
+        [
+            issue("AHCP5-1", "9045195", 1, "Which SW version?"),
+            issue("AHCP5-2", "90451951", 10),
+        ]
+    )
+    mirror = jira_mirror(client, tmp_path / "db")
+
+    found = mirror.issues_by_reference(r"(?<!\d)9045195(?!\d)")
+    assert [raw["key"] for raw in found] == ["AHCP5-1"]
+    assert client.queries == ['PROJECT = "AHCP5"']  # first run: full load
+    assert mirror.issues_by_reference(r"(?<!\d)1234(?!\d)") is None
+    # handed out (maybe updated by the sync since): not answered locally
+    assert mirror.issues_by_reference(r"(?<!\d)9045195(?!\d)") is None
+
+    updated = mirror.issues_updated_since(4 * 3600)
+    assert [raw["key"] for raw in updated] == ["AHCP5-1"]
+    assert "AND updated >= -" in client.queries[-1]  # delta refresh
+    assert mirror.issues_updated_since(24 * 3600, "customfield_12759")[0]["key"] == (
+        "AHCP5-1"
+    )
+    mirror.close()
+
+    # another process: the mirror on disk is refreshed, not reloaded
+    client = FakeClient([])
+    mirror = jira_mirror(client, tmp_path / "db")
+    assert len(mirror.issues_updated_since(24 * 3600)) == 2
+    assert "AND updated >= -" in client.queries[-1]
+    mirror.close()
+
+
+def test_mirror_lookups_by_number(tmp_path):
+    client = FakeClient(
+        [
+            issue("AHCP5-1", "KPM 9045195 / 9045196", 1),
+            issue("AHCP5-2", "90451951", 10),
+        ]
+    )
+    mirror = jira_mirror(client, tmp_path / "db")
+    assert [raw["key"] for raw in mirror.issues_by_number("9045196")] == ["AHCP5-1"]
+    assert mirror.issues_by_number("904519") is None  # only whole numbers
+
+    # the reference changed in Jira: the delta refresh indexes the new one
+    client.issues = [issue("AHCP5-2", "1234", 0)]
+    mirror.refresh()
+    assert mirror.issues_by_number("90451951") is None
+    assert [raw["key"] for raw in mirror.issues_by_number("1234")] == ["AHCP5-2"]
+    mirror.close()
+
+
+def test_mirror_fields(tmp_path):
+    client = FakeClient([issue("AHCP5-1", "9045195", 1)])
+    mirror = jira_mirror(client, tmp_path / "db")
+    mirror.refresh()
+    # only the fields read from the lookup results, not "*all"
+    assert client.fields == [
+        ("status", "customfield_10503", "customfield_12759", "updated")
+    ]
+    assert mirror.covers(("key", "status", "customfield_12759"))
+    assert not mirror.covers("*all")
+    # the issues are then read again (see JiraClientCore.from_mirror())
+    assert not mirror.covers(("status", "description"))
+    assert mirror.issues_updated_since(3600, "customfield_12760") is None
+    mirror.close()
+
+    # other fields: another mirror, loaded in full
+    client = FakeClient([])
+    mirror = JiraIssueMirror(
+        client, "TEST", "customfield_10503", db_path=tmp_path / "db"
+    )
+    mirror.refresh()
+    assert client.queries == ['PROJECT = "AHCP5"']
+    assert client.fields == [("status", "customfield_10503", "updated")]
+    mirror.close()
+
+
+def test_mirror_full_refresh_hours(tmp_path, monkeypatch):
+    client = FakeClient([])
+    mirror = jira_mirror(client, tmp_path / "db", full_refresh_hours=None)
+    mirror.refresh()
+    # a day later: still refreshed with the issues updated since
+    later = time() + 25 * 3600
+    monkeypatch.setattr(jira_mirror_module, "time", lambda: later)
+    mirror.refresh()
+    assert "AND updated >= -" in client.queries[-1]
+
+    mirror.full_refresh_hours = 24
+    mirror.refresh()
+    assert client.queries[-1] == 'PROJECT = "AHCP5"'
+    mirror.close()
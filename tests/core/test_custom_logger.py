@@ -0,0 +1,50 @@
+import pytest
+
+from app.core.custom_logger import (
+    LOG_FORMATTING,
+    Deferred,
+    as_yaml,
+    deferred_logger,
+    get_logger,
+    logger,
+)
+
+
+@pytest.fixture
+def records():
+    messages = []
+    logger.remove()  # only INFO and above
+    logger.add(lambda message: messages.append(message.record), level="INFO")
+    yield messages
+    get_logger()
+
+
+def test_payloads_rendered_only_if_level_enabled(records):
+    def render():
+        rendered.append(True)
+        return "payload"
+
+    rendered = []
+    deferred_logger.debug("not rendered: {}", render)
+    assert rendered == []
+
+    before = LOG_FORMATTING.summary()["rendered"]
+    deferred_logger.info("rendered: {}", render, jira_id="ESR-1")
+    assert rendered == [True]
+    assert records[-1]["message"] == "rendered: payload"
+    assert records[-1]["extra"]["jira_id"] == "ESR-1"
+    assert records[-1]["function"] == "test_payloads_rendered_only_if_level_enabled"
+    assert LOG_FORMATTING.summary()["rendered"] == before + 1
+
+
+def test_payloads_are_not_str_formatted(records):
+    description = 'src:Diag.hpp|p_output: {"errorCode":50462751} {0} {'
+    deferred_logger.info(
+        "Jira Issue {} .fields: {}", "ESR-1", as_yaml({"description": description})
+    )
+    assert description in records[-1]["message"]
+    deferred_logger.info("raw: {}", description, kpm_id="1001")
+    assert records[-1]["message"] == f"raw: {description}"
+
+    deferred_logger.warning("failing: {}", Deferred(lambda: 1 / 0))
+    assert "unable to render" in records[-1]["message"]
@@ -0,0 +1,105 @@
+from io import BytesIO
+from uuid import uuid4
+
+import pytest
+from requests import Request, Response, Session
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from app.core.http_cassette import (
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteMissError,
+    request_fingerprint,
+)
+
+
+MTOM_BODY = (
+    b"\r\n--uuid:1\r\nContent-Type: application/xop+xml\r\n\r\n<soap/>"
+    b"\r\n--uuid:1\r\nContent-ID: <doc>\r\n\r\n\x00\xff\x89PNG\r\n--uuid:1--"
+)
+
+
+class FakeServer(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(
+            {
+                "Content-Type": 'multipart/related; boundary="uuid:1"',
+                "Set-Cookie": "JSESSIONID=secret",
+            }
+        )
+        response.raw = BytesIO(MTOM_BODY + str(len(self.requests)).encode())
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def soap_request(session: Session, since: str):
+    return session.post(
+        "https://kpm.example/ws?b=2&a=1",
+        data=f"<MessageID>urn:uuid:{uuid4()}</MessageID><since>{since}</since>",
+        headers={"Authorization": "Basic secret"},
+        stream=True,
+    )
+
+
+def test_record_then_replay_offline(tmp_path):
+    server = FakeServer()
+    session = Session()
+    session.mount("https://", server)
+    recorder = Cassette("sync", RECORD, tmp_path)
+    recorder.mount(session)
+    first = soap_request(session, "2024-01-01T10:00:00")
+    second = soap_request(session, "2024-01-01T10:00:00")
+    assert first.content == MTOM_BODY + b"1"
+    assert second.content == MTOM_BODY + b"2"
+    assert recorder.summary()["exchanges"] == 2
+    recorder.close()
+
+    session = Session()
+    session.mount("https://", server)
+    player = Cassette("sync", REPLAY, tmp_path)
+    player.mount(session)
+    # another MessageID and date, same request: the responses in recorded order
+    replayed = soap_request(session, "2025-06-30T08:15:00")
+    assert b"".join(replayed.iter_content(7)) == MTOM_BODY + b"1"
+    assert replayed.headers["content-type"].startswith("multipart/related")
+    assert "Set-Cookie" not in replayed.headers
+    assert soap_request(session, "2025-06-30").content == MTOM_BODY + b"2"
+    assert soap_request(session, "2025-06-30").content == MTOM_BODY + b"2"
+    assert len(server.requests) == 2  # nothing sent while replaying
+
+    with pytest.raises(CassetteMissError):
+        session.get("https://kpm.example/unknown")
+    assert player.summary()["misses"] == 1
+    player.close()
+
+
+def test_replay_needs_a_recording(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette("missing", REPLAY, tmp_path)
+
+
+def test_relative_jql_durations_masked():
+    def search(jql: str):
+        return Request("GET", "https://jira.example/search", params={"jql": jql})
+
+    base_jql = 'PROJECT = "AHCP5" AND updated >= '
+    assert request_fingerprint(search(f"{base_jql}-12m").prepare()) == (
+        request_fingerprint(search(f"{base_jql}-7m").prepare())
+    )
+    assert request_fingerprint(search('"External Reference" ~ 9045195').prepare()) != (
+        request_fingerprint(search('"External Reference" ~ 9045196').prepare())
+    )
@@ -0,0 +1,43 @@
+from app.core.sync_fingerprints import SyncFingerprintStore, fingerprint
+
+
+def test_fingerprint_is_stable():
+    steps = [("step-1", "2023-01-01-00.00.00.000001"), ("step-2", "")]
+    assert fingerprint(steps, "2023-05-01T10:00:00") == fingerprint(
+        [list(step) for step in steps], "2023-05-01T10:00:00"
+    )
+    assert fingerprint(steps, "2023-05-01T10:00:00") != fingerprint(
+        list(reversed(steps)), "2023-05-01T10:00:00"
+    )
+    assert fingerprint(b"<DevelopmentProblem/>") != fingerprint(b"<Other/>")
+    assert fingerprint("a", "b") != fingerprint("ab")
+
+
+def test_store_per_service_ticket_and_phase(tmp_path):
+    db_path = tmp_path / "fingerprints.sqlite"
+    store = SyncFingerprintStore("K2J", db_path)
+    store.put("1001", "attachments", "abc")
+    store.put("1001", "extras", "def")
+    store.close()
+
+    store = SyncFingerprintStore("K2J", db_path)
+    assert store.unchanged("1001", "attachments", "abc")
+    assert not store.unchanged("1001", "attachments", "abd")
+    assert not store.unchanged("1002", "attachments", "abc")
+    assert not store.unchanged("1001", "status", None)
+    assert SyncFingerprintStore("OTHER", db_path).get("1001", "extras") is None
+
+    store.forget("1001")
+    assert store.get("1001", "extras") is None
+
+
+def test_held_fingerprints_saved_on_release(tmp_path):
+    store = SyncFingerprintStore("K2J", tmp_path / "fingerprints.sqlite")
+    store.hold("1001", "status", "abc")
+    store.hold("1002", "status", "def")
+    assert store.get("1001", "status") is None  # not verified yet
+    store.release(["1002"])  # its post was not found in KPM
+    assert store.unchanged("1001", "status", "abc")
+    assert store.get("1002", "status") is None
+    store.release()
+    assert store.get("1002", "status") is None
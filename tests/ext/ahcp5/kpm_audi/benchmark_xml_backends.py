@@ -0,0 +1,113 @@
+"""Micro-benchmark of the KPM SOAP response XML backends over the recorded
+XML fixtures, per fixture envelope: parse it and read its hot accessors
+
+    etree: xml.etree.ElementTree, ElementPath
+    lxml:  lxml, compiled XPath
+
+python -m tests.ext.ahcp5.kpm_audi.benchmark_xml_backends
+"""
+# standard
+from pathlib import Path
+from timeit import repeat
+import re
+
+# 3rd party
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+# project core
+from app.core.custom_logger import logger
+
+# project extension
+from app.ext.kpm_audi.soap_responses import (
+    DevelopmentProblemDataResponse,
+    DocumentListResponse,
+    ProcessStepListResponse,
+    ProcessStepResponse,
+)
+from app.ext.kpm_audi.soap_responses.base_response import BaseResponse
+from app.ext.kpm_audi.soap_responses.xml_backend import xml_backend
+
+
+FIXTURES_DIR = Path(__file__).parent
+BOUNDARY = "uuid:43f59cc1-440c-4031-a265-ad083053d3e1"
+ENVELOPE_PATTERN = re.compile(r"<(\w+):Envelope\b.*?</\1:Envelope>", re.DOTALL)
+
+
+def hot_accessors(response: BaseResponse):
+    """What the sync reads from each kind of response."""
+    response.message
+    if isinstance(response, DevelopmentProblemDataResponse):
+        return response.problem_status, response.supplier_status
+    if isinstance(response, (ProcessStepListResponse, DocumentListResponse)):
+        return response.as_list
+    if isinstance(response, ProcessStepResponse):
+        return response.step
+
+
+RESPONSE_CLASSES = {
+    "GetDevelopmentProblemDataResponse": DevelopmentProblemDataResponse,
+    "GetProcessStepListResponse": ProcessStepListResponse,
+    "GetProcessStepResponse": ProcessStepResponse,
+    "GetDocumentListResponse": DocumentListResponse,
+}
+
+
+def recorded_envelopes() -> list[tuple[str, str]]:
+    """(name, SOAP envelope) of every envelope in the XML fixtures
+    (some were recorded as python bytes literals)."""
+    envelopes = []
+    for path in sorted(FIXTURES_DIR.rglob("*.xml")):
+        text = path.read_text(encoding="utf-8").replace("\\r\\n", "\r\n")
+        for i, match in enumerate(ENVELOPE_PATTERN.finditer(text)):
+            envelopes.append((f"{path.stem}[{i}]", match.group(0)))
+    return envelopes
+
+
+def mtom_response(envelope: str) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict(
+        {
+            "Content-Type": f'multipart/related; type="application/xop+xml"; '
+            f'boundary="{BOUNDARY}"; start="<root.message@cxf.apache.org>"'
+        }
+    )
+    response._content = (
+        f"\r\n--{BOUNDARY}\r\nContent-Type: text/xml; charset=UTF-8\r\n"
+        f"Content-Transfer-Encoding: binary\r\n"
+        f"Content-ID: <root.message@cxf.apache.org>\r\n\r\n"
+        f"{envelope}\r\n--{BOUNDARY}--"
+    ).encode("utf-8")
+    return response
+
+
+def response_class(envelope: str) -> type[BaseResponse]:
+    for operation, cls in RESPONSE_CLASSES.items():
+        if f":{operation}" in envelope:
+            return cls
+    return BaseResponse
+
+
+def run(cls: type[BaseResponse], raw: Response, backend: str):
+    response = cls(raw)
+    response.backend = xml_backend(backend)
+    return hot_accessors(response)
+
+
+def benchmark(number: int = 500) -> None:
+    logger.remove()  # e.g. the faults logged by the accessors
+    print(f"{'fixture':50} {'class':32} {'etree µs':>9} {'lxml µs':>9} {'speedup':>8}")
+    for name, envelope in recorded_envelopes():
+        cls = response_class(envelope)
+        raw = mtom_response(envelope)
+        etree = min(repeat(lambda: run(cls, raw, "etree"), number=number, repeat=3))
+        lxml = min(repeat(lambda: run(cls, raw, "lxml"), number=number, repeat=3))
+        print(
+            f"{name:50} {cls.__name__:32} {etree / number * 1e6:9.1f} "
+            f"{lxml / number * 1e6:9.1f} {etree / lxml:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,427 @@
+"""The KPM SOAP request builders before the precompiled envelope templates
+(a copy, for `benchmark_soap_requests` only): each request renders its
+envelope with nested f-strings, parses it and serializes it again."""
+# standard
+from uuid import uuid1
+import abc
+import xml.etree.ElementTree as ET
+
+
+class BaseRequest:
+    def __init__(self) -> None:
+        self.action = None
+        self.uuid = None
+        self.user_id = None
+        self.kpm_id = None
+
+    def escape_xml(self, xml_content: str):
+        return (
+            xml_content.replace("&", "&amp;")
+            .replace("<", "&lt;")
+            .replace(">", "&gt;")
+            .replace('"', "&quot;")
+            .replace("'", "&apos;")
+        )
+
+    def to_xml(self):
+        return ET.fromstring(self._document())
+
+    def to_string(self, indent=False):
+        # The conversion to string serves like a xml validation
+        xml = self.to_xml()
+        if indent:
+            ET.indent(xml)
+        str_xml = ET.tostring(xml, encoding="unicode")
+        return str_xml
+
+    @abc.abstractmethod
+    def body(self):
+        "The Soapenv Envelope Body"
+        return
+
+    def soap_env_header(self):
+        return (
+            f"<soapenv:Header>"
+            f'<To xmlns="{self._xmlns_addr()}">'
+            f"ws://volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
+            f"</To>"
+            f'<Action xmlns="{self._xmlns_addr()}">'
+            f"{self._xmldef_v3()}/KpmService/{self.action}"
+            f"</Action>"
+            f'<MessageID xmlns="{self._xmlns_addr()}">'
+            f"urn:uuid:{self.uuid}"
+            f"</MessageID>"
+            f"</soapenv:Header>"
+        )
+
+    def _document(self):
+        return (
+            f'<soapenv:Envelope xmlns:soapenv="{self._xmlns_soapenv()}" '
+            f'xmlns:v3="{self._xmldef_v3()}">'
+            f"{self.soap_env_header()}"
+            f"{self.body()}"
+            f"</soapenv:Envelope>"
+        )
+
+    def _user_authentification(self):
+        return (
+            f"<UserAuthentification>"
+            f"<UserId>{self.user_id}</UserId>"
+            f"</UserAuthentification>"
+        )
+
+    def _problem_number(self):
+        return f"<ProblemNumber>{self.kpm_id}</ProblemNumber>"
+
+    def _xmldef_v3(self):
+        return "http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
+
+    def _xmlns_soapenv(self):
+        return "http://schemas.xmlsoap.org/soap/envelope/"
+
+    def _xmlns_addr(self):
+        return "http://www.w3.org/2005/08/addressing"
+
+
+class DevelopmentProblemDataRequest(BaseRequest):
+    def __init__(self, kpm_id: str, user_id: str, uuid=None) -> None:
+        self.action = "GetDevelopmentProblemDataRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+
+    def body(self):
+        return (
+            f"<soapenv:Body>"
+            f"<v3:GetDevelopmentProblemData>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            f"</v3:GetDevelopmentProblemData>"
+            f"</soapenv:Body>"
+        )
+
+
+class MultipleProblemDataRequest(BaseRequest):
+    def __init__(
+        self,
+        user_id: str,
+        since: str,
+        inbox: str,
+        desc="",
+        contact="",
+        addr_timestamp="",
+        uuid=None,
+    ) -> None:
+        """
+        since: LastChangeTimestamp -> All tickets that changed since this date in the
+        form off: "2022-05-01 15:00:00.0"
+        inbox: Plant/OrganisationalUnit/Group
+        desc: Description
+        contact: ContactPerson
+        addr_timestamp: AddressTimestamp
+        """
+        self.action = "GetMultipleProblemDataRequest"
+        self.user_id = user_id
+        self.uuid = uuid or str(uuid1())
+        self.since = since
+        self.inbox = inbox
+        self.desc = desc
+        self.contact = contact
+        self.addr_timestamp = addr_timestamp
+
+    def body(self) -> str:
+        return (
+            f"<soapenv:Body>"
+            f"<v3:GetMultipleProblemData>"
+            f"{self._user_authentification()}"
+            f"<LastChangeTimestamp>{self.since}</LastChangeTimestamp>"
+            f"<OverviewAddress>"
+            f"<AddressTimestamp>{self.addr_timestamp}</AddressTimestamp>"
+            f"<ContactPerson>{self.contact}</ContactPerson>"
+            f"<Description>{self.desc}</Description>"
+            f"<OrganisationalUnit>{self._unit()}</OrganisationalUnit>"
+            f"<Group>{self._group()}</Group>"
+            f"<Plant>{self._plant()}</Plant>"
+            f"</OverviewAddress>"
+            f"<ActiveOverview>true</ActiveOverview>"
+            f"<PassiveOverview>false</PassiveOverview>"
+            f"</v3:GetMultipleProblemData>"
+            f"</soapenv:Body>"
+        )
+
+    # TODO: FIXME: split errors not handled
+    # 'NoneType' object has no attribute 'split'
+    # index issues
+    def _plant(self) -> str:
+        """Get the Plant from inbox."""
+        return self.inbox.split("/")[0]
+
+    def _unit(self) -> str:
+        """Get the Organisational unit from inbox."""
+        return self.inbox.split("/")[1]
+
+    def _group(self) -> str:
+        """Get the Group from inbox."""
+        return self.inbox.split("/")[2]
+
+
+class ProcessStepRequest(BaseRequest):
+    def __init__(self, kpm_id: str, user_id: str, step_id: str, uuid=None) -> None:
+        self.action = "GetProcessStepRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+        self.step_id = step_id
+
+    def body(self):
+        return (
+            f"<soapenv:Body>"
+            f"<v3:GetProcessStep>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            f"<ProcessStepId>{self.step_id}</ProcessStepId>"
+            f"</v3:GetProcessStep>"
+            f"</soapenv:Body>"
+        )
+
+
+class ProcessStepListRequest(BaseRequest):
+    def __init__(self, kpm_id: str, user_id: str, uuid=None) -> None:
+        self.action = "GetProcessStepListRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+
+    def body(self):
+        return (
+            f"<soapenv:Body>"
+            f"<v3:GetProcessStepList>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            f"</v3:GetProcessStepList>"
+            f"</soapenv:Body>"
+        )
+
+
+class DocumentRequest(BaseRequest):
+    def __init__(self, kpm_id: str, user_id: str, document_id: str, uuid=None) -> None:
+        self.action = "GetDocumentRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+        self.document_id = document_id
+
+    def body(self):
+        return (
+            f"<soapenv:Body>"
+            f"<v3:GetDocument>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            f"<DocumentId>{self.document_id}</DocumentId>"
+            f"</v3:GetDocument>"
+            f"</soapenv:Body>"
+        )
+
+
+class DocumentListRequest(BaseRequest):
+    def __init__(self, kpm_id: str, user_id: str, uuid=None) -> None:
+        self.action = "GetDocumentListRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+
+    def body(self):
+        return (
+            f"<soapenv:Body>"
+            f"<v3:GetDocumentList>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            f"</v3:GetDocumentList>"
+            f"</soapenv:Body>"
+        )
+
+
+# DocumentReference
+
+
+# Question to OEM / question_to_oem
+class AddSupplierQuestionRequest(BaseRequest):
+    def __init__(
+        self, kpm_id: str, user_id: str, question_to_oem: str, uuid=None
+    ) -> None:
+        self.action = "AddSupplierQuestionRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+        self.question_to_oem = self.escape_xml(question_to_oem)
+
+    def body(self):
+        return (
+            "<soapenv:Body>"
+            "<v3:AddSupplierQuestion>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            f"<SupplierQuestion>{self.question_to_oem}</SupplierQuestion>"
+            "</v3:AddSupplierQuestion>"
+            "</soapenv:Body>"
+        )
+
+
+class AddSupplierResponseRequest(BaseRequest):
+    def __init__(
+        self,
+        kpm_id: str,
+        user_id: str,
+        ticket_id: str,
+        status: str,
+        text: str,
+        uuid=None,
+    ) -> None:
+        self.action = "AddSupplierResponseRequest"
+        self.uuid = uuid or str(uuid1())
+        self.kpm_id = kpm_id
+        self.user_id = user_id
+        self.ticket_id = ticket_id  # external reference (e.g. JIRA ID)
+        self.status = status
+        self.response_text = self.escape_xml(text)
+
+    def body(self):
+        return (
+            "<soapenv:Body>"
+            "<v3:AddSupplierResponse>"
+            f"{self._user_authentification()}"
+            f"{self._problem_number()}"
+            "<SupplierResponse>"
+            f"<Status>{self.status}</Status>"
+            f"<ErrorNumber>{self.ticket_id}</ErrorNumber>"
+            "</SupplierResponse>"
+            f"<ResponseText>{self.response_text}</ResponseText>"
+            "</v3:AddSupplierResponse>"
+            "</soapenv:Body>"
+        )
+
+
+class CreateDevelopmentProblemRequest(BaseRequest):
+    def __init__(
+        self,
+        user_id: str,
+        plant: str,
+        org_unit: str,
+        project: str,
+        project_brand: str,
+        rating: str,
+        desc: str,
+        short_text: str,
+        frequency: str,
+        repeatable: str,
+        pre_number: str,
+        middle_group: str,
+        end_number: str,
+        hardware: str,
+        software: str,
+        uuid=None,
+    ) -> None:
+        self.user_id = user_id
+        self.plant = plant
+        self.org_unit = org_unit
+        self.project = project
+        self.project_brand = project_brand
+        self.rating = rating
+        self.desc = desc
+        self.short_text = short_text
+        self.frequency = frequency
+        self.repeatable = repeatable
+        self.pre_number = pre_number
+        self.middle_group = middle_group
+        self.end_number = end_number
+        self.hardware = hardware
+        self.software = software
+        self.uuid = uuid or str(uuid1())
+        self.action = "CreateDevelopmentProblemRequest"
+
+    def body(self):
+        return (
+            f"<soapenv:Body>"
+            f"<v3:CreateDevelopmentProblem>"
+            f"{self._user_authentification()}"
+            f"<DevelopmentProblem>"
+            f"{self.development_problem()}"
+            f"</DevelopmentProblem>"
+            f"</v3:CreateDevelopmentProblem>"
+            f"</soapenv:Body>"
+        )
+
+    def development_problem(self):
+        return (
+            f"<Workflow>42</Workflow>"  #
+            f"<Rating>{self.rating}</Rating>"
+            f"<Description>{self.desc}</Description>"
+            f"<ShortText>{self.short_text}</ShortText>"
+            f"{self.origin()}"
+            f"{self.creator()}"
+            f"{self.coordinator()}"
+            f"{self.foremost_group_project()}"
+            f"<Frequency>{self.frequency}</Frequency>"
+            f"<Repeatable>{self.repeatable}</Repeatable>"
+            f"<ForemostTestPart>"
+            f"{self.part_number()}"
+            f"<Hardware>{self.hardware}</Hardware>"
+            f"<Software>{self.software}</Software>"
+            f"</ForemostTestPart>"
+        )
+        # -> past hardcoded params
+
+    def origin(self):
+        return (
+            "<Origin>"
+            "<Phase>EL</Phase>"  # EL
+            "<PhaseAddition>ESRLABS</PhaseAddition>"  # ESRLABS
+            "<SubProcess>EE</SubProcess>"  # EE
+            "<MainProcess>PEP</MainProcess>"  # PEP
+            "</Origin>"
+        )
+
+    def creator(self):
+        return (
+            f"<Creator>"
+            f"<Address>"
+            f"<OrganisationalUnit>{self.org_unit}</OrganisationalUnit>"
+            f"<Plant>{self.plant}</Plant>"
+            f"</Address>"
+            f"<PersonalContractor>"
+            f"<UserId>{self.user_id}</UserId>"
+            f"</PersonalContractor>"
+            f"</Creator>"
+        )
+
+    def coordinator(self):
+        return (
+            "<Coordinator>"
+            "<Contractor>"
+            "<Address>"
+            f"<OrganisationalUnit>{self.org_unit}</OrganisationalUnit>"  # HCP5
+            f"<Plant>{self.plant}</Plant>"  # 21
+            "</Address>"
+            "<PersonalContractor>"
+            f"<UserId>{self.user_id}</UserId>"  # EV6K03O
+            "</PersonalContractor>"
+            "</Contractor>"
+            "</Coordinator>"
+        )
+
+    def foremost_group_project(self):
+        return (
+            "<ForemostGroupProject>"
+            f"<Brand>{self.project_brand}</Brand>"  # AU
+            f"<Project>{self.project}</Project>"  # 416
+            "</ForemostGroupProject>"
+        )
+
+    def part_number(self):
+        return (
+            f"<PartNumber>"
+            f"<PreNumber>{self.pre_number}</PreNumber>"
+            f"<MiddleGroup>{self.middle_group}</MiddleGroup>"
+            f"<EndNumber>{self.end_number}</EndNumber>"
+            f"</PartNumber>"
+        )
@@ -0,0 +1,78 @@
+"""Micro-benchmark of the KPM SOAP request builders, per request class
+(built and rendered, the same arguments and uuid for all of them):
+
+    old: the builders before the envelope templates (`baseline_soap_requests`)
+    validate: envelope template rendered, parsed and serialized again
+    new: precompiled envelope template rendered once (the default)
+
+python -m tests.ext.ahcp5.kpm_audi.soap_requests.benchmark_soap_requests
+"""
+# standard
+from timeit import repeat
+import xml.etree.ElementTree as ET
+
+# project extension
+from app.ext.kpm_audi import soap_requests
+from app.ext.kpm_audi.soap_requests.base_request import BaseRequest
+from tests.ext.ahcp5.kpm_audi.soap_requests import baseline_soap_requests
+
+
+UUID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+TEXT = "24.05.2023: Fixed in <SW 1.2.3> & verified by 'QA'\n" * 40
+# the old CreateDevelopmentProblemRequest expects an escaped description
+ESCAPED_TEXT = BaseRequest.escape_xml(BaseRequest, TEXT)
+
+# request class name, arguments (old builder arguments if different)
+REQUESTS = [
+    ("DevelopmentProblemDataRequest", ("9029473", "USER")),
+    (
+        "MultipleProblemDataRequest",
+        ("USER", "2023-05-01 00:00:00.0", "FF/HCP5BS-ESR/"),
+    ),
+    ("ProcessStepListRequest", ("9029473", "USER")),
+    ("ProcessStepRequest", ("9029473", "USER", "2023-05-01-10.00.00.000001")),
+    ("DocumentListRequest", ("9029473", "USER")),
+    ("DocumentRequest", ("9029473", "USER", "1234567")),
+    ("AddSupplierQuestionRequest", ("9029473", "USER", TEXT)),
+    ("AddSupplierResponseRequest", ("9029473", "USER", "AHCP5-1234", "1", TEXT)),
+    (
+        "CreateDevelopmentProblemRequest",
+        ("USER", "21", "HCP5", "416", "AU", "B", TEXT, "Short text")
+        + ("1", "1", "4N0", "035", "123", "H01", "S01"),
+        ("USER", "21", "HCP5", "416", "AU", "B", ESCAPED_TEXT, "Short text")
+        + ("1", "1", "4N0", "035", "123", "H01", "S01"),
+    ),
+]
+
+
+def elements(document: str) -> list:
+    """The elements of DOCUMENT, whatever their namespace prefixes."""
+    return [(e.tag, e.text, e.attrib) for e in ET.fromstring(document).iter()]
+
+
+def timed(build, number: int) -> float:
+    """Microseconds per call of BUILD (best of the repeats)."""
+    return min(repeat(build, number=number)) / number * 1e6
+
+
+def benchmark(number: int = 2000) -> None:
+    print(f"{'request':35} {'old µs':>8} {'valid µs':>9} {'new µs':>8} {'speedup':>8}")
+    for name, args, *old_args in REQUESTS:
+        new_class = getattr(soap_requests, name)
+        old_class = getattr(baseline_soap_requests, name)
+        old_args = old_args[0] if old_args else args
+        # the same documents (the old ones with "ns0:" ... prefixes),
+        # or the numbers mean nothing
+        assert elements(new_class(*args, uuid=UUID).to_string()) == (
+            elements(old_class(*old_args, uuid=UUID).to_string())
+        ), name
+        old = timed(lambda: old_class(*old_args, uuid=UUID).to_string(), number)
+        validate = timed(
+            lambda: new_class(*args, uuid=UUID).to_string(validate=True), number
+        )
+        new = timed(lambda: new_class(*args, uuid=UUID).to_string(), number)
+        print(f"{name:35} {old:8.1f} {validate:9.1f} {new:8.1f} {old / new:7.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,13 @@
+import xml.etree.ElementTree as ET
+
+from app.ext.kpm_audi.soap_requests import AddSupplierResponseRequest
+
+
+def test_text_escaped_once():
+    text = "24.05.2023: <Fixed> in SW 1.2 & \"verified\" by 'QA'"
+    request = AddSupplierResponseRequest("1234", "5678", "AHCP5-1", "1", text)
+    assert request.response_text == text
+    document = ET.fromstring(request.to_string())
+    assert document.find(".//ResponseText").text == text
+    assert document.find(".//ErrorNumber").text == "AHCP5-1"
+    assert document.find(".//Status").text == "1"
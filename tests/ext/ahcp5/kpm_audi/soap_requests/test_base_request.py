@@ -0,0 +1,35 @@
+import xml.etree.ElementTree as ET
+
+from app.ext.kpm_audi.soap_requests import (
+    DevelopmentProblemDataRequest,
+    ProcessStepListRequest,
+)
+from app.ext.kpm_audi.soap_requests.base_request import escape_xml
+
+
+def test_escape_xml():
+    assert escape_xml("plain text") == "plain text"
+    assert escape_xml("a < b & c > \"d\" 'e'") == (
+        "a &lt; b &amp; c &gt; &quot;d&quot; &apos;e&apos;"
+    )
+    assert escape_xml(None) == ""
+    assert escape_xml(1234) == "1234"
+
+
+def test_template_compiled_once_per_class():
+    template = DevelopmentProblemDataRequest.template()
+    assert template is DevelopmentProblemDataRequest.template()
+    assert "/KpmService/GetDevelopmentProblemDataRequest<" in template
+    assert "/KpmService/GetProcessStepListRequest<" in ProcessStepListRequest.template()
+
+
+def test_to_string_without_validation_is_the_rendered_template():
+    request = DevelopmentProblemDataRequest("1234", "U<SER>", uuid="some_uuid")
+    document = request.to_string()
+    assert document == request.to_string(validate=False)
+    assert document.startswith("<soapenv:Envelope ")
+    assert "<UserId>U&lt;SER&gt;</UserId>" in document
+    assert "urn:uuid:some_uuid" in document
+    assert ET.tostring(ET.fromstring(document), encoding="unicode") == (
+        request.to_string(validate=True)
+    )
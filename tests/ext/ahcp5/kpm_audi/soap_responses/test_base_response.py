@@ -1,15 +1,23 @@
 import pytest
 import xml.etree.ElementTree as ET
-from app.ext.kpm_audi.soap_responses.base_response import BaseResponse
+from app.ext.kpm_audi.soap_responses.base_response import BaseResponse, ResponseMessage
+from app.ext.kpm_audi.soap_responses.xml_backend import lxml_etree, xml_backend
 from app.ext.kpm_audi.exceptions import KpmResponseError
+from app.core.custom_logger import get_logger, logger
 
 
+@pytest.mark.parametrize("backend", ["etree", "lxml"])
 def test_mtom_soap_response_soap_message_to_string(
-    make_mtom_soap_response, soap_envelope_xml
+    make_mtom_soap_response, soap_envelope_xml, backend
 ):
     response = BaseResponse(make_mtom_soap_response())
+    response.backend = xml_backend(backend)
     assert ET.tostring(response.soap_envelope) == ET.tostring(soap_envelope_xml)
-    assert response.to_string() == ET.tostring(soap_envelope_xml)
+    # lxml keeps the original namespace prefixes
+    to_string = ET.tostring(ET.fromstring(response.to_string()))
+    assert to_string == ET.tostring(soap_envelope_xml)
+    if backend == "etree":
+        assert response.to_string() == ET.tostring(soap_envelope_xml)
 
 
 def test_mtom_soap_response_soap_body_can_be_read(
@@ -46,3 +54,107 @@ def test_xml_soapukpm_fault(xml_response_kpm_fault):
     with pytest.raises(KpmResponseError) as ex:
         assert response.xml()
     assert "Request failed with error: Some Error Code, -> Ups" == str(ex.value)
+
+
+def response_message_body(message_id, message_type, message_text):
+    return (
+        '<ns2:GetDevelopmentProblemDataResponse xmlns:ns2="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3">'
+        "<GetDevelopmentProblemDataResponseInternal>"
+        "<ResponseMessage>"
+        f"<MessageId>{message_id}</MessageId>"
+        f"<MessageType>{message_type}</MessageType>"
+        f"<MessageText>{message_text}</MessageText>"
+        "<SessionKey>de.volkswagen.kpm.backend.command.KPMSessionImpl@1</SessionKey>"
+        "<VersionId>release_17.8.0</VersionId>"
+        "</ResponseMessage>"
+        "</GetDevelopmentProblemDataResponseInternal>"
+        "</ns2:GetDevelopmentProblemDataResponse>"
+    )
+
+
+def test_response_message_success(make_mtom_soap_response):
+    body = response_message_body("INFO_001", "MT_INFO", "Method completed successfully")
+    response = BaseResponse(make_mtom_soap_response(soap_body_content=body))
+    assert response.message == ResponseMessage(
+        "INFO_001", "MT_INFO", "Method completed successfully", "release_17.8.0"
+    )
+    assert response.message is response.message
+    assert response.is_valid() is True
+    assert response.has_no_access() is None
+
+
+def test_response_message_no_access(make_mtom_soap_response):
+    body = response_message_body(
+        "FC_512", "MT_FAULT", "The user has no permission to read the problem"
+    )
+    response = BaseResponse(make_mtom_soap_response(soap_body_content=body))
+    assert response.message.is_fault
+    assert response.is_valid() is None
+    assert response.has_no_access() is True
+
+
+def test_response_message_other_fault(make_mtom_soap_response):
+    body = response_message_body("FC_100", "MT_FAULT", "Something else")
+    response = BaseResponse(make_mtom_soap_response(soap_body_content=body))
+    assert response.is_valid() is None
+    assert response.has_no_access() is None
+    assert response.message.to_dict() == {
+        "message_id": "FC_100",
+        "message_type": "MT_FAULT",
+        "message_text": "Something else",
+        "version_id": "release_17.8.0",
+    }
+
+
+@pytest.mark.parametrize(
+    "message, level, logged",
+    [
+        (("FC_512", "MT_FAULT", "No permission"), "WARNING", "NO KPM ACCESS"),
+        (("FC_100", "MT_FAULT", "Something else"), "ERROR", "KPM fault response"),
+        (("WARN_1", "MT_WARNING", "Something else"), "ERROR", "validation failed"),
+    ],
+)
+def test_failed_validation_classified(make_mtom_soap_response, message, level, logged):
+    records = []
+    logger.remove()
+    logger.add(lambda message: records.append(message.record), level="INFO")
+    body = response_message_body(*message)
+    response = BaseResponse(make_mtom_soap_response(soap_body_content=body), "9029473")
+    try:
+        assert response.is_valid() is None
+    finally:
+        get_logger()
+    assert [record["level"].name for record in records] == [level]
+    assert logged in records[0]["message"]
+
+
+def test_response_message_missing(make_mtom_soap_response):
+    response = BaseResponse(make_mtom_soap_response())
+    assert not response.message
+    assert response.is_valid() is None
+
+
+@pytest.mark.parametrize("backend", ["etree", "lxml"])
+def test_select_with_both_backends(make_mtom_soap_response, backend):
+    body = response_message_body("INFO_001", "MT_INFO", "Method completed successfully")
+    response = BaseResponse(make_mtom_soap_response(soap_body_content=body))
+    response.backend = xml_backend(backend)
+    path = (
+        "soap:Body/kpm:GetDevelopmentProblemDataResponse"
+        "/GetDevelopmentProblemDataResponseInternal/ResponseMessage/MessageId"
+    )
+    assert [element.text for element in response.select(path)] == ["INFO_001"]
+    assert response.select_one(path).text == "INFO_001"
+    assert response.select_one("soap:Body/kpm:Missing") is None
+    assert response.message.version_id == "release_17.8.0"
+
+
+def test_lxml_parses_memoryview_in_chunks():
+    backend = xml_backend("lxml")
+    content = b"<a>" + b"<b>text</b>" * 20_000 + b"</a>"
+    element = backend.fromstring(memoryview(content))
+    assert backend.tostring(element) == content
+    with pytest.raises(lxml_etree.XMLSyntaxError):
+        backend.fromstring(memoryview(content[:-1]))
+    # the parser is reset after the error
+    assert backend.tostring(backend.fromstring(memoryview(b"<c/>"))) == b"<c/>"
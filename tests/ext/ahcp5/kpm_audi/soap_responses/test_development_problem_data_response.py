@@ -0,0 +1,92 @@
+import json
+import xml.etree.ElementTree as ET
+
+import xmltodict
+
+from app.ext.kpm_audi.soap_responses.development_problem_data_response import (
+    DevelopmentProblemDataResponse,
+    element_to_dict,
+)
+
+
+def development_problem_data_response_body():
+    return (
+        '<ns2:GetDevelopmentProblemDataResponse xmlns:ns2="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3">'
+        "<GetDevelopmentProblemDataResponseInternal>"
+        "<ResponseMessage>"
+        "<MessageId>INFO_001</MessageId>"
+        "<MessageType>MT_INFO</MessageType>"
+        "<MessageText>Method completed successfully</MessageText>"
+        "</ResponseMessage>"
+        "<DevelopmentProblem>"
+        "<ProblemNumber>9029473</ProblemNumber>"
+        "<ExternalProblemNumber/>"
+        "<ProblemStatus>5</ProblemStatus>"
+        "<SupplierStatus>1</SupplierStatus>"
+        "<Rating> 4</Rating>"
+        "<Supplier>"
+        "<Contractor><PersonalContractor><UserId>D962178</UserId>"
+        "</PersonalContractor></Contractor>"
+        "<Status>2</Status>"
+        "</Supplier>"
+        '<AdditionalCriteria description="Commissioning">I</AdditionalCriteria>'
+        "<Keyword>A</Keyword>"
+        "<Keyword>B</Keyword>"
+        "</DevelopmentProblem>"
+        "</GetDevelopmentProblemDataResponseInternal>"
+        "</ns2:GetDevelopmentProblemDataResponse>"
+    )
+
+
+def development_problem_response(make_mtom_soap_response):
+    body = development_problem_data_response_body()
+    return DevelopmentProblemDataResponse(
+        make_mtom_soap_response(soap_body_content=body), "9029473"
+    )
+
+
+def test_development_problem_as_dict_like_xmltodict(make_mtom_soap_response):
+    response = development_problem_response(make_mtom_soap_response)
+    expected = json.loads(
+        json.dumps(xmltodict.parse(ET.tostring(response.development_problem)))
+    )
+    assert response.development_problem_as_dict() == expected
+    assert response.development_problem_as_dict() is (
+        response.development_problem_as_dict()
+    )
+
+
+def test_typed_development_problem(make_mtom_soap_response):
+    response = development_problem_response(make_mtom_soap_response)
+    problem = response.problem
+    assert problem.ProblemNumber == "9029473"
+    assert problem.Rating == "4"
+    assert problem.Supplier.Contractor.PersonalContractor.UserId == "D962178"
+    assert problem.Coordinator is None
+    assert response.problem_number == "9029473"
+    assert response.external_problem_number == ""
+    assert response.problem_status == "5"
+    assert response.supplier_status == "1"
+    assert response.supplier_inner_status == "2"
+    assert response.coordinator_status == ""
+
+
+def test_value_at(make_mtom_soap_response):
+    response = development_problem_response(make_mtom_soap_response)
+    user_id_path = "DevelopmentProblem/Supplier/Contractor/PersonalContractor/UserId"
+    assert response.value_at(user_id_path) == "D962178"
+    assert response.value_at("DevelopmentProblem/Supplier/Status") == "2"
+    assert response.value_at("DevelopmentProblem/Keyword") == ["A", "B"]
+    assert response.value_at("DevelopmentProblem/Coordinator/Status", {}) == {}
+
+
+def test_element_to_dict():
+    element = ET.fromstring(
+        '<A><B x="1">text</B><C/><D><E> e </E></D><F>1</F><F>2</F></A>'
+    )
+    assert element_to_dict(element) == {
+        "B": {"@x": "1", "#text": "text"},
+        "C": None,
+        "D": {"E": "e"},
+        "F": ["1", "2"],
+    }
@@ -0,0 +1,151 @@
+from io import BytesIO
+import os
+
+import pytest
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from app.ext.kpm_audi.exceptions import KpmResponseError
+from app.ext.kpm_audi.soap_responses import DocumentResponse
+from app.ext.kpm_audi.soap_responses.xop_stream import index_parts
+
+
+BOUNDARY = "uuid:8df5f235-fba1-492f-8425-example"
+CID = "8b559b22-8c7f-4d5a-935e-aa0abcdefg-18551@cxf.apache.org"
+
+
+SUCCESS_MESSAGE = (
+    "<ResponseMessage><MessageId>INFO_001</MessageId>"
+    "<MessageType>MT_INFO</MessageType>"
+    "<MessageText>Method completed successfully</MessageText></ResponseMessage>"
+)
+FAULT_MESSAGE = (
+    "<ResponseMessage><MessageId>FC_512</MessageId>"
+    "<MessageType>MT_FAULT</MessageType>"
+    "<MessageText>The user has no permission to read the problem</MessageText>"
+    "</ResponseMessage>"
+)
+
+
+def document_response_content(
+    attachment: bytes, message: str = SUCCESS_MESSAGE
+) -> bytes:
+    envelope = (
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+        "<soap:Body>"
+        '<ns2:GetDocumentResponse xmlns:ns2="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3">'  # noqa: E501
+        "<GetDocumentResponseInternal>"
+        f"{message}"
+        "<Document><Name>trace</Name><Suffix>zip</Suffix><Data>"
+        f'<xop:Include href="cid:{CID}" '
+        'xmlns:xop="http://www.w3.org/2004/08/xop/include"/>'
+        "</Data></Document>"
+        "</GetDocumentResponseInternal>"
+        "</ns2:GetDocumentResponse>"
+        "</soap:Body>"
+        "</soap:Envelope>"
+    )
+    return (
+        (
+            f"\r\n--{BOUNDARY}\r\n"
+            "Content-Type: text/xml; charset=UTF-8\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            "Content-ID: <root.message@cxf.apache.org>\r\n\r\n"
+            f"{envelope}\r\n--{BOUNDARY}\r\n"
+            "Content-Type: application/octet-stream\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            f"Content-ID: <{CID}>\r\n\r\n"
+        ).encode("utf-8")
+        + attachment
+        + f"\r\n--{BOUNDARY}--".encode("utf-8")
+    )
+
+
+def streamed_response(content: bytes) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict(
+        {
+            "Content-Type": 'multipart/related; type="application/xop+xml"; '
+            f'boundary="{BOUNDARY}"; start="<root.message@cxf.apache.org>"; '
+            'start-info="text/xml"'
+        }
+    )
+    response.raw = BytesIO(content)
+    return response
+
+
+def binary_attachment(size: int) -> bytes:
+    # include boundary like bytes to check they are not taken as a delimiter
+    pattern = bytes(range(256)) + f"\r\n--{BOUNDARY[:10]}".encode("utf-8")
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 1024])
+def test_save_attachment_streams_to_file(tmp_path, chunk_size):
+    attachment = binary_attachment(20_000)
+    response = DocumentResponse(
+        streamed_response(document_response_content(attachment))
+    )
+    file_path = tmp_path / "trace.zip"
+    size = response.save_attachment(file_path, chunk_size=chunk_size)
+    assert size == len(attachment)
+    assert file_path.read_bytes() == attachment
+    assert response.is_valid()
+    assert response.get_xop_include_href_cid() == CID
+
+
+def test_save_attachment_matches_in_memory_attachment(tmp_path):
+    content = document_response_content(b"\x00\x01binary\r\n\r\ndata\xff")
+    in_memory = DocumentResponse(streamed_response(content))
+    in_memory.raw._content = content
+    streamed = DocumentResponse(streamed_response(content))
+    streamed.save_attachment(tmp_path / "data.bin")
+    assert (tmp_path / "data.bin").read_bytes() == in_memory.attachment
+
+
+def test_save_attachment_aborts_when_too_big(tmp_path):
+    content = document_response_content(binary_attachment(10_000))
+    response = DocumentResponse(streamed_response(content))
+    with pytest.raises(KpmResponseError):
+        response.save_attachment(tmp_path / "trace.zip", max_size=5_000)
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_attachment_incomplete_response(tmp_path):
+    content = document_response_content(binary_attachment(10_000))[:-20]
+    response = DocumentResponse(streamed_response(content))
+    with pytest.raises(KpmResponseError):
+        response.save_attachment(tmp_path / "trace.zip")
+    assert os.listdir(tmp_path) == []
+
+
+def test_save_attachment_invalid_response(tmp_path):
+    content = document_response_content(binary_attachment(1_000), FAULT_MESSAGE)
+    response = DocumentResponse(streamed_response(content))
+    assert response.save_attachment(tmp_path / "trace.zip") is None
+    assert os.listdir(tmp_path) == []  # nothing left in the cache
+
+
+def test_part_index_and_attachment_view():
+    attachment = binary_attachment(20_000)
+    content = document_response_content(attachment)
+    parts = index_parts(content, BOUNDARY)
+    assert [part.content_id for part in parts] == ["root.message@cxf.apache.org", CID]
+    assert parts[1].content_type == "application/octet-stream"
+    assert parts[1].length == len(attachment)
+
+    response = DocumentResponse(streamed_response(content))
+    response.raw._content = content
+    assert response.is_valid()
+    view = response.attachment
+    assert isinstance(view, memoryview)
+    assert view.obj is content  # a view on the response, not a copy
+    assert view == attachment
+    assert response.attachment is view
+
+
+def test_part_index_incomplete_response():
+    content = document_response_content(binary_attachment(1_000))[:-20]
+    with pytest.raises(KpmResponseError):
+        index_parts(content, BOUNDARY)
@@ -0,0 +1,93 @@
+import pytest
+
+from app.ext.kpm_audi.exceptions import KpmResponseError
+from app.ext.kpm_audi.soap_responses.multiple_problem_data_response import (
+    MultipleProblemDataResponse,
+)
+
+
+def problem_reference(kpm_id: str, timestamp: str, *types: str) -> str:
+    message_types = "".join(f"<MessageType>{t}</MessageType>" for t in types)
+    return (
+        "<ProblemReference>"
+        f"<ProblemNumber>{kpm_id}</ProblemNumber>"
+        f"<LastChangeTimestamp>{timestamp}</LastChangeTimestamp>"
+        f"<MessageTypeList>{message_types}</MessageTypeList>"
+        "</ProblemReference>"
+    )
+
+
+def multiple_problem_data_response_body(count: int = 3) -> str:
+    references = "".join(
+        problem_reference(str(1000 + i), f"2023-03-01 1{i}:00:00.123", "NEW", "ANS")
+        for i in range(count)
+    )
+    return (
+        '<ns2:GetMultipleProblemDataResponse xmlns:ns2="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3">'
+        "<GetMultipleProblemDataResponseInternal>"
+        f"{references}"
+        "<ResponseMessage>"
+        "<MessageId>INFO_001</MessageId>"
+        "<MessageType>MT_INFO</MessageType>"
+        "<MessageText>Method completed successfully</MessageText>"
+        "</ResponseMessage>"
+        "</GetMultipleProblemDataResponseInternal>"
+        "</ns2:GetMultipleProblemDataResponse>"
+    )
+
+
+def test_problem_references(make_mtom_soap_response):
+    body = multiple_problem_data_response_body()
+    response = MultipleProblemDataResponse(
+        make_mtom_soap_response(soap_body_content=body)
+    )
+    references = response.problem_references()
+    assert [ref.problem_number for ref in references] == ["1000", "1001", "1002"]
+    assert references[1].last_change_timestamp == "2023-03-01 11:00:00"
+    assert references[1].types == ["NEW", "ANS"]
+    assert response.problem_references() is references
+    assert response.kpm_ids() == ["1000", "1001", "1002"]
+    assert response.is_valid()
+
+
+def test_iter_problem_references_while_parsing(make_mtom_soap_response):
+    body = multiple_problem_data_response_body(50)
+    response = MultipleProblemDataResponse(
+        make_mtom_soap_response(soap_body_content=body)
+    )
+    references = response.iter_problem_references(chunk_size=256)
+    assert next(references).problem_number == "1000"
+    # the response is not fully parsed yet
+    assert response._soap_envelope is None
+    assert len(list(references)) == 49
+
+    # parsed once: the references are cached, the envelope kept without them
+    assert len(response.problem_references()) == 50
+    assert next(response.soap_body.iter("ProblemReference"), None) is None
+    assert response.is_valid()
+    assert list(response.iter_problem_references())[-1].problem_number == "1049"
+
+
+def test_problem_references_of_parsed_envelope(make_mtom_soap_response):
+    body = multiple_problem_data_response_body()
+    response = MultipleProblemDataResponse(
+        make_mtom_soap_response(soap_body_content=body)
+    )
+    assert response.is_valid()
+    assert response.kpm_ids() == ["1000", "1001", "1002"]
+
+
+def test_iter_problem_references_invalid_xml(make_mtom_soap_response):
+    body = multiple_problem_data_response_body() + "<Unclosed>"
+    response = MultipleProblemDataResponse(
+        make_mtom_soap_response(soap_body_content=body)
+    )
+    with pytest.raises(KpmResponseError):
+        list(response.iter_problem_references())
+
+
+def test_iter_problem_references_kpm_fault(xml_response_kpm_fault):
+    response = MultipleProblemDataResponse(xml_response_kpm_fault)
+    with pytest.raises(KpmResponseError) as ex:
+        list(response.iter_problem_references())
+    assert "Some Error Code" in str(ex.value)
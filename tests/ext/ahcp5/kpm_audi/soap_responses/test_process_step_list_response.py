@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from app.ext.kpm_audi.soap_responses.process_steps_response import (
     ProcessStepItem,
     ProcessStepListResponse,
@@ -51,3 +53,74 @@ def test_response(make_mtom_soap_response):
     assert step2.step_type_desc == "Description2"
     assert step2.sender_role == "S"
     assert step2.status == "2"
+
+
+def process_step_item(step_id: str, last_change_date: str, step_type: str, desc: str):
+    return (
+        "<ProcessStepItem>"
+        "<ProblemNumber>12345</ProblemNumber>"
+        f"<ProcessStepId>{step_id}</ProcessStepId>"
+        f"<LastChangeDate>{last_change_date}</LastChangeDate>"
+        f"<ProcessStepType>{step_type}</ProcessStepType>"
+        f"<ProcessStepTypeDescription>{desc}</ProcessStepTypeDescription>"
+        "<Status>1</Status>"
+        "<SenderRole>F</SenderRole>"
+        "</ProcessStepItem>"
+    )
+
+
+def get_grouped_process_step_list_response_body():
+    # newest first, as KPM sends them (but not strictly ordered)
+    items = [
+        ("s5", "2023-03-01-00.00.00.000000", "12", "Lieferantenaussage"),
+        ("s4", "2023-02-01-00.00.00.000000", "15", "Antwort auf Rueckfrage"),
+        ("s3", "2023-02-15-00.00.00.000000", "12", "Lieferantenaussage"),
+        ("s2", "2023-01-15-00.00.00.000000", "14", "Antwort"),
+        ("s1", "2023-01-01-00.00.00.000000", "12", "Lieferantenaussage"),
+    ]
+    return (
+        '<ns5:GetProcessStepListResponse xmlns:ns5="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3">'  # noqa: E501
+        "<GetProcessStepListResponse>"
+        + "".join(process_step_item(*item) for item in items)
+        + "</GetProcessStepListResponse>"
+        "</ns5:GetProcessStepListResponse>"
+    )
+
+
+def step_ids(steps: list[ProcessStepItem]) -> list[str]:
+    return [step.step_id for step in steps]
+
+
+def test_step_lists_keep_response_order(make_mtom_soap_response):
+    body = get_grouped_process_step_list_response_body()
+    response = ProcessStepListResponse(make_mtom_soap_response(soap_body_content=body))
+    assert step_ids(response.feedback_to_oem_step_list) == ["s5", "s3", "s1"]
+    assert step_ids(response.answers_from_oem_step_list) == ["s4", "s2"]
+    assert response.feedback_from_oem_step_list == []
+    assert response.feedback_to_oem_step_list is response.feedback_to_oem_step_list
+    assert not hasattr(response.as_list[0], "__dict__")  # slots
+
+
+def test_steps_grouped_and_newer_than(make_mtom_soap_response):
+    body = get_grouped_process_step_list_response_body()
+    response = ProcessStepListResponse(make_mtom_soap_response(soap_body_content=body))
+    index = response.index
+    assert step_ids(index.steps(step_type="12")) == ["s1", "s3", "s5"]
+    assert step_ids(index.steps(step_type_desc="Antwort", partial=True)) == [
+        "s2",
+        "s4",
+    ]
+    assert step_ids(index.steps()) == ["s1", "s2", "s4", "s3", "s5"]
+    assert index.latest(step_type_desc="Lieferantenaussage").step_id == "s5"
+
+    # any LastChangeDate format, e.g. the one of the process step details
+    newer = response.steps_newer_than(
+        "2023-02-01 00:00:00.000000", step_type_desc="Lieferantenaussage"
+    )
+    assert step_ids(newer) == ["s3", "s5"]
+    assert step_ids(response.steps_newer_than(datetime(2023, 1, 20))) == [
+        "s4",
+        "s3",
+        "s5",
+    ]
+    assert response.steps_newer_than("2023-03-01-00.00.00.000000") == []
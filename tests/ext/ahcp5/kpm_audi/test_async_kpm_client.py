@@ -0,0 +1,292 @@
+import asyncio
+import re
+
+from aiohttp import web
+import pytest
+
+from app.ext.kpm_audi import async_kpm_client
+from app.ext.kpm_audi.async_kpm_client import AsyncKPMClient
+from app.ext.kpm_audi.exceptions import KpmMissingConnectionError
+from app.ext.kpm_audi.kpm_client import ALREADY_POSTED
+from app.ext.kpm_audi.process_step_cache import ProcessStepCache
+from app.ext.kpm_audi.transport import KpmTransportConfig, PostVerifyConfig
+from tests.ext.ahcp5.kpm_audi.test_kpm_client import (
+    content_development_problem_data_response_success,
+    headers,
+)
+
+
+BOUNDARY = "uuid:5f0c7e9a-stand-in-server"
+V3 = "http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3"
+SUCCESS = (
+    "<ResponseMessage><MessageId>INFO_001</MessageId>"
+    "<MessageType>MT_INFO</MessageType>"
+    "<MessageText>Method completed successfully</MessageText></ResponseMessage>"
+)
+USER = (
+    "<Email>john.doe@example.com</Email><Phone/>"
+    "<UserId>SOMEID</UserId><UserName>DOE,JOHN</UserName>"
+)
+
+
+def mtom_content_type(boundary: str = BOUNDARY) -> str:
+    return (
+        f'multipart/related; type="application/xop+xml"; boundary="{boundary}"; '
+        'start="<root.message@cxf.apache.org>"; start-info="text/xml"'
+    )
+
+
+def mtom(body: str, attachment: bytes = None) -> bytes:
+    envelope = (
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+        f"<soap:Body>{body}</soap:Body></soap:Envelope>"
+    )
+    content = (
+        f"\r\n--{BOUNDARY}\r\nContent-Type: text/xml; charset=UTF-8\r\n"
+        f"Content-ID: <root.message@cxf.apache.org>\r\n\r\n{envelope}"
+    ).encode("utf-8")
+    if attachment is not None:
+        content += (
+            f"\r\n--{BOUNDARY}\r\nContent-Type: application/octet-stream\r\n"
+            "Content-ID: <doc@cxf.apache.org>\r\n\r\n"
+        ).encode("utf-8")
+        content += attachment
+    return content + f"\r\n--{BOUNDARY}--".encode("utf-8")
+
+
+class StandInKpmServer:
+    """Local stand-in for the KPM SOAP service, answering by SOAP action."""
+
+    def __init__(self, attachment: bytes = b"", delay: float = 0):
+        self.attachment = attachment
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.supplier_responses = ["First supplier response"]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        data = await request.text()
+        action = re.search("/KpmService/(\\w+)<", data)[1]
+        kpm_id = re.search("<ProblemNumber>(.*?)</ProblemNumber>", data)
+        kpm_id = kpm_id[1] if kpm_id else ""
+        self.requests.append(action)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if action == "GetDevelopmentProblemDataRequest":
+                return web.Response(
+                    body=content_development_problem_data_response_success(),
+                    headers={"Content-Type": headers()["Content-Type"]},
+                )
+            body = getattr(self, action)(kpm_id, data)
+            attachment = self.attachment if action == "GetDocumentRequest" else None
+            return web.Response(
+                body=mtom(body, attachment),
+                headers={"Content-Type": mtom_content_type()},
+            )
+        finally:
+            self.in_flight -= 1
+
+    def GetMultipleProblemDataRequest(self, kpm_id: str, data: str) -> str:
+        references = "".join(
+            f"<ProblemReference><ProblemNumber>{number}</ProblemNumber>"
+            "<LastChangeTimestamp>2023-01-01 00:00:00.123</LastChangeTimestamp>"
+            "<MessageTypeList><MessageType>NEW</MessageType></MessageTypeList>"
+            "</ProblemReference>"
+            for number in ("1001", "1002")
+        )
+        return (
+            f'<ns2:GetMultipleProblemDataResponse xmlns:ns2="{V3}">'
+            f"<GetMultipleProblemDataResponseInternal>{SUCCESS}{references}"
+            "</GetMultipleProblemDataResponseInternal>"
+            "</ns2:GetMultipleProblemDataResponse>"
+        )
+
+    def GetProcessStepListRequest(self, kpm_id: str, data: str) -> str:
+        items = "".join(
+            f"<ProcessStepItem><ProblemNumber>{kpm_id}</ProblemNumber>"
+            f"<ProcessStepId>step-{i}</ProcessStepId>"
+            f"<LastChangeDate>2023-01-0{i + 1}-00.00.00.000001</LastChangeDate>"
+            "<ProcessStepType>01</ProcessStepType>"
+            "<ProcessStepTypeDescription>Lieferantenaussage"
+            "</ProcessStepTypeDescription>"
+            "<Status>1</Status><SenderRole>E</SenderRole></ProcessStepItem>"
+            for i in reversed(range(len(self.supplier_responses)))
+        )
+        return (
+            f'<ns2:GetProcessStepListResponse xmlns:ns2="{V3}">'
+            f"<GetProcessStepListResponse>{SUCCESS}{items}"
+            "</GetProcessStepListResponse></ns2:GetProcessStepListResponse>"
+        )
+
+    def GetProcessStepRequest(self, kpm_id: str, data: str) -> str:
+        step_id = re.search("<ProcessStepId>(.*?)</ProcessStepId>", data)[1]
+        text = self.supplier_responses[int(step_id.split("-")[-1])]
+        return (
+            f'<ns2:GetProcessStepResponse xmlns:ns2="{V3}">'
+            f"<GetProcessStepResponse>{SUCCESS}<ProcessStep>"
+            f"<CreationDate>2023-01-01-00.00.00.000001</CreationDate>"
+            f"<Creator>{USER}</Creator>"
+            f"<LastChangeDate>2023-01-01-00.00.00.000001</LastChangeDate>"
+            f"<LastChanger>{USER}</LastChanger>"
+            f"<ProblemNumber>{kpm_id}</ProblemNumber>"
+            f"<ProcessStepId>{step_id}</ProcessStepId>"
+            "<ProcessStepType>01</ProcessStepType>"
+            "<ProcessStepTypeDescription>Lieferantenaussage"
+            "</ProcessStepTypeDescription>"
+            f"<SenderRole>E</SenderRole><Status>1</Status><Text>{text}</Text>"
+            "</ProcessStep></GetProcessStepResponse></ns2:GetProcessStepResponse>"
+        )
+
+    def GetDocumentListRequest(self, kpm_id: str, data: str) -> str:
+        return (
+            f'<ns2:GetDocumentListResponse xmlns:ns2="{V3}">'
+            f"<GetDocumentListResponseInternal>{SUCCESS}<DocumentReference>"
+            "<DocumentId>doc-1</DocumentId><Name>trace</Name>"
+            f"<Size>{len(self.attachment)}</Size><AccessRight>0</AccessRight>"
+            "<Suffix>zip</Suffix><Type>1</Type></DocumentReference>"
+            "</GetDocumentListResponseInternal></ns2:GetDocumentListResponse>"
+        )
+
+    def GetDocumentRequest(self, kpm_id: str, data: str) -> str:
+        return (
+            f'<ns2:GetDocumentResponse xmlns:ns2="{V3}">'
+            f"<GetDocumentResponseInternal>{SUCCESS}<Document>"
+            "<Name>trace</Name><Suffix>zip</Suffix><Data>"
+            '<xop:Include href="cid:doc@cxf.apache.org" '
+            'xmlns:xop="http://www.w3.org/2004/08/xop/include"/>'
+            "</Data></Document></GetDocumentResponseInternal>"
+            "</ns2:GetDocumentResponse>"
+        )
+
+    def AddSupplierResponseRequest(self, kpm_id: str, data: str) -> str:
+        text = re.search("<ResponseText>(.*?)</ResponseText>", data, re.S)[1]
+        self.supplier_responses.append(text)
+        return (
+            f'<ns2:AddSupplierResponseResponse xmlns:ns2="{V3}">'
+            f"<AddSupplierResponseResponseInternal>{SUCCESS}"
+            "</AddSupplierResponseResponseInternal>"
+            "</ns2:AddSupplierResponseResponse>"
+        )
+
+
+def run_with_server(server: StandInKpmServer, tmp_path, scenario, **client_kwargs):
+    """Run the SCENARIO coroutine function with a client connected to SERVER."""
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/", server.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with AsyncKPMClient(
+                f"http://127.0.0.1:{port}/",
+                "USER",
+                "cert",
+                "FF/HCP5BS-ESR/",
+                step_cache=ProcessStepCache(tmp_path / "steps"),
+                transport=KpmTransportConfig(backoff_base=0),
+                **client_kwargs,
+            ) as client:
+                return await scenario(client)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_issue_and_query(tmp_path):
+    async def scenario(client: AsyncKPMClient):
+        return await asyncio.gather(client.issue("9029473"), client.query("since"))
+
+    issue, query = run_with_server(StandInKpmServer(), tmp_path, scenario)
+    assert issue.problem_number == "9029473"
+    assert query.kpm_ids() == ["1001", "1002"]
+
+
+def test_process_steps(tmp_path):
+    server = StandInKpmServer()
+    server.supplier_responses = ["first", "second", "third"]
+
+    async def scenario(client: AsyncKPMClient):
+        step_list = await client.process_step_list("1001")
+        steps = step_list.as_list
+        return await client.process_steps(
+            "1001",
+            [step.step_id for step in steps],
+            [step.last_change_date for step in steps],
+        )
+
+    responses = run_with_server(server, tmp_path, scenario)
+    assert [response.step.text for response in responses] == [
+        "third",
+        "second",
+        "first",
+    ]
+
+
+def test_concurrency_limit(tmp_path):
+    server = StandInKpmServer(delay=0.05)
+
+    async def scenario(client: AsyncKPMClient):
+        return await asyncio.gather(*(client.issue(str(i)) for i in range(12)))
+
+    issues = run_with_server(server, tmp_path, scenario, max_concurrency=3)
+    assert all(issues)
+    assert len(server.requests) == 12
+    assert server.max_in_flight == 3
+
+
+def test_get_document_streams_to_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        async_kpm_client,
+        "document_cache_path",
+        lambda *args: str(tmp_path / "trace.zip"),
+    )
+    attachment = bytes(range(256)) * 1000
+    server = StandInKpmServer(attachment=attachment)
+
+    async def scenario(client: AsyncKPMClient):
+        (doc,) = await client.get_document_list("1001")
+        return await client.get_document("1001", doc.id, doc.name, doc.suffix, doc.size)
+
+    path = run_with_server(server, tmp_path, scenario)
+    assert path == str(tmp_path / "trace.zip")
+    assert (tmp_path / "trace.zip").read_bytes() == attachment
+
+
+def test_post_supplier_response(tmp_path):
+    server = StandInKpmServer()
+
+    async def scenario(client: AsyncKPMClient):
+        posted = await client.post_supplier_response("1001", "ESR-1", "1", "Fixed")
+        again = await client.post_supplier_response("1001", "ESR-1", "1", "Fixed")
+        return posted, again
+
+    posted, again = run_with_server(
+        server,
+        tmp_path,
+        scenario,
+        post_back_to_kpm=True,
+        post_verify=PostVerifyConfig(first_delay=0),
+    )
+    assert posted is True
+    assert again == ALREADY_POSTED
+    assert server.requests.count("AddSupplierResponseRequest") == 1
+
+
+def test_not_connected(tmp_path):
+    client = AsyncKPMClient(
+        "http://127.0.0.1:1/",
+        "USER",
+        "cert",
+        "FF/HCP5BS-ESR/",
+        step_cache=ProcessStepCache(tmp_path),
+    )
+    with pytest.raises(KpmMissingConnectionError):
+        asyncio.run(client.query("since"))
@@ -1,3 +1,20 @@
+import os
+import re
+from types import SimpleNamespace
+
+from requests import Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.structures import CaseInsensitiveDict
+import pytest
+
+from app.core.custom_logger import get_logger, logger
+from app.ext.kpm_audi import kpm_client as kpm_client_module
+from app.ext.kpm_audi.kpm_client import KPMClient, PendingPost
+from app.ext.kpm_audi.exceptions import KpmRequestError
+from app.ext.kpm_audi.process_step_cache import ProcessStepCache
+from app.ext.kpm_audi.transport import KpmTransportConfig, PostVerifyConfig
+
+
 def headers():
     # Removed 'Content-Encoding': 'gzip'
     return {
@@ -18,3 +35,305 @@ def content_development_problem_data_response_success():
 
 def content_development_problem_data_response_fault():
     return b"""\r\n--uuid:21e3102e-e45e-43f0-8e90-d6843a9ddc03\r\nContent-Type: text/xml; charset=UTF-8\r\nContent-Transfer-Encoding: binary\r\nContent-ID: <root.message@cxf.apache.org>\r\n\r\n<?xml version="1.0" encoding="UTF-8"?>\n<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Header><wsse:Security xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd"><wsu:Timestamp wsu:Id="a4b0bffb-7ffd-4a44-a767-21f844c87a90" xmlns:wsu="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd"><wsu:Created>2022-11-25T08:30:43Z</wsu:Created><wsu:Expires>2022-11-25T08:35:43Z</wsu:Expires></wsu:Timestamp><saml2:Assertion ID="ea903ca4-fff7-44b3-a3eb-2eaf8bb700a3" IssueInstant="2022-11-25T08:30:43Z" Version="2.0" xmlns:vwsu="http://xmldefs.volkswagenag.com/Technical/Security/UsernameToken/V1" xmlns:saml2="urn:oasis:names:tc:SAML:2.0:assertion"><saml2:Issuer>https://ws-gateway.volkswagenag.com</saml2:Issuer><saml2:Subject><saml2:NameID Format="urn:oasis:names:tc:SAML:2.0:ac:classes:unspecified" NameQualifier="http://xmldefs.volkswagenag.com/Technical/Security/NameQualifier/V1#Anonymous">UNKNOWN</saml2:NameID><saml2:SubjectConfirmation Method="urn:oasis:names:tc:SAML:2.0:cm:sender-vouches"/></saml2:Subject><saml2:Conditions NotBefore="2022-11-25T08:29:43Z" NotOnOrAfter="2022-11-25T08:35:43Z"/><saml2:Advice><saml2:Assertion ID="3281414e-147c-4134-b86d-2eaf8bb728e6" IssueInstant="2022-11-25T08:30:43Z" Version="2.0"><saml2:Issuer>https://ws-gateway.volkswagenag.com</saml2:Issuer><saml2:Subject><saml2:NameID Format="urn:oasis:names:tc:SAML:2.0:ac:classes:unspecified" NameQualifier="http://xmldefs.volkswagenag.com/Technical/Security/NameQualifier/V1#UMSGlobalUserID">W4P83BH</saml2:NameID><saml2:SubjectConfirmation Method="urn:oasis:names:tc:SAML:2.0:cm:sender-vouches"/></saml2:Subject><saml2:Conditions NotBefore="2022-11-25T08:29:43Z" NotOnOrAfter="2022-11-25T08:35:43Z"/><saml2:AuthnStatement AuthnInstant="2022-11-25T08:30:43Z"><saml2:AuthnContext><saml2:AuthnContextClassRef>urn:oasis:names:tc:SAML:2.0:ac:classes:TLSClient</saml2:AuthnContextClassRef></saml2:AuthnContext></saml2:AuthnStatement><saml2:AttributeStatement><saml2:Attribute Name="ValidationType" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"><saml2:AttributeValue>sc:no-credential-validation-type</saml2:AttributeValue></saml2:Attribute></saml2:AttributeStatement></saml2:Assertion></saml2:Advice></saml2:Assertion></wsse:Security><ns1:To wsu:Id="a46c927b-0d2d-43c5-9a8f-21f844c82d3c" xmlns:wsu="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd" xmlns:ns1="http://www.w3.org/2005/08/addressing">ws://volkswagenag.com/PP/QM/GroupProblemManagementService/V3</ns1:To><ns1:Action wsu:Id="e937aee5-05a1-4f46-91da-21f844c886ce" xmlns:wsu="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd" xmlns:ns1="http://www.w3.org/2005/08/addressing">http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3/KpmService/GetDevelopmentProblemDataResponse</ns1:Action><ns1:MessageID wsu:Id="e21839ae-2f16-4198-b845-21f844c89a86" xmlns:wsu="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd" xmlns:ns1="http://www.w3.org/2005/08/addressing">urn:uuid:733cd132-6c9b-11ed-967b-aff26cf4666f</ns1:MessageID><wsa:RelatesTo xmlns:wsa="http://www.w3.org/2005/08/addressing">urn:uuid:733cd132-6c9b-11ed-967b-aff26cf4666f</wsa:RelatesTo></soap:Header><soap:Body><ns2:GetDevelopmentProblemDataResponse xmlns:ns2="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3"><GetDevelopmentProblemDataResponseInternal><ResponseMessage><MessageId>FC_512</MessageId><MessageType>MT_FAULT</MessageType><MessageText>The user has no permission to read the problem</MessageText><SessionKey>de.volkswagen.kpm.backend.command.KPMSessionImpl@2d9ec8fc</SessionKey><VersionId>release_17.0.4</VersionId><VersionDate>Wed Oct 12 12:33:34 CEST 2022</VersionDate></ResponseMessage></GetDevelopmentProblemDataResponseInternal></ns2:GetDevelopmentProblemDataResponse></soap:Body></soap:Envelope>\r\n--uuid:21e3102e-e45e-43f0-8e90-d6843a9ddc03--"""  # noqa: E501
+
+
+def content_process_step_response(kpm_id: str, step_id: str) -> bytes:
+    boundary = "uuid:0ba0ca2c-b221-4a61-936a-e85204ca56d2"
+    user = (
+        "<Email>john.doe@example.com</Email><Phone/>"
+        "<UserId>SOMEID</UserId><UserName>DOE,JOHN</UserName>"
+    )
+    envelope = (
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+        "<soap:Body>"
+        '<ns2:GetProcessStepResponse xmlns:ns2="http://xmldefs.volkswagenag.com/PP/QM/GroupProblemManagementService/V3">'  # noqa: E501
+        "<GetProcessStepResponse>"
+        "<ResponseMessage><MessageId>INFO_001</MessageId>"
+        "<MessageType>MT_INFO</MessageType>"
+        "<MessageText>Method completed successfully</MessageText></ResponseMessage>"
+        "<ProcessStep>"
+        f"<CreationDate>{step_id}</CreationDate><Creator>{user}</Creator>"
+        f"<LastChangeDate>{step_id}</LastChangeDate><LastChanger>{user}</LastChanger>"
+        f"<ProblemNumber>{kpm_id}</ProblemNumber><ProcessStepId>{step_id}</ProcessStepId>"
+        "<ProcessStepType>01</ProcessStepType>"
+        "<ProcessStepTypeDescription>Lieferantenaussage</ProcessStepTypeDescription>"
+        f"<SenderRole>E</SenderRole><Status>1</Status><Text>Text {step_id}</Text>"
+        "</ProcessStep>"
+        "</GetProcessStepResponse>"
+        "</ns2:GetProcessStepResponse>"
+        "</soap:Body>"
+        "</soap:Envelope>"
+    )
+    return (
+        f"\r\n--{boundary}\r\nContent-Type: text/xml; charset=UTF-8\r\n"
+        f"Content-ID: <root.message@cxf.apache.org>\r\n\r\n"
+        f"{envelope}\r\n--{boundary}--"
+    ).encode("utf-8")
+
+
+class FakeKpmSession:
+    """Answer GetProcessStep requests, fail for the given step ids."""
+
+    def __init__(self, failing_step_ids=()):
+        self.failing_step_ids = failing_step_ids
+        self.requested_step_ids = []
+
+    def post(self, url, data: bytes, **kwargs) -> Response:
+        data = data.decode("utf-8")
+        kpm_id = re.search("<ProblemNumber>(.*)</ProblemNumber>", data)[1]
+        step_id = re.search("<ProcessStepId>(.*)</ProcessStepId>", data)[1]
+        self.requested_step_ids.append(step_id)
+        if step_id in self.failing_step_ids:
+            raise ConnectionError(f"step {step_id} failed")
+        response = Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(headers())
+        response._content = content_process_step_response(kpm_id, step_id)
+        return response
+
+
+class FlakyKpmSession(FakeKpmSession):
+    """Fail the first FAILURES requests with a connection error."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+        self.timeouts = []
+
+    def post(self, url, data: bytes, timeout=None, **kwargs) -> Response:
+        self.timeouts.append(timeout)
+        if self.failures:
+            self.failures -= 1
+            raise RequestsConnectionError("connection reset")
+        return super().post(url, data, **kwargs)
+
+
+def kpm_client(session: FakeKpmSession, cache_dir) -> KPMClient:
+    client = KPMClient(
+        "https://kpm.example.com",
+        "USER",
+        "cert",
+        "FF/HCP5BS-ESR/",
+        step_cache=ProcessStepCache(cache_dir),
+        transport=KpmTransportConfig(retries=2, backoff_base=0),
+    )
+    client.session = session
+    return client
+
+
+def test_process_steps_keeps_input_order(tmp_path):
+    step_ids = [f"2023-01-01-00.00.00.00000{i}" for i in range(6)]
+    session = FakeKpmSession()
+    responses = kpm_client(session, tmp_path).process_steps(
+        "12345", step_ids, max_workers=3
+    )
+    assert [response.step.step_id for response in responses] == step_ids
+    assert sorted(session.requested_step_ids) == sorted(step_ids)
+
+
+def test_process_steps_reports_failures_per_step(tmp_path):
+    step_ids = ["2023-01-01-00.00.00.000001", "2023-01-01-00.00.00.000002"]
+    session = FakeKpmSession(failing_step_ids=[step_ids[0]])
+    responses = kpm_client(session, tmp_path).process_steps("12346", step_ids)
+    assert responses[0] is None
+    assert responses[1].step.step_id == step_ids[1]
+    assert responses[1].step.problem_number == "12346"
+
+
+def test_process_steps_without_step_ids(tmp_path):
+    assert kpm_client(FakeKpmSession(), tmp_path).process_steps("12345", []) == []
+
+
+def test_process_step_served_from_cache_across_clients(tmp_path):
+    step_id = "2023-01-01-00.00.00.000001"
+    last_change_date = "2023-01-02-00.00.00.000001"
+    session = FakeKpmSession()
+    first = kpm_client(session, tmp_path).process_step(
+        "12345", step_id, last_change_date
+    )
+    # a new client (e.g. after a restart) reads the step from disk
+    second = kpm_client(session, tmp_path).process_step(
+        "12345", step_id, last_change_date
+    )
+    assert session.requested_step_ids == [step_id]
+    assert second.step.text == first.step.text
+
+
+def test_process_step_changed_date_is_requested_again(tmp_path):
+    step_id = "2023-01-01-00.00.00.000001"
+    session = FakeKpmSession()
+    client = kpm_client(session, tmp_path)
+    client.process_step("12345", step_id, "2023-01-02-00.00.00.000001")
+    client.process_step("12345", step_id, "2023-01-03-00.00.00.000001")
+    client.process_step("12345", step_id)  # no date -> no cache
+    assert session.requested_step_ids == [step_id] * 3
+
+
+def test_process_step_cache_evicts_least_recently_used(tmp_path):
+    response = FakeKpmSession().post(
+        "", b"<ProblemNumber>1</ProblemNumber><ProcessStepId>1</ProcessStepId>"
+    )
+    entry_size = len(response.content) + len(response.headers["content-type"]) + 1
+    cache = ProcessStepCache(tmp_path, max_size=entry_size * 3)
+    for step_id in ("1", "2", "3"):
+        cache.put("1", step_id, "date", response)
+    assert cache.get("1", "1", "date")  # "1" is now the most recently used
+    # make the access order visible in the file timestamps
+    for i, step_id in enumerate(("2", "3", "1")):
+        path = cache._path("1", step_id, "date")
+        os.utime(path, (i, i))
+    cache.put("1", "4", "date", response)
+    assert cache.get("1", "2", "date") is None
+    assert cache.get("1", "1", "date")
+    assert cache.get("1", "4", "date")
+    assert cache.size <= entry_size * 3
+
+
+def test_post_retries_idempotent_actions(tmp_path):
+    session = FlakyKpmSession(failures=2)
+    client = kpm_client(session, tmp_path)
+    response = client.process_step("12345", "2023-01-01-00.00.00.000001")
+    assert response.step.step_id == "2023-01-01-00.00.00.000001"
+    assert session.timeouts == [(10, 30)] * 3
+    stats = client.latency.stats("GetProcessStepRequest")
+    assert (stats["count"], stats["retries"], stats["errors"]) == (1, 2, 2)
+
+
+def test_post_gives_up_after_retries(tmp_path):
+    client = kpm_client(FlakyKpmSession(failures=3), tmp_path)
+    assert client.process_step("12345", "2023-01-01-00.00.00.000001") is None
+    assert client.latency.stats("GetProcessStepRequest")["errors"] == 3
+
+
+def test_post_does_not_retry_non_idempotent_actions(tmp_path):
+    session = FlakyKpmSession(failures=1)
+    client = kpm_client(session, tmp_path)
+    data = "<ProblemNumber>1</ProblemNumber><ProcessStepId>1</ProcessStepId>"
+    with pytest.raises(KpmRequestError):
+        client._post(data, action="AddSupplierResponseRequest")
+    assert len(session.timeouts) == 1
+    assert "AddSupplierResponseRequest" in client.latency.summary()
+
+
+class FakeKpmIssueSession:
+    """Answer GetDevelopmentProblemData requests and count them."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def post(self, url, data: bytes, **kwargs) -> Response:
+        self.requests += 1
+        response = Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(headers())
+        response._content = content_development_problem_data_response_success()
+        return response
+
+
+def test_issue_fetched_once_per_sync_cycle(tmp_path):
+    session = FakeKpmIssueSession()
+    client = kpm_client(session, tmp_path)
+    with client.sync_cycle():
+        assert not client.user_has_no_access_to_ticket(9029473)
+        with client.sync_cycle():  # e.g. sync_one inside the sync loop
+            first = client.issue("9029473")
+        assert client.issue("9029473") is first
+        assert client.get_current_status("9029473")["problem"] == "5"
+        assert session.requests == 1
+        client.forget_issue("9029473")  # e.g. after posting to KPM
+        client.issue("9029473")
+        assert session.requests == 2
+    client.issue("9029473")
+    client.issue("9029473")
+    assert session.requests == 4
+
+
+class SlowKpmStepList:
+    """Stand-in for `KPMClient.get_last_step_of_type`:
+    a posted text becomes the last step only after READY_AFTER checks."""
+
+    def __init__(self, ready_after: int):
+        self.ready_after = ready_after
+        self.checks = []
+
+    def __call__(self, kpm_id: str, step_type_desc: str):
+        self.checks.append(kpm_id)
+        if self.checks.count(kpm_id) < self.ready_after:
+            return SimpleNamespace(for_jira_ui="previous text")
+        return SimpleNamespace(for_jira_ui=f"posted for {kpm_id}")
+
+
+def verifying_client(tmp_path, monkeypatch, steps, **post_verify) -> tuple:
+    delays = []
+    monkeypatch.setattr(kpm_client_module, "sleep", delays.append)
+    client = kpm_client(FakeKpmIssueSession(), tmp_path)
+    client.post_verify = PostVerifyConfig(**post_verify)
+    client.get_last_step_of_type = steps
+    return client, delays
+
+
+def test_post_verify_delays():
+    config = PostVerifyConfig(first_delay=0.25, max_delay=1, deadline=3)
+    assert list(config.delays()) == [0.25, 0.5, 1, 1]
+    assert list(PostVerifyConfig(first_delay=0).delays()) == [0]
+
+
+def test_post_verified_with_backoff(tmp_path, monkeypatch):
+    steps = SlowKpmStepList(ready_after=3)
+    client, delays = verifying_client(tmp_path, monkeypatch, steps)
+    post = PendingPost("1001", "Lieferantenaussage", "posted for 1001")
+    assert client._verify_or_defer(post) is True
+    assert delays == [0.25, 0.5, 1]
+
+
+def test_post_not_found_before_deadline(tmp_path, monkeypatch):
+    steps = SlowKpmStepList(ready_after=100)
+    client, delays = verifying_client(tmp_path, monkeypatch, steps, deadline=5)
+    post = PendingPost("1001", "Rückfrage", "posted for 1001")
+    assert client._verify_or_defer(post) is None
+    assert sum(delays) <= 5
+    assert len(steps.checks) == len(delays)
+
+
+def test_deferred_posts_verified_together_at_cycle_end(tmp_path, monkeypatch):
+    steps = SlowKpmStepList(ready_after=2)
+    client, delays = verifying_client(tmp_path, monkeypatch, steps, deferred=True)
+    with client.sync_cycle():
+        for kpm_id in ("1001", "1002", "1003"):
+            post = PendingPost(kpm_id, "Lieferantenaussage", f"posted for {kpm_id}")
+            assert client._verify_or_defer(post) is True
+        assert steps.checks == delays == []
+    # one wait per round for all the queued posts
+    assert delays == [0.25, 0.5]
+    assert len(steps.checks) == 6
+    assert client.verify_pending_posts() == []
+
+
+def test_deferred_posts_not_verified_are_reported(tmp_path, monkeypatch):
+    steps = SlowKpmStepList(ready_after=100)
+    client, _ = verifying_client(tmp_path, monkeypatch, steps, deferred=True)
+    with client.sync_cycle():
+        post = PendingPost("1001", "Rückfrage", "posted for 1001")
+        client._verify_or_defer(post)
+        assert client.verify_pending_posts() == [post]
+    assert client.verify_pending_posts() == []
+
+
+def test_posts_with_braces_logged(tmp_path, monkeypatch):
+    records = []
+    logger.remove()
+    logger.add(lambda message: records.append(message.record), level="DEBUG")
+    text = 'JSON {"a": {0}} and code {x}'
+
+    def steps(kpm_id, step_type_desc):
+        return SimpleNamespace(for_jira_ui=text if kpm_id == "1001" else "previous")
+
+    try:
+        client, _ = verifying_client(tmp_path, monkeypatch, steps, deadline=1)
+        found = PendingPost("1001", "Rückfrage", text, "{json}")
+        missing = PendingPost("1002", "Rückfrage", text, "{json}")
+        assert client._verify_posts([found, missing]) == [missing]
+    finally:
+        get_logger()
+    assert text in records[-1]["message"]
+    assert records[-1]["extra"]["kpm_id"] == "1002"
@@ -0,0 +1,70 @@
+from app.ext.kpm_audi.soap_responses.multiple_problem_data_response import (
+    ProblemReference,
+)
+from app.ext.kpm_audi.sync_state import KpmSyncState
+
+
+def reference(kpm_id: str, timestamp: str) -> ProblemReference:
+    return ProblemReference(kpm_id, f"{timestamp}.123", ["NEW"])
+
+
+def test_since_defaults_without_previous_sync(tmp_path):
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path)
+    assert state.since(default="2023-01-01 00:00:00.0") == "2023-01-01 00:00:00.0"
+
+
+def test_watermark_persisted_with_overlap(tmp_path):
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path, overlap_minutes=30)
+    references = [
+        reference("1001", "2023-03-01 10:00:00"),
+        reference("1002", "2023-03-01 12:00:00"),
+    ]
+    state.update(references, ["1001", "1002"])
+
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path, overlap_minutes=30)
+    assert state.watermark == "2023-03-01 12:00:00"
+    assert state.since(default="") == "2023-03-01 11:30:00.0"
+    assert KpmSyncState("FF/HCP5BS-ESR/", "OTHER", tmp_path).watermark is None
+
+
+def test_unchanged_tickets(tmp_path):
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path)
+    state.update([reference("1001", "2023-03-01 10:00:00")], ["1001"])
+    assert state.is_unchanged(reference("1001", "2023-03-01 10:00:00"))
+    assert not state.is_unchanged(reference("1001", "2023-03-01 10:05:00"))
+    assert not state.is_unchanged(reference("1002", "2023-03-01 09:00:00"))
+
+
+def test_failed_ticket_retried_by_id(tmp_path):
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path, overlap_minutes=0)
+    references = [
+        reference("1001", "2023-03-01 10:00:00"),
+        reference("1002", "2023-03-01 11:00:00"),
+        reference("1003", "2023-03-01 12:00:00"),
+    ]
+    state.update(references, ["1001", "1003"])
+    # the watermark is not held back by the failed ticket, retried by KPM ID
+    assert state.watermark == "2023-03-01 12:00:00"
+    assert state.retry_kpm_ids() == ["1002"]
+    assert not state.is_unchanged(references[1])
+    assert state.is_unchanged(references[2])
+
+    # next query since the watermark: the retry succeeds
+    state.update(references[2:], [], retried_kpm_ids=["1002"])
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path, overlap_minutes=0)
+    assert state.retry_kpm_ids() == ["1002"]
+    state.update([], ["1002"], retried_kpm_ids=["1002"])
+    assert state.retry_kpm_ids() == []
+    assert state.watermark == "2023-03-01 12:00:00"
+
+
+def test_failed_ticket_retries_capped(tmp_path):
+    state = KpmSyncState("FF/HCP5BS-ESR/", "K2J", tmp_path, max_retries=2)
+    state.update([reference("1001", "2023-03-01 10:00:00")], [])
+    for _ in range(2):
+        assert state.retry_kpm_ids() == ["1001"]
+        state.update([], [], retried_kpm_ids=["1001"])
+    # given up until it changes in KPM again
+    assert state.retry_kpm_ids() == []
+    state.update([reference("1001", "2023-03-02 10:00:00")], [])
+    assert state.retry_kpm_ids() == ["1001"]
@@ -0,0 +1,90 @@
+# standard
+from types import SimpleNamespace
+import re
+
+# project
+import tests.ext.ahcp5.mocks.mocked_config  # noqa: F401 (before the service)
+from app.service.hcp5.kpm2jira import jira_esr_client_k2j
+from app.service.hcp5.kpm2jira.jira_esr_client_k2j import (
+    KPM_IDS_PER_QUERY,
+    ESRLabsJiraClientForKpmSync,
+)
+
+
+# External Reference of the Jira issues, by Jira ID
+REFERENCES = {
+    "AHCP5-1": "1001",
+    "AHCP5-2": "KPM 1002 / 1003",
+    # a text search for "1004" matches it, but it is another KPM ID
+    "AHCP5-3": "10045",
+    # two Jira issues of the same KPM ID
+    "AHCP5-4": "1005",
+    "AHCP5-5": "1005 (copy)",
+}
+
+
+def jira_client() -> ESRLabsJiraClientForKpmSync:
+    client = ESRLabsJiraClientForKpmSync("https://jira.example", "x", "x")
+    client.queries = []
+
+    def query(jql, fields=None):
+        client.queries.append(jql)
+        searched = re.findall(r'"External Reference" ~ (\d+)', jql)
+        return [
+            SimpleNamespace(jira_id=jira_id, kpm_id=reference)
+            for jira_id, reference in REFERENCES.items()
+            if any(kpm_id in reference for kpm_id in searched)
+        ]
+
+    client.query = query
+    return client
+
+
+def test_issues_by_kpm_ids():
+    client = jira_client()
+    issues = client.issues_by_kpm_ids(["1001", "1002", "1003", "1004", "1005"])
+    assert len(client.queries) == 1
+    assert {kpm_id: issue and issue.jira_id for kpm_id, issue in issues.items()} == {
+        "1001": "AHCP5-1",
+        "1002": "AHCP5-2",
+        "1003": "AHCP5-2",
+        # "1004": only found by the text search (AHCP5-3 is 10045)
+        "1005": None,  # several Jira issues
+    }
+
+
+def test_issues_of_kpm_ids_one_query_per_chunk(monkeypatch):
+    monkeypatch.setattr(jira_esr_client_k2j, "KPM_IDS_PER_QUERY", 2)
+    client = jira_client()
+    issues = client._issues_of_kpm_ids(["1001", "1002", "1001", "x", "1003", "1005"])
+    assert [re.findall(r"~ (\d+)", jql) for jql in client.queries] == [
+        ["1001", "1002"],
+        ["1003", "1005"],
+    ]
+    assert {kpm_id: len(found) for kpm_id, found in issues.items()} == {
+        "1001": 1,
+        "1002": 1,
+        "1003": 1,
+        "1005": 2,
+    }
+
+
+def test_kpm_ids_resolved_per_batch_as_they_come():
+    client = jira_client()
+    read = []
+
+    def kpm_ids():
+        for i in range(KPM_IDS_PER_QUERY + 1):
+            read.append(i)
+            yield str(1001 + i)
+
+    with client.sync_cycle():
+        resolving = client.resolving(kpm_ids())
+        assert next(resolving) == "1001"
+        # only the first batch is read (and resolved) so far
+        assert len(read) == KPM_IDS_PER_QUERY
+        assert len(client.queries) == 1
+        assert list(resolving)[-1] == str(1001 + KPM_IDS_PER_QUERY)
+        assert len(client.queries) == 2
+        assert client._cycle_issues["1001"][0].jira_id == "AHCP5-1"
+    assert client._cycle_issues == {}